@@ -0,0 +1,148 @@
+"""
+bench_kpi_aggregation.py
+Tablas semanal y mensual de build_kpis: dos groupby().agg() con ids de período
+armados como texto (implementación anterior) vs el motor de periods.py
+(ordinal de día → sumas/conteos por día una vez → rollup por período).
+
+La tabla diaria se arma una sola vez con _daily_table (fuera del cronómetro);
+se mide solo la parte de períodos. También reporta trimestre y ciclo de 21
+días, que con el motor salen de los mismos parciales.
+
+Uso:
+    cd reports
+    python benchmarks/bench_kpi_aggregation.py              # 20 años de datos diarios
+    python benchmarks/bench_kpi_aggregation.py --years 50 --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from diario.loaders import DataBundle  # noqa: E402
+from diario.periods import day_partials, rollup  # noqa: E402
+from diario.scoring import _daily_table  # noqa: E402
+
+
+def synthetic_bundle(years: int, seed: int = 7) -> DataBundle:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2000-01-01", periods=int(years * 365.25), freq="D").strftime("%Y-%m-%d")
+    n = len(dates)
+    daily = pd.DataFrame(
+        {
+            "date": dates,
+            "sleep_hours": rng.normal(7, 1, n).round(1),
+            "energy": rng.integers(1, 6, n),
+            "focus_minutes": rng.integers(0, 300, n),
+            "alcohol_units": rng.integers(0, 3, n),
+            "stalk_intensity": rng.choice(["none", "low", "mid", "high"], n),
+            "stalk_occurred": rng.choice(["true", "false"], n),
+            "feature_done": rng.choice(["si", "no"], n),
+            "trading_trades": rng.integers(0, 5, n),
+            "game_commits": rng.integers(0, 4, n),
+        }
+    )
+    daily.loc[daily.index[::11], "sleep_hours"] = np.nan
+    pomodoro = pd.DataFrame({"date": np.repeat(dates[::2], 3), "event": "end", "phase": "work", "cycle": 1})
+    chk_dates = dates[::3]
+    checkins = pd.DataFrame(
+        {"date": chk_dates, "question": "q", "intensity_0_10": rng.integers(0, 11, len(chk_dates))}
+    )
+    coach = pd.DataFrame(
+        {"date": dates, "score_0_6": rng.integers(0, 7, n), "impulses_count": rng.integers(0, 3, n), "alcohol_bool": "0"}
+    )
+    return DataBundle(daily=daily, checkins=checkins, pomodoro=pomodoro, coach=coach)
+
+
+# --- implementación anterior (scoring.py antes del motor de períodos) ---
+
+def _old_week_id(d: pd.Series) -> pd.Series:
+    dtidx = pd.to_datetime(d.astype(str), errors="coerce")
+    iso = dtidx.dt.isocalendar()
+    return iso["year"].astype(str) + "-W" + iso["week"].astype(str).str.zfill(2)
+
+
+def _old_month_id(d: pd.Series) -> pd.Series:
+    return pd.to_datetime(d.astype(str), errors="coerce").dt.strftime("%Y-%m")
+
+
+def _old_agg(merged: pd.DataFrame, key: str) -> pd.DataFrame:
+    has = merged.columns.__contains__
+    return (
+        merged.groupby(key)
+        .agg(
+            days=("date", "count"),
+            score_avg=("score", "mean"),
+            sleep_avg=("sleep_hours", "mean"),
+            energy_avg=("energy", "mean"),
+            pomodoro_min=("pomodoro_minutes", "sum"),
+            focus_min=("focus_minutes", "sum"),
+            alcohol_units=("alcohol_units", "sum"),
+            stalk_days=("stalk_occurred_num", "sum"),
+            stalk_intensity_avg=("stalk_intensity", "mean"),
+            feature_done_days=("feature_done", "sum") if has("feature_done") else ("date", "count"),
+            trading_trades=("trading_trades", "sum") if has("trading_trades") else ("date", "count"),
+            game_commits=("game_commits", "sum") if has("game_commits") else ("date", "count"),
+            coach_score_avg=("coach_score", "mean"),
+            coach_impulses=("coach_impulses", "sum"),
+            checkins_count=("checkins_count", "sum") if has("checkins_count") else ("date", "count"),
+            checkins_intensity_avg=(
+                ("checkins_intensity_avg", "mean") if has("checkins_intensity_avg") else ("score", "mean")
+            ),
+        )
+        .reset_index()
+    )
+
+
+def old_tables(merged: pd.DataFrame):
+    merged = merged.assign(week=_old_week_id(merged["date"]), month=_old_month_id(merged["date"]))
+    return _old_agg(merged, "week"), _old_agg(merged, "month")
+
+
+def new_tables(merged: pd.DataFrame):
+    partials = day_partials(merged)
+    return rollup(partials, "week"), rollup(partials, "month")
+
+
+def _best(fn, merged: pd.DataFrame, runs: int):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = fn(merged)
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--years", type=int, default=20)
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+
+    merged = _daily_table(synthetic_bundle(args.years)).drop(columns=["week", "month"])
+    print(f"{len(merged)} días ({args.years} años)")
+
+    t_old, (w_old, m_old) = _best(old_tables, merged, args.runs)
+    t_new, (w_new, m_new) = _best(new_tables, merged, args.runs)
+    for old, new in ((w_old, w_new), (m_old, m_new)):
+        pd.testing.assert_frame_equal(old, new, check_dtype=False, check_exact=False)
+    print(f"semana + mes: groupby {t_old * 1000:7.1f} ms | periods {t_new * 1000:7.1f} ms | {t_old / t_new:5.1f}x")
+
+    partials = day_partials(merged)
+    t0 = time.perf_counter()
+    for period in ("week", "month", "quarter", "coach21"):
+        rollup(partials, period)
+    t_all = time.perf_counter() - t0
+    print(f"rollup de 4 períodos sobre los mismos parciales: {t_all * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
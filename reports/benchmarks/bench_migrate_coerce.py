@@ -0,0 +1,55 @@
+"""
+bench_migrate_coerce.py
+Coerción de migrate_to_supabase: coerce_*_row con iterrows() vs coerce_frame columnar.
+
+Uso:
+    cd reports
+    python benchmarks/bench_migrate_coerce.py                 # 50k filas
+    python benchmarks/bench_migrate_coerce.py --rows 200000 --tables pomodoro
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+import migrate_to_supabase as mig  # noqa: E402
+from migrate_fixtures import synthetic_sheet  # noqa: E402
+
+
+def _row_by_row(table, df):
+    coerce_fn = mig.TABLE_CONFIG[table][0]
+    return [r for r in (coerce_fn(row.to_dict()) for _, row in df.iterrows()) if r is not None]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=50_000)
+    ap.add_argument("--tables", nargs="+", default=["pomodoro", "english_voice"], choices=mig.ALL_TABLES)
+    args = ap.parse_args()
+    warnings.simplefilter("ignore")
+
+    for table in args.tables:
+        df = synthetic_sheet(table, args.rows, iso_only=True)
+
+        t0 = time.perf_counter()
+        expected = _row_by_row(table, df)
+        t_rows = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        records, _ = mig.coerce_frame(table, df)
+        t_cols = time.perf_counter() - t0
+
+        assert records == expected
+        print(f"{table:14s} {args.rows} filas: iterrows {t_rows:6.2f}s | columnar {t_cols:6.2f}s | {t_rows / t_cols:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+bench_startup.py
+Tiempo de arranque en frío del CLI medido con `python -X importtime`.
+
+Importa el módulo en un proceso nuevo, descuenta lo que Python carga igual
+con `-c pass` (site, encodings, …) y reporta el total y los módulos más caros.
+Sale con código 1 si el mejor de --runs supera --budget-ms o si se cargó
+alguno de los módulos prohibidos (dependencias que deben ser lazy).
+
+Uso:
+    cd reports
+    python benchmarks/bench_startup.py                       # src.cli, presupuesto 150 ms
+    python benchmarks/bench_startup.py --budget-ms 100 --top 15
+    python benchmarks/bench_startup.py --module src.diario.render --forbid matplotlib,openai
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPORTS = Path(__file__).resolve().parent.parent
+
+# Lo que `import src.cli` no debe arrastrar: se carga por subsistema dentro de main()
+CLI_FORBIDDEN = ["pandas", "numpy", "pyarrow", "jinja2", "matplotlib", "openpyxl", "openai", "tenacity", "dotenv"]
+STARTUP_BUDGET_MS = 150.0
+
+
+def importtime(code: str) -> List[Tuple[str, int, int]]:
+    """[(módulo, self µs, acumulado µs)] de nivel superior, en orden de carga."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPORTS,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        left, cumulative, name = line.split("|", 2)
+        self_us = left.split(":", 1)[1].strip()
+        if not self_us.isdigit():
+            continue  # cabecera
+        rows.append((name[1:].rstrip(), int(self_us), int(cumulative)))  # la sangría indica anidamiento
+    return rows
+
+
+def measure(module: str) -> Tuple[float, Dict[str, int]]:
+    """(ms totales de los imports propios de `module`, {módulo: acumulado µs} de los que agrega)."""
+    baseline = {name.strip() for name, _, _ in importtime("pass")}
+    rows = importtime(f"import {module}")
+    loaded = {name.strip(): cumulative for name, _, cumulative in rows if name.strip() not in baseline}
+    top_level = [cumulative for name, _, cumulative in rows if name == name.lstrip() and name not in baseline]
+    return sum(top_level) / 1000, loaded
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--module", default="src.cli")
+    p.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", STARTUP_BUDGET_MS)))
+    p.add_argument("--forbid", default=",".join(CLI_FORBIDDEN), help="Módulos que no deben cargarse (coma)")
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument("--top", type=int, default=8)
+    args = p.parse_args()
+
+    results = [measure(args.module) for _ in range(args.runs)]
+    best_ms, loaded = min(results, key=lambda r: r[0])
+
+    print(f"import {args.module}: mejor {best_ms:.1f} ms de {args.runs} corrida(s) (presupuesto {args.budget_ms:.0f} ms)")
+    for name, cumulative in sorted(loaded.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    forbidden = [m for m in args.forbid.split(",") if m and m in loaded]
+    if forbidden:
+        print(f"FALLA: se cargaron módulos que deberían ser lazy: {', '.join(forbidden)}")
+    if best_ms > args.budget_ms:
+        print(f"FALLA: {best_ms:.1f} ms > {args.budget_ms:.0f} ms")
+    return 1 if forbidden or best_ms > args.budget_ms else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
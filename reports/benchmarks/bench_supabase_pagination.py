@@ -0,0 +1,74 @@
+"""
+bench_supabase_pagination.py
+Paginación offset (SupabaseClient.select) vs keyset (select_iter) contra el stub
+PostgREST local de tests/ con índice simulado (el offset se recorre fila a fila).
+
+Uso:
+    cd reports
+    python benchmarks/bench_supabase_pagination.py               # 500k filas
+    python benchmarks/bench_supabase_pagination.py --rows 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from diario.loaders import frame_from_pages  # noqa: E402
+from diario.supabase_client import SupabaseClient, SupabaseConfig  # noqa: E402
+from postgrest_stub import PostgrestStub  # noqa: E402
+
+
+def synthetic_pomodoro(rows: int) -> list[dict]:
+    return [
+        {
+            "id": f"{i:08d}",
+            "date": f"2025-{1 + (i // 28) % 12:02d}-{1 + i % 28:02d}",
+            "event": "end" if i % 2 else "start",
+            "phase": "work",
+            "cycle": i % 4,
+        }
+        for i in range(rows)
+    ]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=500_000)
+    args = ap.parse_args()
+
+    print(f"Generando {args.rows} filas…")
+    with PostgrestStub({"pomodoro": synthetic_pomodoro(args.rows)}, indexed=True) as stub:
+        sb = SupabaseClient(SupabaseConfig(url=stub.url, key="test", retries_total=0))
+        next(sb.select_iter("pomodoro", key="id", page_size=10))  # calienta índice y conexión
+
+        t0 = time.perf_counter()
+        rows = sb.select("pomodoro", order="id.asc")
+        t_offset = time.perf_counter() - t0
+        print(f"offset  (select):      {t_offset:6.2f}s  {len(rows)} filas en una sola lista")
+        del rows
+
+        t0 = time.perf_counter()
+        total, biggest = 0, 0
+        for page in sb.select_iter("pomodoro", key="id"):
+            total += len(page)
+            biggest = max(biggest, len(page))
+        t_keyset = time.perf_counter() - t0
+        print(f"keyset  (select_iter): {t_keyset:6.2f}s  {total} filas, máx {biggest} en memoria")
+
+        t0 = time.perf_counter()
+        df = frame_from_pages(sb.select_iter("pomodoro", key="id"))
+        t_frame = time.perf_counter() - t0
+        print(f"keyset → DataFrame:    {t_frame:6.2f}s  {df.shape}")
+
+    print(f"Speedup keyset vs offset: {t_offset / t_keyset:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+bench_to_records.py
+Microbenchmark de render._to_records (columnar) vs la versión anterior con iterrows().
+
+Uso:
+    cd reports
+    python benchmarks/bench_to_records.py            # 10k filas
+    python benchmarks/bench_to_records.py --rows 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from diario.loaders import DataBundle  # noqa: E402
+from diario.render import _to_records  # noqa: E402
+from diario.scoring import build_kpis  # noqa: E402
+
+
+def _to_records_iterrows(df: pd.DataFrame, limit: int | None = None) -> list[dict[str, Any]]:
+    """Implementación previa (fila a fila), solo para comparar."""
+    if df is None or df.empty:
+        return []
+    if limit is not None:
+        df = df.tail(limit)
+
+    out = []
+    for _, row in df.iterrows():
+        rec = {}
+        for k, v in row.items():
+            if isinstance(v, (pd.Timestamp,)):
+                rec[k] = v.isoformat()
+            elif hasattr(v, "isoformat") and not isinstance(v, (str, int, float, bool)) and v is not None:
+                try:
+                    rec[k] = v.isoformat()
+                except Exception:
+                    rec[k] = str(v)
+            elif isinstance(v, (list, dict)):
+                rec[k] = v
+            else:
+                try:
+                    rec[k] = None if pd.isna(v) else v
+                except (TypeError, ValueError):
+                    rec[k] = v
+        out.append(rec)
+    return out
+
+
+def synthetic_daily_table(rows: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2000-01-01", periods=rows, freq="D")
+    daily = pd.DataFrame(
+        {
+            "timestamp": dates + pd.Timedelta(hours=22),
+            "date": dates.strftime("%Y-%m-%d"),
+            "sleep_hours": rng.normal(7, 1, rows).round(1),
+            "energy": rng.integers(1, 6, rows),
+            "mood": rng.choice(["calma", "cansado", "enfocado"], rows),
+            "focus_minutes": rng.integers(0, 240, rows),
+            "alcohol_units": rng.integers(0, 4, rows),
+            "stalk_occurred": rng.choice(["true", "false"], rows),
+            "stalk_intensity": rng.choice(["none", "low", "mid", "high"], rows),
+            "feature_done": rng.choice(["true", "false"], rows),
+            "notes": [f"nota del día {i} " * 4 for i in range(rows)],
+        }
+    )
+    daily.loc[rng.random(rows) < 0.1, "sleep_hours"] = np.nan
+    pomodoro = pd.DataFrame(
+        {"date": daily["date"].sample(frac=0.7, random_state=seed), "event": "end", "phase": "work", "cycle": 1}
+    )
+    checkins = pd.DataFrame(
+        {"date": daily["date"].sample(frac=0.5, random_state=seed), "question": "q", "intensity_0_10": 5}
+    )
+    data = DataBundle(daily=daily, checkins=checkins, pomodoro=pomodoro)
+    return build_kpis(data).daily_table
+
+
+def _best_of(fn, df: pd.DataFrame, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(df)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Benchmark _to_records")
+    p.add_argument("--rows", type=int, default=10_000)
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    df = synthetic_daily_table(args.rows)
+    assert _to_records(df) == _to_records_iterrows(df), "resultados distintos"
+
+    old = _best_of(_to_records_iterrows, df, args.repeat)
+    new = _best_of(_to_records, df, args.repeat)
+    print(f"daily_table: {len(df)} filas x {df.shape[1]} columnas")
+    print(f"  iterrows:  {old * 1000:8.1f} ms")
+    print(f"  columnar:  {new * 1000:8.1f} ms")
+    print(f"  speedup:   {old / new:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
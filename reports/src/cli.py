@@ -5,16 +5,14 @@ import argparse
 import os
 from pathlib import Path
 
-from dotenv import load_dotenv
-
-from .diario.loaders import load_data
-from .diario.scoring import build_kpis
-from .diario.render import render_all
-
-load_dotenv()
+# Sin imports pesados a nivel de módulo: pandas, jinja2, openpyxl, matplotlib u
+# openai se cargan en main() solo si la corrida los usa (ver benchmarks/bench_startup.py).
 
 
 def parse_args() -> argparse.Namespace:
+    from dotenv import load_dotenv  # lazy import; .env antes de leer los defaults
+
+    load_dotenv()
     p = argparse.ArgumentParser(description="Generate Diario Operativo HTML reports")
 
     p.add_argument("--source", choices=["excel", "sheets", "supabase"], default=os.getenv("SOURCE", "excel"))
@@ -28,11 +26,46 @@ def parse_args() -> argparse.Namespace:
 
     p.add_argument("--out", default=os.getenv("OUT_DIR", "output"))
     p.add_argument("--tz", default=os.getenv("TIMEZONE", "America/Santiago"))
+    p.add_argument("--jobs", type=int, default=int(os.getenv("JOBS", "1")),
+                   help="Procesos para renderizar las páginas semanales/mensuales (1 = serial)")
+    p.add_argument("--force", action="store_true",
+                   help="Re-renderiza todas las páginas aunque su hash no haya cambiado")
+
+    # Snapshot local del DataBundle (evita re-descargar en corridas seguidas)
+    p.add_argument("--cache-dir", default=os.getenv("CACHE_DIR"))
+    p.add_argument("--max-age", type=float, default=float(os.getenv("CACHE_MAX_AGE", "3600")),
+                   help="Segundos de validez del snapshot local (default 3600)")
+
+    # Heatmap: matplotlib (con ejes), png (NumPy+zlib, sin matplotlib) o svg; ventana en días (0 = todo)
+    p.add_argument("--heatmap-backend", choices=["matplotlib", "png", "svg"],
+                   default=os.getenv("HEATMAP_BACKEND", "matplotlib"))
+    p.add_argument("--heatmap-days", type=int, default=int(os.getenv("HEATMAP_DAYS", "90")))
+
+    # Supabase: full = tablas completas; delta = solo filas nuevas (requiere --cache-dir)
+    p.add_argument("--sync", choices=["full", "delta"], default=os.getenv("SUPABASE_SYNC", "full"))
+
+    # KPIs incrementales: guarda el KPIBundle anterior y solo recalcula fechas modificadas
+    p.add_argument("--kpi-state", default=os.getenv("KPI_STATE"))
 
     # AI
     p.add_argument("--ai", choices=["on", "off"], default=os.getenv("AI", "off"))
     p.add_argument("--ai-weeks-back", type=int, default=int(os.getenv("AI_WEEKS_BACK", "0")))
     p.add_argument("--ai-lang", default=os.getenv("AI_LANG", "es"))
+    # Backfill: N semanas desde --ai-weeks-back hacia atrás, cada una en assets/ai_weekly_{semana}.json
+    p.add_argument("--ai-backfill", type=int, default=int(os.getenv("AI_BACKFILL_WEEKS", "0")))
+    # Presupuesto aproximado de tokens del payload (0 = sin compactar)
+    p.add_argument("--ai-token-budget", type=int, default=int(os.getenv("AI_TOKEN_BUDGET", "8000")))
+    # Streaming: corta y reintenta apenas la respuesta se sale del esquema JSON
+    p.add_argument("--ai-stream", choices=["on", "off"], default=os.getenv("AI_STREAM", "off"))
+    p.add_argument("--ai-workers", type=int, default=int(os.getenv("AI_WORKERS", "4")))
+    # Cache de respuestas IA en {dir}/ai, independiente del snapshot de --cache-dir
+    p.add_argument("--ai-cache-dir", default=os.getenv("AI_CACHE_DIR"))
+
+    # Daemon: proceso tibio que regenera el reporte con POST /refresh y sirve el HTML
+    p.add_argument("--serve", action="store_true",
+                   help="Modo servidor (ver diario/serve.py); SERVE_TOKEN protege /refresh")
+    p.add_argument("--host", default=os.getenv("SERVE_HOST", "127.0.0.1"))
+    p.add_argument("--port", type=int, default=int(os.getenv("SERVE_PORT", "8787")))
 
     return p.parse_args()
 
@@ -42,28 +75,34 @@ def main() -> int:
     out_dir = Path(args.out)
     out_dir.mkdir(parents=True, exist_ok=True)
 
+    if args.serve:
+        from .diario.serve import serve
+
+        return serve(args)
+
+    from .diario.loaders import load_data
+    from .diario.pipeline import render_report
+
     data = load_data(
         source=args.source,
         excel_path=args.excel_path,
         spreadsheet_id=args.spreadsheet_id,
         creds_path=args.creds,
+        cache_dir=args.cache_dir,
+        max_age=args.max_age,
+        sync=args.sync,
     )
 
-    kpis = build_kpis(data, tz=args.tz)
+    if args.kpi_state:
+        from .diario.incremental import build_kpis_incremental
 
-    if args.ai == "on":
-        from .diario.ai import generate_weekly_ai_insights
+        kpis = build_kpis_incremental(data, state_path=args.kpi_state, tz=args.tz)
+    else:
+        from .diario.scoring import build_kpis
 
-        generate_weekly_ai_insights(
-            kpis=kpis,
-            data_bundle=data,
-            tz=args.tz,
-            weeks_back=args.ai_weeks_back,
-            out_dir=out_dir,
-            lang=args.ai_lang,
-        )
+        kpis = build_kpis(data, tz=args.tz)
 
-    render_all(out_dir=out_dir, kpis=kpis, data=data, tz=args.tz)
+    render_report(args, kpis, data, out_dir)
 
     print(f"✅ Reports generated in: {out_dir.resolve()}")
     print(f"Open: {out_dir.resolve() / 'index.html'}")
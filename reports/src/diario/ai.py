@@ -2,24 +2,30 @@
 from __future__ import annotations
 
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional
 
+from .ai_cache import AI_CACHE_MAX_BYTES, AI_CACHE_TTL, ai_cache_key, cache_get, cache_put
+from .ai_compact import AI_TOKEN_BUDGET, compact_payload
 from .ai_payload import build_weekly_ai_payload
 from .ai_prompt import build_weekly_prompt
+from .ai_stream import JsonStreamGuard, StreamAborted
 from .json_safe import dumps as json_dumps_safe
 from .json_safe import loads as json_loads_safe
 
 
-def _call_openai(prompt: str, model: str, api_key: str, lang: str = "es") -> str:
+def _call_openai(prompt: str, model: str, api_key: str, lang: str = "es", stream: bool = False) -> str:
     """
     Compatible con openai>=1.x usando Chat Completions.
     NO usa response_format para evitar el error que viste.
     Fuerza idioma también por system para reducir respuestas en inglés.
+    stream=True consume la respuesta por fragmentos y la corta apenas sale de
+    la forma esperada (StreamAborted, ver ai_stream.py).
     """
     from openai import OpenAI  # lazy import
 
-    client = OpenAI(api_key=api_key)
+    client = OpenAI(api_key=api_key, max_retries=0)  # reintentos en _call_with_retries
 
     lang = (lang or "es").lower().strip()
     sys_lang = (
@@ -28,49 +34,115 @@ def _call_openai(prompt: str, model: str, api_key: str, lang: str = "es") -> str
         else "Debes escribir TODO en español (latam)."
     )
 
-    resp = client.chat.completions.create(
-        model=model,
-        temperature=0.2,
-        messages=[
-            {"role": "system", "content": f"Eres un asistente útil. {sys_lang}"},
-            {"role": "user", "content": prompt},
-        ],
-    )
+    messages = [
+        {"role": "system", "content": f"Eres un asistente útil. {sys_lang}"},
+        {"role": "user", "content": prompt},
+    ]
+    if stream:
+        guard = JsonStreamGuard()
+        # al salir del with (también por StreamAborted) se cierra la conexión
+        with client.chat.completions.create(model=model, temperature=0.2, messages=messages, stream=True) as chunks:
+            for chunk in chunks:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    guard.feed(chunk.choices[0].delta.content)
+                    if guard.done:
+                        break
+        return guard.finish().strip()
+
+    resp = client.chat.completions.create(model=model, temperature=0.2, messages=messages)
     return (resp.choices[0].message.content or "").strip()
 
 
-def generate_weekly_ai_insights(
-    kpis: Any,
-    data_bundle: Any,
-    tz: str,
-    weeks_back: int = 0,
-    out_dir: Optional[Path] = None,
-    lang: Optional[str] = None,
-) -> Dict[str, Any]:
-    """
-    Genera un JSON semanal y lo guarda en:
-      {out_dir}/assets/ai_weekly.json
-    """
-    api_key = os.getenv("OPENAI_API_KEY", "")
-    model = os.getenv("OPENAI_MODEL", "gpt-4o")
+AI_MAX_ATTEMPTS = 5
+AI_WORKERS = 4
 
-    # Idioma parametrizable por env
-    lang = (lang or os.getenv("AI_LANG", "es")).strip() or "es"
 
-    if not api_key:
-        raise ValueError("Missing OPENAI_API_KEY in environment.")
+def _is_retryable(e: BaseException) -> bool:
+    if isinstance(e, StreamAborted):
+        return True
+    status = getattr(e, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(e).__name__ in ("APIConnectionError", "APITimeoutError")
 
-    payload = build_weekly_ai_payload(
-        kpis=kpis,
-        data_bundle=data_bundle,
-        tz=tz,
-        weeks_back=weeks_back,
-    )
 
+def _retry_wait(retry_state: Any) -> float:
+    """Respeta Retry-After (429) si viene; si no, backoff exponencial con jitter."""
+    from tenacity import wait_random_exponential
+
+    e = retry_state.outcome.exception() if retry_state.outcome else None
+    if isinstance(e, StreamAborted):
+        return 0.0  # respuesta fuera de esquema, no es saturación: reintento inmediato
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        return min(60.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return wait_random_exponential(multiplier=0.5, max=20)(retry_state)
+
+
+def _log_retry(retry_state: Any) -> None:
+    e = retry_state.outcome.exception()
+    print(f"AI: intento {retry_state.attempt_number} falló ({type(e).__name__}: {e}); reintentando")
+
+
+def _call_with_retries(prompt: str, model: str, api_key: str, lang: str, stream: bool = False) -> str:
+    from tenacity import retry, retry_if_exception, stop_after_attempt  # lazy import
+
+    call = retry(
+        retry=retry_if_exception(_is_retryable),
+        wait=_retry_wait,
+        stop=stop_after_attempt(AI_MAX_ATTEMPTS),
+        before_sleep=_log_retry,
+        reraise=True,
+    )(_call_openai)
+    extra = {"stream": True} if stream else {}
+    return call(prompt=prompt, model=model, api_key=api_key, lang=lang, **extra)
+
+
+def _stream_enabled(stream: Optional[bool]) -> bool:
+    return os.getenv("AI_STREAM", "off").strip().lower() == "on" if stream is None else bool(stream)
+
+
+def _build_payload(
+    kpis: Any, data_bundle: Any, tz: str, weeks_back: int, token_budget: Optional[int]
+) -> Dict[str, Any]:
+    """Payload de la semana, compactado a token_budget (None → env AI_TOKEN_BUDGET; 0 = sin límite)."""
+    if token_budget is None:
+        token_budget = int(os.getenv("AI_TOKEN_BUDGET", AI_TOKEN_BUDGET))
+    payload = build_weekly_ai_payload(kpis=kpis, data_bundle=data_bundle, tz=tz, weeks_back=weeks_back)
+    payload, stats = compact_payload(payload, budget=token_budget)
+    if stats["stages"]:
+        print(
+            f"AI: payload {payload['meta'].get('current_week')} ~{stats['tokens_before']} → "
+            f"~{stats['tokens_after']} tokens (presupuesto {token_budget}; {', '.join(stats['stages'])})"
+        )
+    else:
+        print(f"AI: payload {payload['meta'].get('current_week')} ~{stats['tokens_before']} tokens")
+    return payload
+
+
+def _insights_for_payload(
+    payload: Dict[str, Any],
+    model: str,
+    api_key: str,
+    lang: str,
+    cache_dir: Optional[str | Path] = None,
+    stream: bool = False,
+) -> Dict[str, Any]:
+    """Prompt → (cache | OpenAI) → JSON parseado, con fallback visible si no es JSON."""
     # Prompt + datos serializados seguro (date/Timestamp/etc.)
     prompt = build_weekly_prompt(payload=payload, lang=lang) + "\n" + json_dumps_safe(payload)
 
-    raw = _call_openai(prompt=prompt, model=model, api_key=api_key, lang=lang)
+    key = ai_cache_key(payload, prompt, model, lang) if cache_dir is not None else None
+    cached = cache_get(cache_dir, key, ttl=float(os.getenv("AI_CACHE_TTL", AI_CACHE_TTL))) if key else None
+    if cached is not None:
+        print(f"AI: cache hit {key[:12]} (sin llamada a {model})")
+        return cached
+
+    if not api_key:
+        raise ValueError("Missing OPENAI_API_KEY in environment.")
+
+    raw = _call_with_retries(prompt=prompt, model=model, api_key=api_key, lang=lang, stream=stream)
 
     # Parse robusto (soporta ```json ...```, texto con JSON embebido, etc.)
     try:
@@ -88,14 +160,124 @@ def generate_weekly_ai_insights(
             "if_i_fail_then": [],
             "identity_sentence": "",
         }
+    else:
+        if key:  # solo respuestas válidas; un no-JSON se reintenta la próxima vez
+            max_bytes = int(float(os.getenv("AI_CACHE_MAX_MB", AI_CACHE_MAX_BYTES / 2**20)) * 2**20)
+            cache_put(cache_dir, key, parsed, model=model, lang=lang, max_bytes=max_bytes)
+    return parsed
+
 
-    # save
+def generate_weekly_ai_insights(
+    kpis: Any,
+    data_bundle: Any,
+    tz: str,
+    weeks_back: int = 0,
+    out_dir: Optional[Path] = None,
+    lang: Optional[str] = None,
+    cache_dir: Optional[str | Path] = None,
+    token_budget: Optional[int] = None,
+    stream: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """
+    Genera un JSON semanal y lo guarda en:
+      {out_dir}/assets/ai_weekly.json
+
+    Con cache_dir, una respuesta previa para el mismo payload/prompt/modelo/idioma
+    se reutiliza sin llamar a la API (ver ai_cache.py; TTL y tamaño por env
+    AI_CACHE_TTL en segundos y AI_CACHE_MAX_MB).
+    El payload se compacta a token_budget (ver ai_compact.py).
+    stream=True (o env AI_STREAM=on) valida la respuesta mientras llega (ver ai_stream.py).
+    """
+    api_key = os.getenv("OPENAI_API_KEY", "")
+    model = os.getenv("OPENAI_MODEL", "gpt-4o")
+
+    # Idioma parametrizable por env
+    lang = (lang or os.getenv("AI_LANG", "es")).strip() or "es"
+
+    payload = _build_payload(kpis, data_bundle, tz, weeks_back, token_budget)
+
+    parsed = _insights_for_payload(
+        payload, model=model, api_key=api_key, lang=lang, cache_dir=cache_dir, stream=_stream_enabled(stream)
+    )
+    _save(out_dir, parsed)
+    return parsed
+
+
+def generate_ai_backfill(
+    kpis: Any,
+    data_bundle: Any,
+    tz: str,
+    weeks_back: Iterable[int],
+    out_dir: Optional[Path] = None,
+    lang: Optional[str] = None,
+    cache_dir: Optional[str | Path] = None,
+    workers: int = AI_WORKERS,
+    token_budget: Optional[int] = None,
+    stream: Optional[bool] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Insights de varias semanas a la vez: un payload por valor de weeks_back y
+    hasta `workers` llamadas concurrentes (con reintentos ante 429/5xx).
+    Guarda {out_dir}/assets/ai_weekly_{semana}.json apenas termina cada semana
+    y, si la más reciente del rango salió bien, también ai_weekly.json (la que
+    muestra el índice). Una semana que falla se informa y no tumba las demás;
+    solo si fallan todas se propaga el primer error.
+    Retorna {semana: insights} de las semanas generadas.
+    """
+    api_key = os.getenv("OPENAI_API_KEY", "")
+    model = os.getenv("OPENAI_MODEL", "gpt-4o")
+    lang = (lang or os.getenv("AI_LANG", "es")).strip() or "es"
+
+    payloads: Dict[str, Dict[str, Any]] = {}
+    latest: Optional[str] = None
+    for back in sorted(set(weeks_back)):
+        payload = _build_payload(kpis, data_bundle, tz, back, token_budget)
+        week = payload["meta"].get("current_week")
+        if week and week not in payloads:  # weeks_back más allá de la primera semana repite la misma
+            payloads[week] = payload
+            latest = latest or week
+    if not payloads:
+        return {}
+
+    use_stream = _stream_enabled(stream)
+
+    def run(week: str) -> Dict[str, Any]:
+        return _insights_for_payload(
+            payloads[week], model=model, api_key=api_key, lang=lang, cache_dir=cache_dir, stream=use_stream
+        )
+
+    done: Dict[str, Dict[str, Any]] = {}
+    failed: Dict[str, BaseException] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(payloads)))) as pool:
+        futures = {pool.submit(run, week): week for week in payloads}
+        for future in as_completed(futures):
+            week = futures[future]
+            try:
+                done[week] = future.result()
+            except Exception as e:
+                failed[week] = e
+                print(f"  [WARN] AI {week}: {type(e).__name__}: {e}")
+                continue
+            _save(out_dir, done[week], name=f"ai_weekly_{week}.json")
+
+    if not done:
+        raise next(iter(failed.values()))
+    if latest in done:
+        _save(out_dir, done[latest])
+
+    results = {week: done[week] for week in payloads if week in done}
+    print(f"AI: {len(results)} semana(s) generadas ({', '.join(results)})")
+    if failed:
+        print(f"AI: {len(failed)} semana(s) fallaron ({', '.join(w for w in payloads if w in failed)})")
+    return results
+
+
+def _save(out_dir: Optional[Path], parsed: Dict[str, Any], name: str = "ai_weekly.json") -> None:
     if out_dir is not None:
         assets = Path(out_dir) / "assets"
         assets.mkdir(parents=True, exist_ok=True)
-        (assets / "ai_weekly.json").write_text(
-            json_dumps_safe(parsed, indent=2),
-            encoding="utf-8",
-        )
-
-    return parsed
+        # tmp + replace: render._load_ai_by_week puede estar leyendo mientras se escribe
+        path = assets / name
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json_dumps_safe(parsed, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
@@ -0,0 +1,88 @@
+# src/diario/ai_cache.py
+"""
+Cache en disco de respuestas de la IA, por hash de (payload, prompt, modelo, idioma).
+
+    {cache_dir}/ai/{sha256}.json   ← {"created_at": epoch, "model", "lang", "response": {...}}
+
+- TTL: entradas más viejas que `ttl` segundos se ignoran (y se borran).
+- Tamaño: si el directorio supera `max_bytes`, se eliminan las entradas usadas
+  hace más tiempo (mtime; un hit la "toca").
+Solo se guardan respuestas que parsearon como JSON: un fallo se reintenta.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .json_safe import dumps as json_dumps_safe
+
+AI_CACHE_VERSION = 1
+AI_CACHE_TTL = 30 * 24 * 3600  # 30 días
+AI_CACHE_MAX_BYTES = 20 * 1024 * 1024
+
+
+def ai_cache_key(payload: Any, prompt: str, model: str, lang: str) -> str:
+    blob = json_dumps_safe(
+        {"v": AI_CACHE_VERSION, "model": model, "lang": lang, "prompt": prompt, "payload": payload},
+        sort_keys=True,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _ai_dir(cache_dir: str | Path) -> Path:
+    return Path(cache_dir) / "ai"
+
+
+def cache_get(cache_dir: str | Path, key: str, ttl: float = AI_CACHE_TTL) -> Optional[Dict[str, Any]]:
+    path = _ai_dir(cache_dir) / f"{key}.json"
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+    if time.time() - float(entry.get("created_at", 0)) > ttl:
+        path.unlink(missing_ok=True)
+        return None
+    os.utime(path)  # LRU: último uso
+    return entry.get("response")
+
+
+def cache_put(
+    cache_dir: str | Path,
+    key: str,
+    response: Dict[str, Any],
+    model: str,
+    lang: str,
+    max_bytes: int = AI_CACHE_MAX_BYTES,
+) -> None:
+    folder = _ai_dir(cache_dir)
+    folder.mkdir(parents=True, exist_ok=True)
+    entry = {"created_at": time.time(), "model": model, "lang": lang, "response": response}
+
+    tmp = folder / f"{key}.json.tmp"
+    tmp.write_text(json_dumps_safe(entry), encoding="utf-8")
+    os.replace(tmp, folder / f"{key}.json")
+    evict(cache_dir, max_bytes=max_bytes, keep=key)
+
+
+def evict(cache_dir: str | Path, max_bytes: int = AI_CACHE_MAX_BYTES, keep: Optional[str] = None) -> int:
+    """Borra las entradas menos usadas hasta quedar bajo max_bytes. Retorna cuántas borró."""
+    folder = _ai_dir(cache_dir)
+    if not folder.exists():
+        return 0
+    files = [(p.stat().st_mtime, p.stat().st_size, p) for p in folder.glob("*.json")]
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        if keep is not None and path.stem == keep:
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    return removed
@@ -0,0 +1,168 @@
+# src/diario/ai_compact.py
+"""
+Compactación del payload semanal a un presupuesto de tokens.
+
+Las etapas se aplican en orden y solo mientras el payload siga excediendo
+el presupuesto:
+  1. checkins casi idénticos (misma pregunta, respuesta ~igual) → uno con "repeats"
+  2. answer_raw recortado a 280 caracteres
+  3. daily_previous_week → promedios en "weekly_deltas" (anterior → actual, delta, %)
+  4. answer_raw recortado a 120 caracteres
+  5. se descartan los checkins de menor intensidad (los más antiguos primero)
+
+Se mantienen las claves que lee ai_prompt.build_weekly_prompt (meta,
+daily_current_week, daily_previous_week, checkins) y los nombres de columna;
+weekly_deltas también se describe en el prompt.
+El conteo de tokens es una estimación (~4 caracteres por token del JSON).
+"""
+from __future__ import annotations
+
+import copy
+import difflib
+import math
+import re
+import unicodedata
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .json_safe import dumps as json_dumps_safe
+
+AI_TOKEN_BUDGET = 8000
+CHARS_PER_TOKEN = 4
+NEAR_DUPLICATE_RATIO = 0.9
+
+
+def estimate_tokens(obj: Any) -> int:
+    text = obj if isinstance(obj, str) else json_dumps_safe(obj)
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _normalize(text: Any) -> str:
+    text = unicodedata.normalize("NFKD", str(text or "")).encode("ascii", "ignore").decode("ascii")
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+
+def dedupe_checkins(checkins: List[Dict[str, Any]], ratio: float = NEAR_DUPLICATE_RATIO) -> List[Dict[str, Any]]:
+    """Une respuestas casi idénticas a la misma pregunta; conserva la primera y cuenta el resto."""
+    kept: List[Dict[str, Any]] = []
+    seen: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+    for rec in checkins:
+        answer = _normalize(rec.get("answer_raw"))
+        candidates = seen.setdefault(_normalize(rec.get("question")), [])
+        match = None
+        for other, kept_rec in candidates:
+            sm = difflib.SequenceMatcher(None, answer, other)
+            if answer == other or (sm.quick_ratio() >= ratio and sm.ratio() >= ratio):
+                match = kept_rec
+                break
+        if match is not None:
+            match["repeats"] = match.get("repeats", 1) + 1
+            continue
+        rec = dict(rec)
+        candidates.append((answer, rec))
+        kept.append(rec)
+    return kept
+
+
+def _truncate(text: Any, limit: int) -> Any:
+    if not isinstance(text, str) or len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0] or text[:limit]
+    return cut.rstrip(" ,.;:") + "…"
+
+
+def weekly_deltas(current: List[Dict[str, Any]], previous: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """{métrica: {"previous", "current", "delta", "delta_pct"}} con promedios diarios."""
+    cur = pd.DataFrame(current)
+    prev = pd.DataFrame(previous)
+    out: Dict[str, Dict[str, Any]] = {}
+    for col in cur.columns:
+        if col == "date" or col not in prev.columns:
+            continue
+        a = pd.to_numeric(prev[col], errors="coerce").mean()
+        b = pd.to_numeric(cur[col], errors="coerce").mean()
+        if pd.isna(a) and pd.isna(b):
+            continue
+        entry: Dict[str, Any] = {
+            "previous": None if pd.isna(a) else round(float(a), 2),
+            "current": None if pd.isna(b) else round(float(b), 2),
+        }
+        if entry["previous"] is not None and entry["current"] is not None:
+            entry["delta"] = round(float(b - a), 2)
+            entry["delta_pct"] = round(float((b - a) / a * 100), 1) if a else None
+        out[col] = entry
+    return out
+
+
+def _stage_dedupe(p: Dict[str, Any]) -> None:
+    p["checkins"] = dedupe_checkins(p.get("checkins") or [])
+
+
+def _stage_truncate(limit: int) -> Callable[[Dict[str, Any]], None]:
+    def run(p: Dict[str, Any]) -> None:
+        for rec in p.get("checkins") or []:
+            rec["answer_raw"] = _truncate(rec.get("answer_raw"), limit)
+
+    return run
+
+
+def _stage_aggregate_previous(p: Dict[str, Any]) -> None:
+    previous = p.get("daily_previous_week") or []
+    if not previous:
+        return
+    p["weekly_deltas"] = weekly_deltas(p.get("daily_current_week") or [], previous)
+    p["daily_previous_week"] = []  # resumida en weekly_deltas
+
+
+def _intensity(rec: Dict[str, Any]) -> float:
+    try:
+        return float(rec.get("intensity_0_10"))
+    except (TypeError, ValueError):
+        return -1.0
+
+
+def _fit_checkins(p: Dict[str, Any], budget: int) -> None:
+    checkins = p.get("checkins") or []
+    # orden de descarte: menor intensidad primero y, a igual intensidad, el más antiguo
+    drop_order = sorted(range(len(checkins)), key=lambda i: (_intensity(checkins[i]), i))
+    dropped: set[int] = set()
+    for i in drop_order:
+        if estimate_tokens(p) <= budget:
+            break
+        dropped.add(i)
+        p["checkins"] = [rec for j, rec in enumerate(checkins) if j not in dropped]
+
+
+_STAGES: List[Tuple[str, Callable[[Dict[str, Any]], None]]] = [
+    ("dedupe_checkins", _stage_dedupe),
+    ("truncate_answers_280", _stage_truncate(280)),
+    ("aggregate_previous_week", _stage_aggregate_previous),
+    ("truncate_answers_120", _stage_truncate(120)),
+]
+
+
+def compact_payload(payload: Dict[str, Any], budget: Optional[int] = AI_TOKEN_BUDGET) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Retorna (payload compactado, stats). stats = {"tokens_before", "tokens_after",
+    "budget", "stages"}. Sin presupuesto (None/0) o si ya cabe, el payload no cambia.
+    """
+    before = estimate_tokens(payload)
+    stats: Dict[str, Any] = {"tokens_before": before, "tokens_after": before, "budget": budget, "stages": []}
+    if not budget or before <= budget:
+        return payload, stats
+
+    p = copy.deepcopy(payload)
+    p.setdefault("meta", {})["compacted"] = stats["stages"]  # la nota también cuenta en el presupuesto
+    for name, stage in _STAGES:
+        if estimate_tokens(p) <= budget:
+            break
+        stats["stages"].append(name)
+        stage(p)
+
+    if estimate_tokens(p) > budget and p.get("checkins"):
+        stats["stages"].append("drop_low_intensity_checkins")
+        _fit_checkins(p, budget)
+
+    stats["tokens_after"] = estimate_tokens(p)
+    return p, stats
@@ -17,11 +17,23 @@ def _lang_header(lang: str) -> str:
     )
 
 
+def _previous_week_note(payload: Dict[str, Any]) -> str:
+    # ai_compact puede resumir la semana anterior: daily_previous_week queda vacío
+    if not payload.get("weekly_deltas"):
+        return ""
+    return (
+        "\nSemana anterior resumida en weekly_deltas (daily_previous_week viene vacío): "
+        "por métrica, {previous, current, delta, delta_pct} con promedios diarios "
+        "anterior → actual. Úsalo para la comparación; no implica que falte la semana previa.\n"
+    )
+
+
 def build_weekly_prompt(payload: Dict[str, Any], lang: str = "es") -> str:
     """
     payload viene desde ai_payload.py e incluye:
     - daily_current_week
     - daily_previous_week
+    - weekly_deltas (solo si ai_compact resumió la semana anterior)
     - checkins
     - coach (weekly + 21 días)
     - pomodoro (si aplica)
@@ -77,7 +89,7 @@ OBLIGATORIO:
 Formato ejemplo:
 "sleep_hours: 6.1 → 7.0 (+0.9h, +15%)"
 "focus_minutes: 210 → 165 (-45, -21%)"
-
+{_previous_week_note(payload)}
 Si no hay semana previa, dilo explícitamente.
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -59,3 +59,18 @@ AI_INSIGHTS_SCHEMA_EXAMPLE = {
     ],
     "identity_line": "1 frase identidad operativa",
 }
+
+# Claves que además pide ai_prompt.build_weekly_prompt (formato de salida del prompt)
+AI_PROMPT_EXTRA_KEYS = {
+    "execution_analysis": dict,
+    "discipline_vs_emotion": dict,
+    "patterns": list,
+    "impact_ranking": list,
+    "identity_sentence": str,
+}
+
+# Tipo JSON de cada clave de nivel superior; lo usa ai_stream para cortar respuestas fuera de forma
+AI_TOP_LEVEL_SHAPE = {
+    **{k: type(v) for k, v in AI_INSIGHTS_SCHEMA_EXAMPLE.items()},
+    **AI_PROMPT_EXTRA_KEYS,
+}
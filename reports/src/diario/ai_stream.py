@@ -0,0 +1,141 @@
+# src/diario/ai_stream.py
+"""
+Validación incremental de la respuesta en streaming.
+
+JsonStreamGuard recibe los fragmentos a medida que llegan y revisa solo el
+nivel superior del objeto JSON (sin parsearlo entero):
+- antes del "{" solo se aceptan espacios y una cerca ```json
+- cada clave de nivel superior debe existir en AI_TOP_LEVEL_SHAPE
+- su valor debe ser del tipo esperado (string/objeto/lista) o null
+Apenas algo no calza lanza StreamAborted, para cortar la conexión y
+reintentar sin esperar al resto de la respuesta. El texto acumulado se
+parsea al final con json_safe.loads como siempre.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from .ai_schema import AI_TOP_LEVEL_SHAPE
+
+_OPENERS = {"{": dict, "[": list}
+
+
+class StreamAborted(ValueError):
+    """La respuesta en curso salió de la forma esperada."""
+
+
+class JsonStreamGuard:
+    def __init__(self, shape: Optional[Dict[str, type]] = None):
+        self.shape = AI_TOP_LEVEL_SHAPE if shape is None else shape
+        self.keys: List[str] = []
+        self._parts: List[str] = []
+        self._preamble = ""
+        self._expect = "start"  # start → key → key_str → colon → value → after_value → … → done
+        self._depth = 0
+        self._in_str = False
+        self._escape = False
+        self._key = ""
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    @property
+    def done(self) -> bool:
+        return self._expect == "done"
+
+    def feed(self, chunk: str) -> None:
+        self._parts.append(chunk)
+        for ch in chunk:
+            if self._expect == "done":
+                return  # lo que venga después (cerca de cierre) se ignora
+            self._step(ch)
+
+    def finish(self) -> str:
+        if self._expect != "done":
+            raise StreamAborted("JSON incompleto al terminar el stream")
+        return self.text
+
+    def _abort(self, reason: str) -> None:
+        raise StreamAborted(f"{reason} (tras {len(self.text)} caracteres)")
+
+    def _step(self, ch: str) -> None:
+        if self._expect == "start":
+            if ch == "{":
+                self._depth, self._expect = 1, "key"
+                return
+            self._preamble += ch
+            if not "```json".startswith(self._preamble.strip().lower()):
+                self._abort("texto antes del JSON")
+            return
+
+        if self._in_str:
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_str = False
+                if self._depth == 1 and self._expect == "key_str":
+                    self._check_key()
+                return
+            if self._depth == 1 and self._expect == "key_str":
+                self._key += ch
+            return
+
+        if ch.isspace():
+            return
+
+        if self._depth > 1:
+            if ch == '"':
+                self._in_str = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    self._expect = "after_value"
+            return
+
+        # nivel superior
+        if self._expect == "key":
+            if ch == '"':
+                self._in_str, self._expect, self._key = True, "key_str", ""
+            elif ch == "}" and not self.keys:
+                self._depth, self._expect = 0, "done"
+            else:
+                self._abort(f"se esperaba una clave y llegó {ch!r}")
+        elif self._expect == "colon":
+            if ch != ":":
+                self._abort(f"se esperaba ':' y llegó {ch!r}")
+            self._expect = "value"
+        elif self._expect == "value":
+            self._check_value(ch)
+        elif self._expect == "after_value":
+            if ch == ",":
+                self._expect = "key"
+            elif ch == "}":
+                self._depth, self._expect = 0, "done"
+            elif not ch.isalpha():  # resto de un null
+                self._abort(f"carácter inesperado {ch!r} tras '{self.keys[-1]}'")
+
+    def _check_key(self) -> None:
+        if self._key not in self.shape:
+            self._abort(f"clave inesperada '{self._key}'")
+        self.keys.append(self._key)
+        self._expect = "colon"
+
+    def _check_value(self, ch: str) -> None:
+        key = self.keys[-1]
+        expected = self.shape[key]
+        if ch == "n":  # null: campo vacío, se tolera
+            self._expect = "after_value"
+            return
+        got = str if ch == '"' else _OPENERS.get(ch)
+        if got is not expected:
+            self._abort(f"'{key}' debería ser {expected.__name__}")
+        if ch == '"':
+            self._in_str = True
+        else:
+            self._depth += 1
+        self._expect = "after_value"
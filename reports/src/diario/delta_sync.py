@@ -0,0 +1,156 @@
+"""
+delta_sync.py
+Carga incremental desde Supabase: en vez de bajar las tablas completas en cada
+corrida, guarda una copia local y un high-water mark por tabla, y solo pide
+las filas con recorded_at o created_at posteriores a la marca menos
+DELTA_LOOKBACK (solapamiento para filas confirmadas tarde con un timestamp
+igual o anterior; el merge deduplica por id).
+
+    {cache_dir}/delta/{tabla}.parquet|.pkl   ← filas acumuladas (crudas, como llegan de PostgREST)
+    {cache_dir}/delta/watermarks.json        ← {"daily": {"recorded_at": "...", "created_at": "..."}}
+
+Limitaciones: los DELETE en Supabase no se detectan, y tampoco los UPDATE que
+no cambian recorded_at/created_at (un upsert que conserva el recorded_at
+original). Para reconstruir desde cero basta con borrar {cache_dir}/delta/.
+"""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .loaders import frame_from_pages
+from .snapshot import _read_table, _write_table
+
+# tabla → orden de la descarga completa (mismo que _read_supabase)
+DELTA_TABLES: Dict[str, str] = {
+    "daily": "date.asc",
+    "checkins": "date.asc",
+    "pomodoro": "recorded_at.asc",
+    "coach": "date.asc",
+}
+WATERMARK_COLUMNS = ("recorded_at", "created_at")
+# Solapamiento hacia atrás: created_at se fija al inicio de la transacción, no al commit
+DELTA_LOOKBACK = timedelta(minutes=5)
+
+# Claves de negocio (mismas que el upsert del migrador) si la tabla no trae "id"
+_NATURAL_KEYS: Dict[str, List[str]] = {
+    "daily": ["date", "from_user"],
+    "checkins": ["message_id"],
+    "pomodoro": ["recorded_at"],
+    "coach": ["date"],
+}
+
+
+def _delta_dir(cache_dir: str | Path) -> Path:
+    return Path(cache_dir) / "delta"
+
+
+def _load_watermarks(folder: Path) -> Dict[str, Dict[str, str]]:
+    path = folder / "watermarks.json"
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def _watermarks(df: pd.DataFrame) -> Dict[str, str]:
+    marks: Dict[str, str] = {}
+    for col in WATERMARK_COLUMNS:
+        if col in df.columns:
+            ts = pd.to_datetime(df[col], errors="coerce", utc=True, format="ISO8601").max()
+            if pd.notna(ts):
+                marks[col] = ts.isoformat()
+    return marks
+
+
+def _newer_than(marks: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """Filtro PostgREST or=(recorded_at.gte."…",created_at.gte."…") con DELTA_LOOKBACK, o None si no hay marcas."""
+    conds = [
+        f'{col}.gte."{(pd.Timestamp(value) - DELTA_LOOKBACK).isoformat()}"' for col, value in marks.items()
+    ]
+    if not conds:
+        return None
+    return {"or": "(" + ",".join(conds) + ")"}
+
+
+def _merge(table: str, cached: pd.DataFrame, fresh: pd.DataFrame, order: str) -> pd.DataFrame:
+    if fresh.empty:
+        return cached
+    if cached.empty:
+        merged = fresh
+    else:
+        merged = pd.concat([cached, fresh], ignore_index=True)
+        keys = ["id"] if "id" in merged.columns else [k for k in _NATURAL_KEYS[table] if k in merged.columns]
+        if keys:
+            merged = merged.drop_duplicates(subset=keys, keep="last")
+
+    col = order.split(".")[0]
+    if col in merged.columns:
+        merged = merged.sort_values(col, kind="stable", na_position="last")
+    return merged.reset_index(drop=True)
+
+
+def _sync_table(
+    sb: Any,
+    folder: Path,
+    table: str,
+    order: str,
+    entry: Optional[Dict[str, Any]],
+    marks: Dict[str, str],
+) -> tuple[pd.DataFrame, Dict[str, Any], Dict[str, str]]:
+    cached: Optional[pd.DataFrame] = None
+    if entry is not None and marks:
+        try:
+            cached = _read_table(folder, entry)
+        except Exception:
+            cached = None
+
+    filters = _newer_than(marks) if cached is not None else None
+    if cached is not None and filters is None:
+        cached = None  # sin marca utilizable → recarga completa
+
+    # keyset por id: la primera sincronización (historial completo) no paga offsets crecientes
+    fresh = frame_from_pages(sb.select_iter(table, key="id", filters=filters))
+    merged = _merge(table, cached if cached is not None else pd.DataFrame(), fresh, order)
+    mode = "delta" if cached is not None else "completa"
+    print(f"  Supabase '{table}': {len(fresh)} fila(s) descargada(s) ({mode}), {len(merged)} en total")
+
+    return merged, _write_table(merged, folder / table), _watermarks(merged)
+
+
+def read_supabase_delta(sb: Any, cache_dir: str | Path) -> Dict[str, pd.DataFrame]:
+    """
+    Devuelve {tabla: DataFrame} con todas las filas, bajando solo las nuevas o
+    modificadas desde la corrida anterior. Sin copia local → descarga completa.
+    Las cuatro tablas se sincronizan en paralelo.
+    """
+    folder = _delta_dir(cache_dir)
+    folder.mkdir(parents=True, exist_ok=True)
+    marks = _load_watermarks(folder)
+    index_path = folder / "tables.json"
+    index: Dict[str, Any] = json.loads(index_path.read_text(encoding="utf-8")) if index_path.exists() else {}
+
+    with ThreadPoolExecutor(max_workers=len(DELTA_TABLES)) as pool:
+        futures = {
+            table: pool.submit(_sync_table, sb, folder, table, order, index.get(table), marks.get(table, {}))
+            for table, order in DELTA_TABLES.items()
+        }
+        results = {table: f.result() for table, f in futures.items()}
+
+    frames: Dict[str, pd.DataFrame] = {}
+    for table, (merged, entry, table_marks) in results.items():
+        frames[table] = merged
+        index[table] = entry
+        marks[table] = table_marks
+
+    index_path.write_text(json.dumps(index, indent=2), encoding="utf-8")
+    (folder / "watermarks.json").write_text(json.dumps(marks, indent=2), encoding="utf-8")
+    return frames
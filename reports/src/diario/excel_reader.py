@@ -0,0 +1,120 @@
+"""
+excel_reader.py
+Lectura del .xlsx en una sola pasada: openpyxl en modo read_only (streaming)
+abre el workbook una vez, recorre solo las hojas pedidas y entrega las filas
+en bloques de `chunk_rows`, así un export grande nunca queda entero en memoria
+como celdas de openpyxl.
+
+Cada bloque se convierte con el mismo TextParser y la misma conversión de
+celdas que usa pd.read_excel (enteros, errores → NaN, filas vacías al
+final descartadas), por lo que read_excel_sheets() devuelve lo mismo que un
+pd.read_excel por hoja.
+
+Uso:
+    frames = read_excel_sheets("diario.xlsx", ["Daily", "Checkins", "Pomodoro", "Coach"])
+    for sheet, chunk in iter_excel_chunks("diario.xlsx", ["EnglishVoice"], chunk_rows=2000):
+        ...
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+EXCEL_CHUNK_ROWS = 5000
+
+
+def _cell(cell: Any) -> Any:
+    # igual que OpenpyxlReader._convert_cell de pandas
+    if cell.value is None:
+        return ""
+    if cell.data_type == "e":
+        return np.nan
+    if cell.data_type == "n":
+        as_int = int(cell.value)
+        return as_int if as_int == cell.value else float(cell.value)
+    return cell.value
+
+
+def _trimmed(row: Iterable[Any]) -> List[Any]:
+    values = [_cell(c) for c in row]
+    while values and values[-1] == "":
+        values.pop()
+    return values
+
+
+def _frame(header: List[Any], rows: List[List[Any]]) -> pd.DataFrame:
+    from pandas.io.parsers import TextParser
+
+    width = max([len(header)] + [len(r) for r in rows])
+    data = [r + [""] * (width - len(r)) for r in [header] + rows]
+    return TextParser(data, header=0).read()
+
+
+def iter_excel_chunks(
+    path: str | Path,
+    sheets: Iterable[str],
+    chunk_rows: int = EXCEL_CHUNK_ROWS,
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    (hoja, DataFrame de hasta `chunk_rows` filas) en orden; las hojas que no
+    existen se omiten y una hoja sin filas de datos entrega un bloque vacío.
+    """
+    import openpyxl  # lazy: solo la fuente Excel lo necesita
+
+    wb = openpyxl.load_workbook(Path(path), read_only=True, data_only=True)
+    try:
+        for name in sheets:
+            if name not in wb.sheetnames:
+                continue
+            ws = wb[name]
+            ws.reset_dimensions()  # algunos exports declaran mal el rango usado
+
+            rows = ws.iter_rows()
+            header = _trimmed(next(rows, ()))  # la fila 1, como header=0 en read_excel
+
+            chunk: List[List[Any]] = []
+            blank = 0  # filas vacías pendientes: read_excel conserva las intermedias (NaN) y corta las finales
+            sent = False
+            for row in rows:
+                values = _trimmed(row)
+                if not values:
+                    blank += 1
+                    continue
+                chunk.extend([] for _ in range(blank))
+                blank = 0
+                chunk.append(values)
+                if len(chunk) >= chunk_rows:
+                    yield name, _frame(header, chunk)
+                    chunk, sent = [], True
+            if chunk or not sent:
+                yield name, _frame(header, chunk) if header or chunk else pd.DataFrame()
+    finally:
+        wb.close()
+
+
+def read_excel_sheets(
+    path: str | Path,
+    sheets: Iterable[str],
+    chunk_rows: int = EXCEL_CHUNK_ROWS,
+) -> Dict[str, pd.DataFrame]:
+    """{hoja: DataFrame} de las hojas pedidas que existen, abriendo el workbook una sola vez."""
+    parts: Dict[str, List[pd.DataFrame]] = {}
+    for name, chunk in iter_excel_chunks(path, sheets, chunk_rows):
+        parts.setdefault(name, []).append(chunk)
+    return {name: chunks[0] if len(chunks) == 1 else _concat(chunks) for name, chunks in parts.items()}
+
+
+def _concat(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Une bloques con los dtypes que habría inferido read_excel sobre la columna entera."""
+    for col in chunks[0].columns:
+        kinds = {c[col].dtype.kind for c in chunks if col in c.columns}
+        if kinds == {"b", "f"}:  # bool con celdas vacías en otro bloque: read_excel da float
+            for c in chunks:
+                if col in c.columns and c[col].dtype.kind == "b":
+                    c[col] = c[col].astype("float64")
+    # infer_objects: un bloque sin datos en una columna no debe dejarla en object
+    return pd.concat(chunks, ignore_index=True).infer_objects()
@@ -0,0 +1,196 @@
+"""
+incremental.py
+Modo incremental de build_kpis: guarda el KPIBundle anterior en disco y solo
+recalcula las fechas (y sus semanas/meses) cuyas filas cambiaron.
+
+- Cada tabla del DataBundle se resume en un hash por fecha.
+- Fechas nuevas, borradas o con hash distinto → "sucias".
+- Se recalcula la tabla diaria solo para esas fechas y se reagregan solo las
+  semanas ISO y meses que las contienen; el resto se reutiliza tal cual.
+- Si cambian las columnas de entrada o el timezone → reconstrucción completa.
+"""
+
+from __future__ import annotations
+
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import pandas as pd
+
+from .loaders import DataBundle
+from .scoring import (
+    KPIBundle,
+    _coerce_date,
+    _daily_table,
+    _heatmap,
+    _meta,
+    _monthly_table,
+    _sorted,
+    _week_id,
+    _month_id,
+    _weekly_table,
+    build_kpis,
+)
+
+STATE_VERSION = 1
+TABLES = ("daily", "checkins", "pomodoro", "coach")
+
+
+@dataclass
+class KPIState:
+    signature: Dict[str, object]
+    fingerprints: Dict[str, pd.Series]
+    kpis: KPIBundle
+    dirty_dates: int = 0
+
+
+def _signature(data: DataBundle, tz: str) -> Dict[str, object]:
+    sig: Dict[str, object] = {"version": STATE_VERSION, "tz": tz}
+    for name in TABLES:
+        df = getattr(data, name)
+        sig[name] = [] if df is None else [str(c) for c in df.columns]
+    return sig
+
+
+def _fingerprint(df: Optional[pd.DataFrame]) -> pd.Series:
+    """Hash por fecha de todas las filas de esa fecha (sensible al orden dentro del día)."""
+    if df is None or df.empty or "date" not in df.columns:
+        return pd.Series(dtype="uint64")
+
+    dates = _coerce_date(df, "date")
+    valid = dates.notna()
+    if not valid.any():
+        return pd.Series(dtype="uint64")
+
+    rows = df[valid]
+    dates = dates[valid]
+    # astype(str): las columnas JSONB (dict/list) no son hasheables directamente
+    row_hash = pd.util.hash_pandas_object(rows.astype(str), index=False).to_numpy()
+    position = dates.groupby(dates).cumcount().to_numpy().astype("uint64") + 1
+    return pd.Series(row_hash * position, index=dates.to_numpy()).groupby(level=0).sum()
+
+
+def _dirty_dates(old: Dict[str, pd.Series], new: Dict[str, pd.Series]) -> Set:
+    dirty: Set = set()
+    for name in TABLES:
+        a = old.get(name, pd.Series(dtype="uint64"))
+        b = new.get(name, pd.Series(dtype="uint64"))
+        both = a.index.intersection(b.index)
+        dirty |= set(a.index.symmetric_difference(b.index))
+        dirty |= set(both[a.loc[both].to_numpy() != b.loc[both].to_numpy()])
+    return dirty
+
+
+def _rows_on(df: Optional[pd.DataFrame], dates: Set) -> pd.DataFrame:
+    if df is None or df.empty or "date" not in df.columns:
+        return df if df is not None else pd.DataFrame()
+    return df[_coerce_date(df, "date").isin(dates)]
+
+
+def _align_dtypes(fresh: pd.DataFrame, prev: pd.DataFrame) -> pd.DataFrame:
+    # Columnas que en el subconjunto quedan vacías (ej. sin checkins hoy) salen como
+    # object; en la reconstrucción completa serían float con NaN.
+    for col in fresh.columns:
+        if fresh[col].dtype != prev[col].dtype and fresh[col].isna().all():
+            if pd.api.types.is_numeric_dtype(prev[col].dtype):
+                fresh[col] = fresh[col].astype("float64")
+    return fresh
+
+
+def _replace_periods(
+    prev: pd.DataFrame,
+    merged: pd.DataFrame,
+    key: str,
+    dirty: Set[str],
+    aggregate,
+) -> pd.DataFrame:
+    parts: List[pd.DataFrame] = [prev[~prev[key].isin(dirty)]]
+    rows = merged[merged[key].isin(dirty)]
+    if not rows.empty:
+        parts.append(aggregate(rows))
+    return _sorted(pd.concat(parts), key)
+
+
+def _rebuild_dirty(prev: KPIBundle, data: DataBundle, dirty: Set, tz: str) -> Optional[KPIBundle]:
+    subset = DataBundle(**{name: _rows_on(getattr(data, name), dirty) for name in TABLES})
+    fresh = _daily_table(subset)
+    old = prev.daily_table
+
+    if list(fresh.columns) != list(old.columns):
+        return None  # esquema distinto → que decida la reconstrucción completa
+
+    parts = [old[~old["date"].isin(dirty)]]
+    if not fresh.empty:
+        parts.append(_align_dtypes(fresh, old))
+    merged = _sorted(pd.concat(parts), "date")
+
+    dirty_days = pd.Series(sorted(dirty))
+    weeks = set(_week_id(dirty_days).dropna())
+    months = set(_month_id(dirty_days).dropna())
+
+    return KPIBundle(
+        daily_table=merged,
+        weekly_table=_replace_periods(prev.weekly_table, merged, "week", weeks, _weekly_table),
+        monthly_table=_replace_periods(prev.monthly_table, merged, "month", months, _monthly_table),
+        heatmap=_heatmap(merged),
+        meta=_meta(merged, tz),
+    )
+
+
+def update_state(state: Optional[KPIState], data: DataBundle, tz: str = "America/Santiago") -> KPIState:
+    """Devuelve un estado nuevo con los KPIs al día respecto a `data`."""
+    signature = _signature(data, tz)
+    fingerprints = {name: _fingerprint(getattr(data, name)) for name in TABLES}
+
+    if state is None or state.signature != signature:
+        kpis = build_kpis(data, tz=tz)
+        return KPIState(signature, fingerprints, kpis, dirty_dates=int(len(kpis.daily_table)))
+
+    dirty = _dirty_dates(state.fingerprints, fingerprints)
+    if not dirty:
+        return KPIState(signature, fingerprints, state.kpis, dirty_dates=0)
+
+    kpis = _rebuild_dirty(state.kpis, data, dirty, tz)
+    if kpis is None:
+        kpis = build_kpis(data, tz=tz)
+    return KPIState(signature, fingerprints, kpis, dirty_dates=len(dirty))
+
+
+def load_state(path: str | Path) -> Optional[KPIState]:
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with path.open("rb") as f:
+            state = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(state, KPIState) or state.signature.get("version") != STATE_VERSION:
+        return None
+    return state
+
+
+def save_state(state: KPIState, path: str | Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(path)
+
+
+def build_kpis_incremental(
+    data: DataBundle,
+    state_path: str | Path,
+    tz: str = "America/Santiago",
+) -> KPIBundle:
+    """
+    Igual que build_kpis, pero reutiliza el KPIBundle guardado en `state_path`
+    y solo recalcula las fechas/semanas/meses tocados desde la última corrida.
+    """
+    state = update_state(load_state(state_path), data, tz=tz)
+    save_state(state, state_path)
+    print(f"KPIs incrementales: {state.dirty_dates} fecha(s) recalculada(s)")
+    return state.kpis
@@ -30,6 +30,8 @@ def _default(o: Any) -> Any:
         ts = getattr(pd, "Timestamp", None)
         if ts is not None and isinstance(o, ts):
             return o.isoformat()
+        if o is pd.NA:  # enteros/booleanos nulables
+            return None
 
     if np is not None:
         if isinstance(o, (np.integer,)):
@@ -1,23 +1,31 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Iterable, List, Optional
 
 import os
+import time
 import pandas as pd
 
+from .schema import apply_schema
+
+# Páginas PostgREST en vuelo por tabla (4 tablas × 4 = 16 ≤ pool de 20 conexiones)
+SUPABASE_PAGE_WORKERS = 4
+
 
 @dataclass
 class DataBundle:
     daily: pd.DataFrame
     checkins: pd.DataFrame
     pomodoro: pd.DataFrame
-    coach: pd.DataFrame
+    coach: pd.DataFrame = field(default_factory=pd.DataFrame)
 
 
 def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    """Renombra las columnas en el mismo frame (no copia datos)."""
     df.columns = [
         str(c)
         .replace("\ufeff", "")
@@ -30,47 +38,115 @@ def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def _empty_to_na(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df = df.replace({"": pd.NA, " ": pd.NA})
+    """
+    "" y " " → NA en el mismo frame: solo se reemplazan las columnas de texto
+    que los tienen (máscara por columna); el resto no se toca ni se copia.
+    """
+    for i in range(df.shape[1]):  # por posición: tolera nombres de columna repetidos
+        col = df.iloc[:, i]
+        if col.dtype != object and not isinstance(col.dtype, pd.StringDtype):
+            continue
+        blank = col.isin(["", " "])
+        if blank.any():
+            df.isetitem(i, col.mask(blank, pd.NA))
     return df
 
 
-def _read_excel(excel_path: str | Path) -> DataBundle:
+# tabla del DataBundle → hoja del Excel (Coach es opcional)
+EXCEL_SHEETS = {"daily": "Daily", "checkins": "Checkins", "pomodoro": "Pomodoro", "coach": "Coach"}
+
+
+def read_excel_bundle(
+    excel_path: str | Path,
+    extra_sheets: Iterable[str] = (),
+) -> tuple[DataBundle, Dict[str, pd.DataFrame]]:
+    """
+    DataBundle + {hoja: DataFrame} de `extra_sheets` (las que existan), abriendo
+    el workbook una sola vez (ver excel_reader). Las extra vuelven sin normalizar.
+    """
+    from .excel_reader import read_excel_sheets
+
     path = Path(excel_path)
     if not path.exists():
         raise FileNotFoundError(f"Excel not found: {path.resolve()}")
 
-    daily = pd.read_excel(path, sheet_name="Daily")
-    checkins = pd.read_excel(path, sheet_name="Checkins")
-    pomodoro = pd.read_excel(path, sheet_name="Pomodoro")
-    try:
-        coach = pd.read_excel(path, sheet_name="Coach")
-    except Exception:
-        coach = pd.DataFrame()
+    extra_sheets = list(extra_sheets)
+    frames = read_excel_sheets(path, list(EXCEL_SHEETS.values()) + extra_sheets)
+    missing = [sheet for name, sheet in EXCEL_SHEETS.items() if name != "coach" and sheet not in frames]
+    if missing:
+        raise ValueError(f"Worksheet(s) not found in {path.name}: {', '.join(missing)}")
+
+    bundle = DataBundle(
+        **{name: _empty_to_na(_normalize_columns(frames.get(sheet, pd.DataFrame()))) for name, sheet in EXCEL_SHEETS.items()}
+    )
+    return bundle, {sheet: frames[sheet] for sheet in extra_sheets if sheet in frames}
 
-    daily = _empty_to_na(_normalize_columns(daily))
-    checkins = _empty_to_na(_normalize_columns(checkins))
-    pomodoro = _empty_to_na(_normalize_columns(pomodoro))
-    coach = _empty_to_na(_normalize_columns(coach))
 
-    return DataBundle(daily=daily, checkins=checkins, pomodoro=pomodoro, coach=coach)
+def _read_excel(excel_path: str | Path) -> DataBundle:
+    return read_excel_bundle(excel_path)[0]
 
 
-def _ws_to_df(ws) -> pd.DataFrame:
-    records = ws.get_all_records(default_blank="", head=1)
-    df = pd.DataFrame(records)
-    df = _empty_to_na(_normalize_columns(df))
-    return df
+def _fetch_concurrently(fetchers: Dict[str, Callable[[], pd.DataFrame]], label: str) -> Dict[str, pd.DataFrame]:
+    """Ejecuta un fetcher por tabla en paralelo e imprime el tiempo de cada una."""
 
+    def timed(fn: Callable[[], pd.DataFrame]) -> tuple[pd.DataFrame, float]:
+        t0 = time.perf_counter()
+        df = fn()
+        return df, time.perf_counter() - t0
 
-def _read_sheets(
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(fetchers)) as pool:
+        futures = {name: pool.submit(timed, fn) for name, fn in fetchers.items()}
+        results = {name: f.result() for name, f in futures.items()}
+
+    for name, (df, secs) in results.items():
+        print(f"  {label} '{name}': {len(df)} filas en {secs:.2f}s")
+    print(f"  {label}: {len(fetchers)} tablas en {time.perf_counter() - t0:.2f}s")
+    return {name: df for name, (df, _) in results.items()}
+
+
+def frame_from_pages(pages: Iterable[List[dict]]) -> pd.DataFrame:
+    """
+    Arma un DataFrame página a página (p. ej. desde SupabaseClient.select_iter):
+    cada página se convierte al llegar y solo se concatenan los bloques.
+    infer_objects() deja los dtypes como si se hubiera construido de una vez.
+    """
+    chunks = [pd.DataFrame(page) for page in pages]
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True).infer_objects()
+
+
+@lru_cache(maxsize=4)
+def _gspread_client(creds_path: str):
+    """Cliente gspread autenticado, uno por service account (el daemon lo reutiliza)."""
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    scopes = [
+        "https://www.googleapis.com/auth/spreadsheets.readonly",
+        "https://www.googleapis.com/auth/drive.readonly",
+    ]
+    creds = Credentials.from_service_account_file(creds_path, scopes=scopes)
+    return gspread.authorize(creds)
+
+
+# tabla del DataBundle → pestaña del Sheet (Coach es opcional)
+SHEETS_TABS = dict(EXCEL_SHEETS)
+
+
+def read_sheets_bundle(
     spreadsheet_id: Optional[str] = None,
     creds_path: Optional[str] = None,
-    daily_tab: str = "Daily",
-    checkins_tab: str = "Checkins",
-    pomodoro_tab: str = "Pomodoro",
-    coach_tab: str = "Coach",
-) -> DataBundle:
+    extra_tabs: Iterable[str] = (),
+    tabs: Optional[Dict[str, str]] = None,
+) -> tuple[DataBundle, Dict[str, List[List]]]:
+    """
+    DataBundle + {pestaña: filas crudas} de `extra_tabs` (las que existan), con
+    una sola llamada values.batchGet por el cliente cacheado (ver sheets_reader).
+    """
+    from .sheets_reader import batch_get_values, records_frame
+
     spreadsheet_id = spreadsheet_id or os.getenv("GOOGLE_SHEETS_SPREADSHEET_ID")
     creds_path = creds_path or os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 
@@ -83,46 +159,71 @@ def _read_sheets(
     if not creds_file.exists():
         raise FileNotFoundError(f"Service account JSON not found: {creds_file.resolve()}")
 
-    import gspread
-    from google.oauth2.service_account import Credentials
-
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets.readonly",
-        "https://www.googleapis.com/auth/drive.readonly",
-    ]
-    creds = Credentials.from_service_account_file(str(creds_file), scopes=scopes)
-    gc = gspread.authorize(creds)
+    tabs = tabs or SHEETS_TABS
+    extra_tabs = list(extra_tabs)
+    required = [tab for name, tab in tabs.items() if name != "coach"]
 
-    sh = gc.open_by_key(spreadsheet_id)
+    t0 = time.perf_counter()
+    values = batch_get_values(
+        _gspread_client(str(creds_file.resolve())),
+        spreadsheet_id,
+        required,
+        optional=[tabs["coach"]] + extra_tabs,
+    )
 
-    daily_ws = sh.worksheet(daily_tab)
-    checkins_ws = sh.worksheet(checkins_tab)
-    pomodoro_ws = sh.worksheet(pomodoro_tab)
+    def frame(name: str, tab: str) -> pd.DataFrame:
+        try:
+            return _empty_to_na(_normalize_columns(records_frame(values.get(tab, []))))
+        except ValueError:
+            if name != "coach":
+                raise
+            return pd.DataFrame()  # Coach puede no existir aún o estar a medio armar
 
-    # Coach puede no existir aún
-    coach_df = pd.DataFrame()
-    try:
-        coach_ws = sh.worksheet(coach_tab)
-        coach_df = _ws_to_df(coach_ws)
-    except Exception:
-        coach_df = pd.DataFrame()
+    bundle = DataBundle(**{name: frame(name, tab) for name, tab in tabs.items()})
+    for name in tabs:
+        print(f"  Sheets '{name}': {len(getattr(bundle, name))} filas")
+    print(f"  Sheets: {len(values)} pestañas en una llamada batchGet ({time.perf_counter() - t0:.2f}s)")
+    return bundle, {tab: values[tab] for tab in extra_tabs if tab in values}
 
-    daily = _ws_to_df(daily_ws)
-    checkins = _ws_to_df(checkins_ws)
-    pomodoro = _ws_to_df(pomodoro_ws)
 
-    return DataBundle(daily=daily, checkins=checkins, pomodoro=pomodoro, coach=coach_df)
+def _read_sheets(
+    spreadsheet_id: Optional[str] = None,
+    creds_path: Optional[str] = None,
+    daily_tab: str = "Daily",
+    checkins_tab: str = "Checkins",
+    pomodoro_tab: str = "Pomodoro",
+    coach_tab: str = "Coach",
+) -> DataBundle:
+    tabs = {"daily": daily_tab, "checkins": checkins_tab, "pomodoro": pomodoro_tab, "coach": coach_tab}
+    return read_sheets_bundle(spreadsheet_id, creds_path, tabs=tabs)[0]
 
 
-def _read_supabase() -> DataBundle:
+def _read_supabase(sync: str = "full", cache_dir: Optional[str | Path] = None) -> DataBundle:
     from .supabase_client import load_from_env
 
     sb = load_from_env()
 
-    daily    = pd.DataFrame(sb.select("daily",    order="date.asc"))
-    checkins = pd.DataFrame(sb.select("checkins", order="date.asc"))
-    pomodoro = pd.DataFrame(sb.select("pomodoro", order="recorded_at.asc"))
-    coach    = pd.DataFrame(sb.select("coach",    order="date.asc"))
+    if sync == "delta":
+        if cache_dir is None:
+            raise ValueError("sync='delta' requiere cache_dir para guardar filas y watermarks.")
+        from .delta_sync import read_supabase_delta
+
+        frames = read_supabase_delta(sb, cache_dir)
+        daily, checkins, pomodoro, coach = (frames[t] for t in ("daily", "checkins", "pomodoro", "coach"))
+    else:
+        def fetch(table: str, order: str) -> Callable[[], pd.DataFrame]:
+            return lambda: pd.DataFrame(sb.select(table, order=order, parallel=SUPABASE_PAGE_WORKERS))
+
+        frames = _fetch_concurrently(
+            {
+                "daily":    fetch("daily",    "date.asc"),
+                "checkins": fetch("checkins", "date.asc"),
+                "pomodoro": fetch("pomodoro", "recorded_at.asc"),
+                "coach":    fetch("coach",    "date.asc"),
+            },
+            label="Supabase",
+        )
+        daily, checkins, pomodoro, coach = (frames[t] for t in ("daily", "checkins", "pomodoro", "coach"))
 
     # Alias recorded_at → timestamp para consistencia con las otras fuentes
     for df in [daily, checkins, pomodoro, coach]:
@@ -142,11 +243,65 @@ def load_data(
     excel_path: str = "diario operativo.xlsx",
     spreadsheet_id: Optional[str] = None,
     creds_path: Optional[str] = None,
+    cache_dir: Optional[str | Path] = None,
+    max_age: float = 3600.0,
+    sync: str = "full",
+    typed: bool = True,
+) -> DataBundle:
+    """
+    Carga Daily/Checkins/Pomodoro/Coach desde la fuente indicada.
+    Con `cache_dir`, reutiliza el snapshot local si tiene menos de `max_age` segundos.
+    sync="delta" (solo Supabase): baja únicamente filas nuevas desde la última corrida;
+    no usa max_age, el delta ya es el refresco del snapshot.
+    typed=False: tablas tal como vienen de la fuente, sin los tipos de schema.py
+    (para quien coerciona por su cuenta, como migrate_to_supabase).
+    """
+    if cache_dir is None:
+        return _load_source(source, excel_path, spreadsheet_id, creds_path, sync=sync, typed=typed)
+
+    from .snapshot import load_snapshot, save_snapshot, snapshot_age, snapshot_key
+
+    if source == "excel":
+        key = snapshot_key(source, str(Path(excel_path).resolve()), None if typed else "raw")
+        not_before = Path(excel_path).stat().st_mtime if Path(excel_path).exists() else None
+    else:
+        key = snapshot_key(
+            source,
+            spreadsheet_id or os.getenv("GOOGLE_SHEETS_SPREADSHEET_ID"),
+            os.getenv("SUPABASE_URL"),
+            None if typed else "raw",
+        )
+        not_before = None
+
+    # sync="delta" es el refresco del snapshot: siempre pide filas nuevas (barato) y lo reescribe
+    delta = source == "supabase" and sync == "delta"
+    cached = None if delta else load_snapshot(cache_dir, key, max_age=max_age, not_before=not_before)
+    if cached is not None:
+        print(f"Snapshot local: {source} (edad {snapshot_age(cache_dir, key):.0f}s)")
+        return cached
+
+    data = _load_source(source, excel_path, spreadsheet_id, creds_path, sync=sync, cache_dir=cache_dir, typed=typed)
+    save_snapshot(cache_dir, key, data)
+    return data
+
+
+def _load_source(
+    source: str,
+    excel_path: str,
+    spreadsheet_id: Optional[str],
+    creds_path: Optional[str],
+    sync: str = "full",
+    cache_dir: Optional[str | Path] = None,
+    typed: bool = True,
 ) -> DataBundle:
     if source == "excel":
-        return _read_excel(excel_path)
-    if source == "sheets":
-        return _read_sheets(spreadsheet_id=spreadsheet_id, creds_path=creds_path)
-    if source == "supabase":
-        return _read_supabase()
-    raise ValueError(f"Unknown source: {source}")
+        data = _read_excel(excel_path)
+    elif source == "sheets":
+        data = _read_sheets(spreadsheet_id=spreadsheet_id, creds_path=creds_path)
+    elif source == "supabase":
+        data = _read_supabase(sync=sync, cache_dir=cache_dir)
+    else:
+        raise ValueError(f"Unknown source: {source}")
+    if not typed:
+        return data
+    return apply_schema(data)  # tipos compactos una sola vez; el snapshot los guarda así
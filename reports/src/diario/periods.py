@@ -0,0 +1,188 @@
+"""
+periods.py
+Motor de agregación por período para las tablas de KPIs.
+
+Las fechas se pasan una sola vez a un ordinal de día (días desde 1970-01-01)
+y de ahí salen, con aritmética entera, las claves de semana ISO, mes,
+trimestre y ciclo de coach de 21 días. day_partials() calcula sumas y
+conteos por día una vez; rollup() los acumula a cualquier período sin volver
+a agrupar la tabla diaria ni formatear/parsear fechas como texto.
+
+    partials = day_partials(merged)
+    weekly = rollup(partials, "week")
+    cycles = rollup(partials, "coach21", anchor="2024-01-08")
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Ordinal de las fechas inválidas (NaT)
+NAT = np.iinfo(np.int64).min
+
+COACH_CYCLE_DAYS = 21
+
+# (columna de salida, columna fuente, agregación, alternativa si falta la fuente)
+AGG_SPEC: List[Tuple[str, str, str, Optional[Tuple[str, str]]]] = [
+    ("days", "date", "count", None),
+    ("score_avg", "score", "mean", None),
+    ("sleep_avg", "sleep_hours", "mean", None),
+    ("energy_avg", "energy", "mean", None),
+    ("pomodoro_min", "pomodoro_minutes", "sum", None),
+    ("focus_min", "focus_minutes", "sum", None),
+    ("alcohol_units", "alcohol_units", "sum", None),
+    ("stalk_days", "stalk_occurred_num", "sum", None),
+    ("stalk_intensity_avg", "stalk_intensity", "mean", None),
+    ("feature_done_days", "feature_done", "sum", ("date", "count")),
+    ("trading_trades", "trading_trades", "sum", ("date", "count")),
+    ("game_commits", "game_commits", "sum", ("date", "count")),
+    ("coach_score_avg", "coach_score", "mean", None),
+    ("coach_impulses", "coach_impulses", "sum", None),
+    ("checkins_count", "checkins_count", "sum", ("date", "count")),
+    ("checkins_intensity_avg", "checkins_intensity_avg", "mean", ("score", "mean")),
+]
+
+
+def day_ordinal(values: Any) -> np.ndarray:
+    """Fechas (date, datetime, Timestamp o texto ISO) → días desde 1970-01-01 (int64; NAT si no es fecha)."""
+    days = pd.to_datetime(pd.Series(values), errors="coerce").to_numpy().astype("datetime64[D]")
+    return days.astype(np.int64)
+
+
+def _month_index(ords: np.ndarray) -> np.ndarray:
+    """Meses desde 1970-01."""
+    return ords.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def _week_key(ords: np.ndarray, anchor: int) -> np.ndarray:
+    # 1970-01-01 fue jueves: (ord + 3) % 7 da 0 = lunes. La semana ISO es la del año de su jueves.
+    thursday = ords - (ords + 3) % 7 + 3
+    year = thursday.astype("datetime64[D]").astype("datetime64[Y]")
+    week = (thursday - year.astype("datetime64[D]").astype(np.int64)) // 7 + 1
+    return (year.astype(np.int64) + 1970) * 100 + week
+
+
+def _week_label(key: int, anchor: int) -> str:
+    return f"{key // 100}-W{key % 100:02d}"
+
+
+def _month_label(key: int, anchor: int) -> str:
+    return f"{1970 + key // 12}-{key % 12 + 1:02d}"
+
+
+def _quarter_label(key: int, anchor: int) -> str:
+    return f"{1970 + key // 4}-Q{key % 4 + 1}"
+
+
+def _cycle_label(key: int, anchor: int) -> str:
+    # el ciclo se nombra por su primer día
+    return str(np.datetime64(int(anchor + key * COACH_CYCLE_DAYS), "D"))
+
+
+# período → (ordinales → clave entera, clave → etiqueta); el orden de las claves es el de las etiquetas
+PERIODS: Dict[str, Tuple[Callable[[np.ndarray, int], np.ndarray], Callable[[int, int], str]]] = {
+    "week": (_week_key, _week_label),
+    "month": (lambda o, a: _month_index(o), _month_label),
+    "quarter": (lambda o, a: _month_index(o) // 3, _quarter_label),
+    "coach21": (lambda o, a: (o - a) // COACH_CYCLE_DAYS, _cycle_label),
+}
+
+
+def _anchor(ords: np.ndarray, anchor: Any) -> int:
+    if anchor is not None:
+        return int(day_ordinal([anchor])[0])
+    valid = ords[ords != NAT]
+    return int(valid.min()) if len(valid) else 0
+
+
+def period_ids(dates: Any, period: str, anchor: Any = None) -> pd.Series:
+    """Etiqueta del período de cada fecha ("2024-W03", "2024-01", "2024-Q1", "2024-01-08"); NaN si no es fecha."""
+    ords = day_ordinal(dates)
+    index = dates.index if isinstance(dates, pd.Series) else None
+    out = pd.Series(np.nan, index=index if index is not None else range(len(ords)), dtype="object")
+    valid = ords != NAT
+    if valid.any():
+        key_fn, label_fn = PERIODS[period]
+        base = _anchor(ords, anchor)
+        keys, inverse = np.unique(key_fn(ords[valid], base), return_inverse=True)
+        labels = np.array([label_fn(int(k), base) for k in keys], dtype=object)
+        out[valid] = labels[inverse]
+    return out.astype("str") if valid.all() else out
+
+
+@dataclass
+class DayPartials:
+    ordinals: np.ndarray  # días únicos, ordenados
+    rows: np.ndarray  # filas por día
+    sums: Dict[str, np.ndarray]  # fuente → suma por día (los NaN no suman)
+    counts: Dict[str, np.ndarray]  # fuente → valores no nulos por día (solo fuentes de mean/count)
+    integral: Set[str]  # fuentes enteras/bool: sus sumas vuelven como int64
+    spec: List[Tuple[str, str, str]]
+
+
+def resolve_spec(columns: Any) -> List[Tuple[str, str, str]]:
+    """AGG_SPEC con las alternativas aplicadas según las columnas presentes."""
+    present = set(columns)
+    return [
+        (out, src, how) if src in present or fallback is None else (out, *fallback)
+        for out, src, how, fallback in AGG_SPEC
+    ]
+
+
+def day_partials(merged: pd.DataFrame) -> DayPartials:
+    """Sumas y conteos por día de todas las fuentes de AGG_SPEC (una pasada sobre la tabla diaria)."""
+    spec = resolve_spec(merged.columns)
+    ords = day_ordinal(merged["date"]) if len(merged) else np.empty(0, dtype=np.int64)
+    valid = ords != NAT
+    days, inverse = np.unique(ords[valid], return_inverse=True)
+    n = len(days)
+
+    sums: Dict[str, np.ndarray] = {}
+    counts: Dict[str, np.ndarray] = {}
+    integral: Set[str] = set()
+    counted = {src for _, src, how in spec if how != "sum"}  # los conteos solo hacen falta para mean/count
+    for src in {src for _, src, _ in spec if src != "date"}:
+        col = merged[src]
+        if pd.api.types.is_bool_dtype(col) or pd.api.types.is_integer_dtype(col):
+            integral.add(src)
+        values = pd.to_numeric(col, errors="coerce").to_numpy(dtype=float, na_value=np.nan)[valid]
+        present = ~np.isnan(values)
+        sums[src] = np.bincount(inverse, weights=np.where(present, values, 0.0), minlength=n)
+        if src in counted:
+            counts[src] = np.bincount(inverse, weights=present.astype(float), minlength=n).astype(np.int64)
+
+    rows = np.bincount(inverse, minlength=n).astype(np.int64)
+    return DayPartials(ordinals=days, rows=rows, sums=sums, counts=counts, integral=integral, spec=spec)
+
+
+def rollup(partials: DayPartials, period: str, anchor: Any = None) -> pd.DataFrame:
+    """
+    Tabla por período (columna `period` + columnas de AGG_SPEC), ordenada.
+    anchor: primer día del ciclo para "coach21" (por defecto, la primera fecha).
+    """
+    key_fn, label_fn = PERIODS[period]
+    base = _anchor(partials.ordinals, anchor)
+    keys, inverse = np.unique(key_fn(partials.ordinals, base), return_inverse=True)
+    n = len(keys)
+
+    def acc(values: np.ndarray) -> np.ndarray:
+        return np.bincount(inverse, weights=values, minlength=n)
+
+    table: Dict[str, Any] = {period: pd.Series([label_fn(int(k), base) for k in keys], dtype="str")}
+    for out, src, how in partials.spec:
+        if src == "date" or how == "count":
+            counted = partials.rows if src == "date" else partials.counts[src]
+            table[out] = acc(counted).astype(np.int64)
+            continue
+        total = acc(partials.sums[src])
+        if how == "sum":
+            table[out] = total.astype(np.int64) if src in partials.integral else total
+        else:
+            count = acc(partials.counts[src])
+            with np.errstate(invalid="ignore", divide="ignore"):
+                table[out] = np.where(count > 0, total / np.where(count > 0, count, 1), np.nan)
+    return pd.DataFrame(table)
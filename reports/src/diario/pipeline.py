@@ -0,0 +1,90 @@
+"""
+pipeline.py
+Etapas del reporte a partir de un KPIBundle ya calculado: heatmap, páginas de
+periodo, IA (en paralelo, es una llamada de red) e index.html. La usan cli.main
+y el daemon de serve.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from .render import render_heatmap, render_index, render_period_pages
+
+
+def _timed(timings: dict[str, float], name: str, fn: Callable[..., Any], *a: Any, **kw: Any) -> Any:
+    t0 = time.perf_counter()
+    try:
+        return fn(*a, **kw)
+    finally:
+        timings[name] = time.perf_counter() - t0
+
+
+def run_ai(args: argparse.Namespace, kpis: Any, data: Any, out_dir: Path) -> None:
+    if args.ai_backfill > 0:
+        from .ai import generate_ai_backfill
+
+        generate_ai_backfill(
+            kpis=kpis,
+            data_bundle=data,
+            tz=args.tz,
+            weeks_back=range(args.ai_weeks_back, args.ai_weeks_back + args.ai_backfill),
+            out_dir=out_dir,
+            lang=args.ai_lang,
+            cache_dir=args.ai_cache_dir,
+            workers=args.ai_workers,
+            token_budget=args.ai_token_budget,
+            stream=args.ai_stream == "on",
+        )
+    else:
+        from .ai import generate_weekly_ai_insights
+
+        generate_weekly_ai_insights(
+            kpis=kpis,
+            data_bundle=data,
+            tz=args.tz,
+            weeks_back=args.ai_weeks_back,
+            out_dir=out_dir,
+            lang=args.ai_lang,
+            cache_dir=args.ai_cache_dir,
+            token_budget=args.ai_token_budget,
+            stream=args.ai_stream == "on",
+        )
+
+
+def render_report(args: argparse.Namespace, kpis: Any, data: Any, out_dir: Path) -> Dict[str, Any]:
+    """
+    Genera el reporte en out_dir; retorna {"rendered", "skipped", "timings"}.
+    La IA corre en paralelo con heatmap y páginas de periodo; solo index.html
+    necesita assets/ai_weekly.json.
+    """
+    timings: Dict[str, float] = {}
+    t_report = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        ai_future = pool.submit(_timed, timings, "ai", run_ai, args, kpis, data, out_dir) if args.ai == "on" else None
+
+        heatmap_rel = _timed(
+            timings, "heatmap", render_heatmap, out_dir, kpis, backend=args.heatmap_backend, days=args.heatmap_days
+        )
+        stats = _timed(timings, "pages", render_period_pages, out_dir, kpis, jobs=args.jobs, force=args.force)
+
+        if ai_future is not None:
+            t0 = time.perf_counter()
+            ai_future.result()
+            timings["ai_wait"] = time.perf_counter() - t0
+            if args.ai_backfill > 0:
+                # insights por semana: el manifest re-renderiza solo las páginas que cambiaron
+                again = _timed(timings, "pages_ai", render_period_pages, out_dir, kpis, jobs=args.jobs)
+                print(f"Páginas con insights IA: {again['rendered']} re-renderizadas")
+
+        _timed(timings, "index", render_index, out_dir, kpis, args.tz, heatmap_rel=heatmap_rel)
+
+    timings["report"] = time.perf_counter() - t_report
+    print("Etapas: " + ", ".join(f"{name} {secs:.2f}s" for name, secs in timings.items()))
+    print(f"Páginas: {stats['rendered']} renderizadas, {stats['skipped']} sin cambios (omitidas)")
+    return {**stats, "timings": timings}
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+import hashlib
 import json
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 import pandas as pd
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+from .json_safe import dumps as json_dumps_safe
 from .scoring import KPIBundle
-from .viz import make_heatmap_png
+from .viz import HEATMAP_BACKENDS, HEATMAP_DAYS, heatmap_window
 
 
 def _env() -> Environment:
@@ -19,43 +22,141 @@ def _env() -> Environment:
     )
 
 
+@lru_cache(maxsize=None)
+def _process_env() -> Environment:
+    # Un Environment por proceso (los workers del pool no comparten el del padre)
+    return _env()
+
+
+def _period_template():
+    # Sin cachear el Template: el cache de Jinja revisa uptodate (mtime) en cada
+    # get_template, así `serve` ve las ediciones de period.html.j2
+    return _process_env().get_template("period.html.j2")
+
+
+def _column_values(s: pd.Series) -> list[Any]:
+    """Valores de una columna listos para Jinja: NaN/NA/NaT → None, fechas → isoformat."""
+    values = s.tolist()
+    missing = s.isna().to_numpy()
+
+    if pd.api.types.is_datetime64_any_dtype(s.dtype) or pd.api.types.is_timedelta64_dtype(s.dtype):
+        return [None if m else v.isoformat() for v, m in zip(values, missing)]
+
+    if s.dtype == object:
+        return [
+            None if m
+            else v.isoformat() if hasattr(v, "isoformat") and not isinstance(v, str)
+            else v
+            for v, m in zip(values, missing)
+        ]
+
+    if missing.any():
+        return [None if m else v for v, m in zip(values, missing)]
+    return values
+
+
 def _to_records(df: pd.DataFrame, limit: int | None = None) -> list[dict[str, Any]]:
     if df is None or df.empty:
         return []
     if limit is not None:
         df = df.tail(limit)
 
-    out = []
-    for _, row in df.iterrows():
-        rec = {}
-        for k, v in row.items():
-            if isinstance(v, (pd.Timestamp,)):
-                rec[k] = v.isoformat()
-            elif hasattr(v, "isoformat") and not isinstance(v, (str, int, float, bool)) and v is not None:
-                try:
-                    rec[k] = v.isoformat()
-                except Exception:
-                    rec[k] = str(v)
-            elif isinstance(v, (list, dict)):
-                rec[k] = v
-            else:
-                try:
-                    rec[k] = None if pd.isna(v) else v
-                except (TypeError, ValueError):
-                    rec[k] = v
-        out.append(rec)
+    keys = list(df.columns)
+    columns = [_column_values(df.iloc[:, i]) for i in range(len(keys))]
+    return [dict(zip(keys, row)) for row in zip(*columns)]
+
+
+def _groups(daily: pd.DataFrame, key: str) -> dict[Any, pd.DataFrame]:
+    # Un solo groupby por clave en vez de una máscara booleana por periodo
+    if daily is None or daily.empty or key not in daily.columns:
+        return {}
+    return dict(iter(daily.groupby(key, sort=False)))
+
+
+def _period_pages(
+    kpis: KPIBundle, ai_by_week: Optional[dict[str, Any]] = None
+) -> list[tuple[str, dict[str, Any]]]:
+    """(nombre de archivo, contexto del template) para cada página semanal y mensual."""
+    pages: list[tuple[str, dict[str, Any]]] = []
+    ai_by_week = ai_by_week or {}
+
+    weeks = _groups(kpis.daily_table, "week")
+    for w in kpis.weekly_table["week"].tolist():
+        context = {"title": f"Weekly report {w}", "period": w, "rows": _to_records(weeks.get(w))}
+        if w in ai_by_week:  # entra al hash: insights nuevos re-renderizan la página
+            context["ai"] = ai_by_week[w]
+        pages.append((f"weekly_{w}.html", context))
+
+    months = _groups(kpis.daily_table, "month")
+    for m in kpis.monthly_table["month"].tolist():
+        pages.append(
+            (f"monthly_{m}.html", {"title": f"Monthly report {m}", "period": m, "rows": _to_records(months.get(m))})
+        )
+    return pages
+
+
+def _load_ai_by_week(assets: Path) -> dict[str, Any]:
+    """assets/ai_weekly_{semana}.json (ver ai.generate_ai_backfill) → {semana: insights}."""
+    out: dict[str, Any] = {}
+    for path in sorted(assets.glob("ai_weekly_*.json")):
+        try:
+            out[path.stem[len("ai_weekly_"):]] = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            continue
     return out
 
 
-def render_all(out_dir: Path, kpis: KPIBundle, data: Any, tz: str) -> None:
-    env = _env()
+MANIFEST_NAME = ".render_manifest.json"
+
+
+def _template_hash(env: Environment, name: str) -> str:
+    source, _, _ = env.loader.get_source(env, name)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def _page_hash(template_hash: str, context: dict[str, Any]) -> str:
+    h = hashlib.sha256(template_hash.encode("utf-8"))
+    h.update(json_dumps_safe(context).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _load_manifest(out_dir: Path) -> dict[str, str]:
+    path = out_dir / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    try:
+        pages = json.loads(path.read_text(encoding="utf-8")).get("pages", {})
+    except Exception:
+        return {}
+    return pages if isinstance(pages, dict) else {}
+
+
+def _save_manifest(out_dir: Path, pages: dict[str, str]) -> None:
+    path = out_dir / MANIFEST_NAME
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps({"version": 1, "pages": pages}, indent=1, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _write_page(out_dir: Path, page: tuple[str, dict[str, Any]]) -> None:
+    name, context = page
+    (out_dir / name).write_text(_period_template().render(**context), encoding="utf-8")
 
+
+def render_heatmap(
+    out_dir: Path, kpis: KPIBundle, backend: str = "matplotlib", days: int = HEATMAP_DAYS
+) -> str:
+    """Escribe el heatmap de los últimos `days` días con el backend elegido; retorna la ruta relativa."""
     assets = out_dir / "assets"
     assets.mkdir(exist_ok=True, parents=True)
+    make, filename = HEATMAP_BACKENDS[backend]
+    make(heatmap_window(kpis.heatmap, days), assets / filename)
+    return f"assets/{filename}"
+
 
-    # Heatmap image
-    heatmap_path = assets / "heatmap.png"
-    make_heatmap_png(kpis.heatmap, heatmap_path)
+def render_index(out_dir: Path, kpis: KPIBundle, tz: str, heatmap_rel: str = "assets/heatmap.png") -> None:
+    """index.html; incluye assets/ai_weekly.json si existe (por eso va al final del pipeline)."""
+    assets = out_dir / "assets"
 
     # Load AI if exists
     ai_weekly = None
@@ -66,11 +167,11 @@ def render_all(out_dir: Path, kpis: KPIBundle, data: Any, tz: str) -> None:
         except Exception:
             ai_weekly = None
 
-    tpl = env.get_template("index.html.j2")
+    tpl = _env().get_template("index.html.j2")
     html = tpl.render(
         meta=kpis.meta,
         tz=tz,
-        heatmap_rel="assets/heatmap.png",
+        heatmap_rel=heatmap_rel,
         ai_weekly=ai_weekly,
         daily=_to_records(kpis.daily_table, limit=30),
         weekly=_to_records(kpis.weekly_table),
@@ -78,21 +179,54 @@ def render_all(out_dir: Path, kpis: KPIBundle, data: Any, tz: str) -> None:
     )
     (out_dir / "index.html").write_text(html, encoding="utf-8")
 
-    weekly_tpl = env.get_template("period.html.j2")
-    for w in kpis.weekly_table["week"].tolist():
-        dfw = kpis.daily_table[kpis.daily_table["week"] == w].copy()
-        page = weekly_tpl.render(
-            title=f"Weekly report {w}",
-            period=w,
-            rows=_to_records(dfw),
-        )
-        (out_dir / f"weekly_{w}.html").write_text(page, encoding="utf-8")
 
-    for m in kpis.monthly_table["month"].tolist():
-        dfm = kpis.daily_table[kpis.daily_table["month"] == m].copy()
-        page = weekly_tpl.render(
-            title=f"Monthly report {m}",
-            period=m,
-            rows=_to_records(dfm),
-        )
-        (out_dir / f"monthly_{m}.html").write_text(page, encoding="utf-8")
+def render_period_pages(out_dir: Path, kpis: KPIBundle, jobs: int = 1, force: bool = False) -> dict[str, int]:
+    """
+    Páginas weekly_/monthly_. Solo se reescriben si cambió el hash de su
+    contexto (filas + insights IA de la semana) o del template (ver
+    .render_manifest.json); force=True las rehace todas.
+    """
+    assets = out_dir / "assets"
+    assets.mkdir(exist_ok=True, parents=True)
+
+    template_hash = _template_hash(_env(), "period.html.j2")
+    previous = {} if force else _load_manifest(out_dir)
+    manifest: dict[str, str] = {}
+    pages = []
+    for page in _period_pages(kpis, _load_ai_by_week(assets)):
+        name, context = page
+        manifest[name] = _page_hash(template_hash, context)
+        if previous.get(name) != manifest[name] or not (out_dir / name).exists():
+            pages.append(page)
+
+    if jobs > 1 and len(pages) > 1:
+        from concurrent.futures import ProcessPoolExecutor  # lazy import: multiprocessing
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(pages) // (jobs * 4))
+            list(pool.map(_write_page, [out_dir] * len(pages), pages, chunksize=chunksize))
+    else:
+        for page in pages:
+            _write_page(out_dir, page)
+
+    _save_manifest(out_dir, manifest)
+    return {"rendered": len(pages), "skipped": len(manifest) - len(pages)}
+
+
+def render_all(
+    out_dir: Path,
+    kpis: KPIBundle,
+    data: Any,
+    tz: str,
+    jobs: int = 1,
+    force: bool = False,
+    heatmap_backend: str = "matplotlib",
+    heatmap_days: int = HEATMAP_DAYS,
+) -> dict[str, int]:
+    """
+    Genera index.html + páginas weekly_/monthly_ (ver render_period_pages).
+    cli.main llama las etapas por separado para solaparlas con la IA.
+    """
+    heatmap_rel = render_heatmap(out_dir, kpis, backend=heatmap_backend, days=heatmap_days)
+    render_index(out_dir, kpis, tz, heatmap_rel=heatmap_rel)
+    return render_period_pages(out_dir, kpis, jobs=jobs, force=force)
@@ -0,0 +1,212 @@
+"""
+schema.py
+Tipos compactos para las tablas del DataBundle, aplicados una vez al cargar.
+
+Todas las fuentes (Excel, Sheets, Supabase) entregan columnas object; aquí
+se pasan a los tipos de las migraciones (apps-script/migrations):
+- enums SQL → category con las categorías del enum (fuera del enum → NA, como
+  _to_enum en migrate_to_supabase)
+- SMALLINT/INTEGER → enteros nulables chicos (Int8/Int32); si hay decimales
+  o valores fuera de rango la columna queda en float64/Int64, sin pérdida
+- BOOLEAN → boolean nulable (true/1/yes/si/sí, false/0/no)
+- DATE → datetime64 a medianoche (pandas no tiene resolución de día; [s] es
+  la más gruesa)
+Las columnas que no están en TABLE_SCHEMAS (texto libre, JSONB, timestamps)
+quedan como vienen. apply_schema imprime la memoria antes/después por tabla.
+"""
+
+from __future__ import annotations
+
+import warnings
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Enums de las migraciones (mismo orden que CREATE TYPE). Fuente única: migrate_to_supabase
+# arma sus *_VALUES desde aquí.
+MOOD_ENUM = (
+    "calma", "enfocado", "energético", "confianza", "motivado",
+    "neutral", "estable", "cansado", "disperso", "ansioso",
+    "inquieto", "irritable", "frustrado", "abrumado", "vulnerable",
+    "impulsivo", "desanimado", "gratitud",
+)
+FOCUS_TYPE_ENUM = ("trading", "project", "work", "lectura", "estudio", "none")
+ALCOHOL_CONTEXT_ENUM = ("social", "solo", "unknown")
+STALK_INTENSITY_ENUM = ("low", "mid", "high", "none")
+POMO_EVENT_ENUM = ("start", "end")
+POMO_PHASE_ENUM = ("work", "short_break", "long_break")
+COACH_LEVEL_ENUM = ("suave", "estandar", "desafiante")
+COACH_TIER_ENUM = ("valid", "fragile", "reset_alcohol", "reset_score")
+EV_STATUS_ENUM = ("RECEIVED", "SAVED_TO_DRIVE", "TRANSCRIBED", "ANALYZED", "REPLIED", "FAILED")
+
+DATE_DTYPE = "datetime64[s]"
+
+_BOOL_MAP = {"true": True, "1": True, "yes": True, "si": True, "sí": True, "false": False, "0": False, "no": False}
+
+# tabla → columna → tipo: "date", "boolean", "Int8"/"Int16"/"Int32" o tupla de enum.
+# stalk_intensity no va como enum: scoring acepta "medium" (fuera del enum SQL).
+TABLE_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "daily": {
+        "date": "date",
+        "energy": "Int8",
+        "mood": MOOD_ENUM,
+        "focus_type": FOCUS_TYPE_ENUM,
+        "focus_minutes": "Int32",
+        "alcohol_consumed": "boolean",
+        "alcohol_context": ALCOHOL_CONTEXT_ENUM,
+        "stalk_occurred": "boolean",
+        "trading_trades": "Int32",
+        "game_commits": "Int32",
+        "feature_done": "boolean",
+    },
+    "checkins": {
+        "date": "date",
+        "intensity_0_10": "Int8",
+    },
+    "pomodoro": {
+        "date": "date",
+        "event": POMO_EVENT_ENUM,
+        "phase": POMO_PHASE_ENUM,
+        "cycle": "Int8",
+    },
+    "coach": {
+        "date": "date",
+        "level": COACH_LEVEL_ENUM,
+        "start_iso": "date",
+        "day90": "Int8",
+        "week_1_12": "Int8",
+        "cycle21_1_4": "Int8",
+        "day21_1_21": "Int8",
+        "train_day14_1_14": "Int8",
+        "score_0_6": "Int8",
+        "tier": COACH_TIER_ENUM,
+        "alcohol_bool": "boolean",
+        "impulses_count": "Int32",
+        "workout_done": "boolean",
+        "read_done": "boolean",
+        "voice_done": "boolean",
+        "english_done": "boolean",
+        "story_done": "boolean",
+        "ritual_done": "boolean",
+    },
+}
+
+_INT_WIDTHS = ("Int8", "Int16", "Int32", "Int64")
+
+
+def _by_unique(s: pd.Series, fn) -> tuple[np.ndarray, np.ndarray]:
+    """(códigos por fila, fn aplicada a cada valor distinto): el texto se normaliza una vez por valor."""
+    if s.dtype == object:
+        # factorize junta True, 1 y 1.0 en un solo valor: se agrupa por su texto ("true", "1", "1.0")
+        s = s.astype(str).mask(s.isna())
+    codes, uniques = pd.factorize(s)
+    labels = pd.Series(uniques, dtype=object).astype(str).str.strip().str.lower()
+    return codes, np.array([fn(v) for v in labels], dtype=object)
+
+
+def _day(value: Any) -> pd.Timestamp:
+    """Un valor suelto con el parser escalar de pandas (como _to_date_str del migrador); NaT si no es fecha."""
+    try:
+        ts = pd.to_datetime(value.strip() if isinstance(value, str) else value)
+    except (ValueError, TypeError, OverflowError):
+        return pd.NaT
+    if pd.isna(ts):
+        return pd.NaT
+    return ts.tz_localize(None) if ts.tzinfo is not None else ts
+
+
+def _to_date(s: pd.Series) -> pd.Series:
+    codes, uniques = pd.factorize(s)  # se parsea cada fecha distinta una vez
+    values = pd.Series(uniques, dtype=object)
+    try:
+        dt = pd.to_datetime(values, errors="coerce", format="ISO8601")
+        if getattr(dt.dt, "tz", None) is not None:
+            dt = dt.dt.tz_localize(None)
+    except (ValueError, TypeError):  # zonas horarias mezcladas: todo por el parser escalar
+        dt = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    # formatos no ISO (dd/mm/yyyy, date/datetime sueltos...) se reintentan valor por valor
+    missed = dt.isna().to_numpy()
+    if missed.any():
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)  # aviso de dayfirst del parser escalar
+            retry = pd.to_datetime(pd.Series([_day(v) for v in values[missed]], dtype=object))
+        dt = dt.astype("datetime64[ns]")
+        dt[missed] = retry.to_numpy(dtype="datetime64[ns]")
+    days = np.append(dt.dt.normalize().astype(DATE_DTYPE).to_numpy(), np.datetime64("NaT", "s"))
+    return pd.Series(days[codes], index=s.index)
+
+
+def _to_boolean(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_bool_dtype(s):
+        return s.astype("boolean")
+    codes, mapped = _by_unique(s, _BOOL_MAP.get)
+    values = np.append(mapped, None)[codes]  # código -1 (NA) → None
+    return pd.Series(pd.array(values, dtype="boolean"), index=s.index)
+
+
+def _to_int(s: pd.Series, dtype: str) -> pd.Series:
+    num = pd.to_numeric(s, errors="coerce")
+    values = num.to_numpy(dtype=float, na_value=np.nan)
+    finite = values[~np.isnan(values)]
+    if len(finite) and not np.array_equal(finite, np.round(finite)):
+        return num.astype("float64")  # decimales: no se trunca
+    for width in _INT_WIDTHS[_INT_WIDTHS.index(dtype):]:
+        info = np.iinfo(width.lower())
+        if not len(finite) or (finite.min() >= info.min and finite.max() <= info.max):
+            return num.astype(width)
+    return num.astype("Int64")
+
+
+def _to_enum(s: pd.Series, values: Tuple[str, ...]) -> Tuple[pd.Series, int]:
+    codes, positions = _by_unique(s, lambda v: values.index(v) if v in values else -1)
+    cat_codes = np.append(positions, -1).astype(np.int64)[codes]
+    out = pd.Series(pd.Categorical.from_codes(cat_codes, categories=list(values)), index=s.index)
+    return out, int(((codes >= 0) & (cat_codes < 0)).sum())
+
+
+def coerce_table(name: str, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """(tabla con los tipos de TABLE_SCHEMAS, {columna enum: valores fuera del enum})."""
+    schema = TABLE_SCHEMAS.get(name, {})
+    columns: Dict[str, pd.Series] = {}
+    dropped: Dict[str, int] = {}
+    for col, kind in schema.items():
+        if col not in df.columns:
+            continue
+        s = df[col]
+        if isinstance(kind, tuple):
+            columns[col], lost = _to_enum(s, kind)
+            if lost:
+                dropped[col] = lost
+        elif kind == "date":
+            columns[col] = _to_date(s)
+        elif kind == "boolean":
+            columns[col] = _to_boolean(s)
+        else:
+            columns[col] = _to_int(s, kind)
+    if not columns:
+        return df, dropped
+    typed = df.copy(deep=False)  # reemplaza columnas enteras: el resto se comparte sin copiar
+    for col, values in columns.items():
+        typed[col] = values
+    return typed, dropped
+
+
+def _kb(df: pd.DataFrame) -> float:
+    return df.memory_usage(index=True, deep=True).sum() / 1e3
+
+
+def apply_schema(bundle: Any, report: bool = True) -> Any:
+    """Tipa cada tabla del DataBundle (in place) y lo devuelve."""
+    for name in TABLE_SCHEMAS:
+        df = getattr(bundle, name, None)
+        if df is None or df.empty:
+            continue
+        before = _kb(df) if report else 0.0
+        typed, dropped = coerce_table(name, df)
+        setattr(bundle, name, typed)
+        if report:
+            print(f"  Tipos '{name}': {len(typed)} filas, {before:.1f} KB → {_kb(typed):.1f} KB")
+            for col, lost in dropped.items():
+                print(f"    {col}: {lost} valor(es) fuera del enum → NA")
+    return bundle
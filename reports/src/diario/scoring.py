@@ -3,24 +3,43 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, Any
 
+import numpy as np
 import pandas as pd
 
 from .loaders import DataBundle
+from .periods import day_partials, period_ids, rollup
 
 
 def _coerce_date(df: pd.DataFrame, col: str = "date") -> pd.Series:
-    return pd.to_datetime(df[col], errors="coerce").dt.date
+    """datetime.date por fila, compartiendo un objeto por día distinto (no uno por fila)."""
+    values = df[col]
+    if not pd.api.types.is_datetime64_any_dtype(values):  # si no, ya tipada por schema.apply_schema
+        values = pd.to_datetime(values, errors="coerce")
+    codes, uniques = pd.factorize(values)
+    days = np.append(pd.DatetimeIndex(uniques).date, pd.NaT)  # código -1 → NaT
+    return pd.Series(days[codes], index=df.index, name=col)
+
+
+def _numeric(s: pd.Series) -> pd.Series:
+    """Numérico con NumPy: los enteros nulables (Int8…) pasan a int64, o a float64 si tienen NA."""
+    s = pd.to_numeric(s, errors="coerce")
+    if isinstance(s.dtype, pd.api.extensions.ExtensionDtype):
+        return s.astype("float64") if s.isna().any() else s.astype("int64")
+    return s
+
+
+def _boolean(s: pd.Series, bool_map: Dict[str, bool]) -> pd.Series:
+    if pd.api.types.is_bool_dtype(s):  # bool o boolean nulable (schema)
+        return s.fillna(False).astype(bool)
+    return s.astype(str).str.strip().str.lower().map(bool_map).fillna(False)
 
 
 def _week_id(d: pd.Series) -> pd.Series:
-    dtidx = pd.to_datetime(d.astype(str), errors="coerce")
-    iso = dtidx.dt.isocalendar()
-    return iso["year"].astype(str) + "-W" + iso["week"].astype(str).str.zfill(2)
+    return period_ids(d, "week")
 
 
 def _month_id(d: pd.Series) -> pd.Series:
-    dtidx = pd.to_datetime(d.astype(str), errors="coerce")
-    return dtidx.dt.strftime("%Y-%m")
+    return period_ids(d, "month")
 
 
 def _col(merged: pd.DataFrame, name: str, default: float = 0.0) -> pd.Series:
@@ -38,16 +57,20 @@ class KPIBundle:
     meta: Dict[str, Any]
 
 
-def build_kpis(data: DataBundle, tz: str = "America/Santiago") -> KPIBundle:
+def _daily_table(data: DataBundle) -> pd.DataFrame:
+    """Tabla diaria unificada (daily + pomodoro + checkins + coach) con score, week y month."""
     # -------------------------
     # DAILY normalization
     # -------------------------
-    daily = data.daily.copy()
+    # copia superficial: solo se reemplazan columnas enteras, el DataBundle no cambia
+    # y las columnas de texto (notes, raw) no se duplican
+    daily = data.daily.copy(deep=False)
     if "date" not in daily.columns:
         raise ValueError("Daily sheet must include a 'date' column")
 
     daily["date"] = _coerce_date(daily, "date")
-    daily = daily.dropna(subset=["date"])
+    if daily["date"].isna().any():
+        daily = daily.dropna(subset=["date"])
 
     num_cols = [
         "sleep_hours",
@@ -59,7 +82,7 @@ def build_kpis(data: DataBundle, tz: str = "America/Santiago") -> KPIBundle:
     ]
     for c in num_cols:
         if c in daily.columns:
-            daily[c] = pd.to_numeric(daily[c], errors="coerce")
+            daily[c] = _numeric(daily[c])
 
     bool_map = {
         "true": True,
@@ -73,14 +96,7 @@ def build_kpis(data: DataBundle, tz: str = "America/Santiago") -> KPIBundle:
     }
     for c in ["alcohol_consumed", "stalk_occurred", "feature_done"]:
         if c in daily.columns:
-            daily[c] = (
-                daily[c]
-                .astype(str)
-                .str.strip()
-                .str.lower()
-                .map(bool_map)
-                .fillna(False)
-            )
+            daily[c] = _boolean(daily[c], bool_map)
 
     # stalk intensity label + numeric
     if "stalk_intensity" in daily.columns:
@@ -108,7 +124,7 @@ def build_kpis(data: DataBundle, tz: str = "America/Santiago") -> KPIBundle:
     # -------------------------
     # Pomodoro: minutes per day
     # -------------------------
-    pomo = data.pomodoro.copy()
+    pomo = data.pomodoro.copy(deep=False)
     if "date" in pomo.columns:
         pomo["date"] = _coerce_date(pomo, "date")
         pomo = pomo.dropna(subset=["date"])
@@ -130,7 +146,7 @@ def build_kpis(data: DataBundle, tz: str = "America/Santiago") -> KPIBundle:
     # -------------------------
     # Checkins: average intensity per day
     # -------------------------
-    chk = data.checkins.copy()
+    chk = data.checkins.copy(deep=False)
     if "date" in chk.columns:
         chk["date"] = _coerce_date(chk, "date")
         chk = chk.dropna(subset=["date"])
@@ -138,7 +154,7 @@ def build_kpis(data: DataBundle, tz: str = "America/Santiago") -> KPIBundle:
         chk = pd.DataFrame(columns=["date", "question", "intensity_0_10", "answer_raw"])
 
     if "intensity_0_10" in chk.columns:
-        chk["intensity_0_10"] = pd.to_numeric(chk["intensity_0_10"], errors="coerce")
+        chk["intensity_0_10"] = _numeric(chk["intensity_0_10"])
 
     if not chk.empty and {"question"}.issubset(chk.columns):
         chk_daily = chk.groupby("date").agg(
@@ -151,7 +167,7 @@ def build_kpis(data: DataBundle, tz: str = "America/Santiago") -> KPIBundle:
     # -------------------------
     # Coach: per-day metrics (score_0_6, impulses_count)
     # -------------------------
-    coach = data.coach.copy()
+    coach = data.coach.copy(deep=False)
     if coach is None or coach.empty or "date" not in coach.columns:
         coach_daily = pd.DataFrame(columns=["coach_score", "coach_impulses", "coach_alcohol_days"])
     else:
@@ -160,17 +176,15 @@ def build_kpis(data: DataBundle, tz: str = "America/Santiago") -> KPIBundle:
 
         # names from your Coach sheet
         if "score_0_6" in coach.columns:
-            coach["score_0_6"] = pd.to_numeric(coach["score_0_6"], errors="coerce")
+            coach["score_0_6"] = _numeric(coach["score_0_6"])
         if "impulses_count" in coach.columns:
-            coach["impulses_count"] = pd.to_numeric(coach["impulses_count"], errors="coerce")
+            coach["impulses_count"] = _numeric(coach["impulses_count"])
 
         # alcohol can be boolish
         if "alcohol_bool" in coach.columns:
-            coach["alcohol_bool"] = (
-                coach["alcohol_bool"]
-                .astype(str).str.strip().str.lower()
-                .map({"true": True, "false": False, "1": True, "0": False, "si": True, "sí": True, "no": False})
-                .fillna(False)
+            coach["alcohol_bool"] = _boolean(
+                coach["alcohol_bool"],
+                {"true": True, "false": False, "1": True, "0": False, "si": True, "sí": True, "no": False},
             )
         else:
             coach["alcohol_bool"] = False
@@ -184,13 +198,13 @@ def build_kpis(data: DataBundle, tz: str = "America/Santiago") -> KPIBundle:
     # -------------------------
     # Merge daily + pomo + checkins + coach
     # -------------------------
-    merged = (
-        daily.set_index("date")
-        .join(pomo_daily, how="left")
-        .join(chk_daily, how="left")
-        .join(coach_daily, how="left")
-        .reset_index()
-    )
+    # Columnas por fecha agregadas sobre el mismo frame (reindex por fecha):
+    # tres join() copiarían la tabla diaria entera en cada paso
+    merged = daily.reset_index(drop=True)
+    merged.insert(0, "date", merged.pop("date"))
+    for per_day in (pomo_daily, chk_daily, coach_daily):
+        for col in per_day.columns:
+            merged[col] = per_day[col].reindex(merged["date"]).to_numpy()
 
     # ensure numeric cols exist
     for col in ["pomodoro_minutes", "focus_minutes", "alcohol_units", "sleep_hours", "energy", "coach_score", "coach_impulses"]:
@@ -220,69 +234,35 @@ def build_kpis(data: DataBundle, tz: str = "America/Santiago") -> KPIBundle:
 
     merged["week"] = _week_id(pd.Series(merged["date"]))
     merged["month"] = _month_id(pd.Series(merged["date"]))
+    return merged
 
-    # Weekly aggregation
-    weekly = (
-        merged.groupby("week")
-        .agg(
-            days=("date", "count"),
-            score_avg=("score", "mean"),
-            sleep_avg=("sleep_hours", "mean"),
-            energy_avg=("energy", "mean"),
-            pomodoro_min=("pomodoro_minutes", "sum"),
-            focus_min=("focus_minutes", "sum"),
-            alcohol_units=("alcohol_units", "sum"),
-            stalk_days=("stalk_occurred_num", "sum"),
-            stalk_intensity_avg=("stalk_intensity", "mean"),
-            feature_done_days=("feature_done", "sum") if "feature_done" in merged.columns else ("date", "count"),
-            trading_trades=("trading_trades", "sum") if "trading_trades" in merged.columns else ("date", "count"),
-            game_commits=("game_commits", "sum") if "game_commits" in merged.columns else ("date", "count"),
-            coach_score_avg=("coach_score", "mean"),
-            coach_impulses=("coach_impulses", "sum"),
-            checkins_count=("checkins_count", "sum") if "checkins_count" in merged.columns else ("date", "count"),
-            checkins_intensity_avg=("checkins_intensity_avg", "mean") if "checkins_intensity_avg" in merged.columns else ("score", "mean"),
-        )
-        .reset_index()
-    )
 
-    # Monthly aggregation
-    monthly = (
-        merged.groupby("month")
-        .agg(
-            days=("date", "count"),
-            score_avg=("score", "mean"),
-            sleep_avg=("sleep_hours", "mean"),
-            energy_avg=("energy", "mean"),
-            pomodoro_min=("pomodoro_minutes", "sum"),
-            focus_min=("focus_minutes", "sum"),
-            alcohol_units=("alcohol_units", "sum"),
-            stalk_days=("stalk_occurred_num", "sum"),
-            stalk_intensity_avg=("stalk_intensity", "mean"),
-            feature_done_days=("feature_done", "sum") if "feature_done" in merged.columns else ("date", "count"),
-            trading_trades=("trading_trades", "sum") if "trading_trades" in merged.columns else ("date", "count"),
-            game_commits=("game_commits", "sum") if "game_commits" in merged.columns else ("date", "count"),
-            coach_score_avg=("coach_score", "mean"),
-            coach_impulses=("coach_impulses", "sum"),
-            checkins_count=("checkins_count", "sum") if "checkins_count" in merged.columns else ("date", "count"),
-            checkins_intensity_avg=("checkins_intensity_avg", "mean") if "checkins_intensity_avg" in merged.columns else ("score", "mean"),
-        )
-        .reset_index()
-    )
+def _weekly_table(merged: pd.DataFrame) -> pd.DataFrame:
+    return _with_status(rollup(day_partials(merged), "week"))
 
-    def weekly_status(avg: float) -> str:
-        if pd.isna(avg):
-            return "—"
-        if avg >= 20:
-            return "🟢 Excelente"
-        if avg >= 16:
-            return "🟡 Bien"
-        if avg >= 12:
-            return "🟠 Irregular"
-        return "🔴 Mal"
 
-    weekly["status"] = weekly["score_avg"].apply(weekly_status)
+def _monthly_table(merged: pd.DataFrame) -> pd.DataFrame:
+    return rollup(day_partials(merged), "month")
 
-    # Heatmap
+
+def _with_status(weekly: pd.DataFrame) -> pd.DataFrame:
+    weekly["status"] = weekly["score_avg"].apply(_weekly_status)
+    return weekly
+
+
+def _weekly_status(avg: float) -> str:
+    if pd.isna(avg):
+        return "—"
+    if avg >= 20:
+        return "🟢 Excelente"
+    if avg >= 16:
+        return "🟡 Bien"
+    if avg >= 12:
+        return "🟠 Irregular"
+    return "🔴 Mal"
+
+
+def _heatmap(merged: pd.DataFrame) -> pd.DataFrame:
     heat_cols = [
         "score",
         "energy",
@@ -297,18 +277,30 @@ def build_kpis(data: DataBundle, tz: str = "America/Santiago") -> KPIBundle:
         "checkins_intensity_avg",
     ]
     heat = merged[["date"] + [c for c in heat_cols if c in merged.columns]].copy()
-    heat = heat.set_index("date").sort_index()
+    return heat.set_index("date").sort_index(kind="stable")
+
 
-    meta = {
+def _meta(merged: pd.DataFrame, tz: str) -> Dict[str, Any]:
+    return {
         "timezone": tz,
         "generated_from": "excel_or_sheets",
         "rows_daily": int(len(merged)),
     }
 
+
+def _sorted(df: pd.DataFrame, col: str) -> pd.DataFrame:
+    # Orden estable + índice limpio: la ruta incremental produce exactamente lo mismo
+    return df.sort_values(col, kind="stable").reset_index(drop=True)
+
+
+def build_kpis(data: DataBundle, tz: str = "America/Santiago") -> KPIBundle:
+    merged = _daily_table(data)
+    partials = day_partials(merged)  # sumas/conteos por día una sola vez; semana y mes salen de ahí
+
     return KPIBundle(
-        daily_table=merged.sort_values("date"),
-        weekly_table=weekly.sort_values("week"),
-        monthly_table=monthly.sort_values("month"),
-        heatmap=heat,
-        meta=meta,
+        daily_table=_sorted(merged, "date"),
+        weekly_table=_sorted(_with_status(rollup(partials, "week")), "week"),
+        monthly_table=_sorted(rollup(partials, "month"), "month"),
+        heatmap=_heatmap(merged),
+        meta=_meta(merged, tz),
     )
@@ -0,0 +1,161 @@
+"""
+serve.py
+Daemon del reporte: un proceso tibio (imports, clientes gspread/Supabase y
+KPIState en memoria) que regenera el reporte a pedido y sirve el HTML.
+
+    POST /refresh  → recarga la fuente, recalcula solo las fechas modificadas y,
+                     si hubo cambios, re-renderiza (las páginas sin cambios se
+                     omiten por el manifest). Responde JSON con el resumen.
+    GET  /status   → resumen del último refresco
+    GET  /…        → archivos de --out (index.html, weekly_*.html, assets/);
+                     rutas con un segmento que empieza por "." → 404
+                     (.render_manifest.json, un --kpi-state dentro de --out)
+
+Con SERVE_TOKEN definido, /refresh exige "Authorization: Bearer <token>"
+(p. ej. el Apps Script del bot, después de escribir una fila).
+Los refrescos se serializan; si uno empezó después de que llegó el pedido,
+se devuelve su resultado en vez de correr otro.
+
+Uso:
+    python -m src.cli --serve --source sheets --port 8787 --out output
+    curl -X POST -H "Authorization: Bearer $SERVE_TOKEN" http://127.0.0.1:8787/refresh
+"""
+
+from __future__ import annotations
+
+import argparse
+import hmac
+import json
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import unquote, urlsplit
+
+from .incremental import KPIState, load_state, save_state, update_state
+from .loaders import DataBundle, load_data
+from .pipeline import render_report
+
+
+class ReportService:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.out_dir = Path(args.out)
+        self.state: Optional[KPIState] = load_state(args.kpi_state) if args.kpi_state else None
+        self.data: Optional[DataBundle] = None
+        self.last: Optional[Dict[str, Any]] = None
+        self._last_started = float("-inf")
+        self._lock = threading.Lock()
+
+    def refresh(self) -> Dict[str, Any]:
+        requested = time.monotonic()
+        with self._lock:
+            if self.last is not None and self._last_started >= requested:
+                return {**self.last, "coalesced": True}
+            self._last_started = time.monotonic()
+            self.last = self._run()
+            return self.last
+
+    def _run(self) -> Dict[str, Any]:
+        args = self.args
+        t0 = time.perf_counter()
+        data = load_data(
+            source=args.source,
+            excel_path=args.excel_path,
+            spreadsheet_id=args.spreadsheet_id,
+            creds_path=args.creds,
+            cache_dir=args.cache_dir,
+            max_age=0,  # un refresco avisa que hay datos nuevos: el snapshot local no sirve
+            sync=args.sync,
+        )
+        t_load = time.perf_counter() - t0
+
+        first = self.data is None
+        state = update_state(self.state, data, tz=args.tz)
+        if args.kpi_state:
+            save_state(state, args.kpi_state)
+        self.state, self.data = state, data
+        print(f"KPIs incrementales: {state.dirty_dates} fecha(s) recalculada(s)")
+
+        result: Dict[str, Any] = {"dirty_dates": state.dirty_dates, "rows_daily": int(len(data.daily))}
+        if first or state.dirty_dates or not (self.out_dir / "index.html").exists():
+            result.update(render_report(args, state.kpis, data, self.out_dir))
+        else:
+            print("Sin cambios en los datos: se omite el render")
+            result.update({"rendered": 0, "skipped": None, "timings": {}})
+        result["timings"] = {"load": t_load, **result["timings"]}
+        result["seconds"] = time.perf_counter() - t0
+        return result
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    service: ReportService
+    token: str = ""
+
+    def log_message(self, fmt: str, *a: Any) -> None:
+        if not self.path.startswith("/assets/"):
+            super().log_message(fmt, *a)
+
+    def _json(self, status: int, payload: Any) -> None:
+        data = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] == "/status":
+            self._json(200, self.service.last or {})
+            return
+        super().do_GET()
+
+    def send_head(self) -> Any:
+        # GET y HEAD pasan por aquí: sin token, los archivos ocultos no se sirven
+        segments = unquote(urlsplit(self.path).path).replace("\\", "/").split("/")
+        if any(seg.startswith(".") for seg in segments):
+            self.send_error(404, "File not found")
+            return None
+        return super().send_head()
+
+    def do_POST(self) -> None:
+        if self.path.split("?")[0] != "/refresh":
+            self._json(404, {"error": "not found"})
+            return
+        if self.token and not hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {self.token}"):
+            self._json(401, {"error": "unauthorized"})
+            return
+        try:
+            self._json(200, self.service.refresh())
+        except Exception as e:  # el daemon sigue vivo; el error vuelve al que pidió el refresco
+            self._json(500, {"error": f"{type(e).__name__}: {e}"})
+
+
+def make_server(service: ReportService, host: str = "127.0.0.1", port: int = 8787) -> ThreadingHTTPServer:
+    handler = type(
+        "ReportHandler",
+        (_Handler,),
+        {"service": service, "token": os.getenv("SERVE_TOKEN", "")},
+    )
+    server = ThreadingHTTPServer((host, port), partial(handler, directory=str(service.out_dir)))
+    server.daemon_threads = True
+    return server
+
+
+def serve(args: argparse.Namespace) -> int:
+    service = ReportService(args)
+    service.refresh()  # primer render al arrancar
+
+    server = make_server(service, args.host, args.port)
+    host, port = server.server_address[:2]
+    print(f"Sirviendo {service.out_dir.resolve()} en http://{host}:{port}/ (POST /refresh para regenerar)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
@@ -0,0 +1,149 @@
+"""
+sheets_reader.py
+Lectura de Google Sheets en una sola llamada values.batchGet.
+
+Todas las pestañas que necesita una corrida (Daily, Checkins, Pomodoro, Coach
+y, en la migración, CoachState/EnglishVoice) se piden juntas por el cliente
+HTTP de gspread, sin abrir el spreadsheet ni cada worksheet por separado: una
+request de cuota en vez de una por pestaña más las de metadata.
+
+Si falta una pestaña opcional el batch entero falla con 400; solo entonces se
+piden los títulos existentes (una llamada de metadata) y se reintenta sin ella.
+Cualquier otro error (429 de cuota, 5xx, credenciales) se propaga sin reintentos.
+
+Las filas se convierten con:
+- records_frame(): misma semántica que ws.get_all_records() (fila 1 como
+  encabezado, filas rellenadas, números como int/float)
+- header_frame(): encabezado detectado por una celda marcadora ("timestamp"),
+  con columnas predefinidas si no hay fila de encabezados
+
+Uso:
+    values = batch_get_values(client, spreadsheet_id, ["Daily", "Checkins"], optional=["Coach"])
+    daily = records_frame(values["Daily"])
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+
+def _a1(tab: str) -> str:
+    # rango = la pestaña completa; las comillas simples se duplican
+    return "'" + tab.replace("'", "''") + "'"
+
+
+def _fetch(client: Any, spreadsheet_id: str, tabs: List[str]) -> Dict[str, List[List[Any]]]:
+    if not tabs:
+        return {}
+    response = client.http_client.values_batch_get(spreadsheet_id, [_a1(t) for t in tabs])
+    # valueRanges vuelve en el orden pedido; "values" falta si la pestaña está vacía
+    return {tab: vr.get("values", []) for tab, vr in zip(tabs, response.get("valueRanges", []))}
+
+
+def sheet_titles(client: Any, spreadsheet_id: str) -> List[str]:
+    meta = client.http_client.fetch_sheet_metadata(spreadsheet_id, params={"fields": "sheets.properties.title"})
+    return [s["properties"]["title"] for s in meta.get("sheets", [])]
+
+
+def batch_get_values(
+    client: Any,
+    spreadsheet_id: str,
+    tabs: Iterable[str],
+    optional: Iterable[str] = (),
+) -> Dict[str, List[List[Any]]]:
+    """
+    {pestaña: filas (listas de celdas como texto)} con una sola llamada values.batchGet.
+    Las `optional` que no existen se omiten; si falta una de `tabs`, ValueError.
+    """
+    from gspread.exceptions import APIError
+
+    tabs, optional = list(tabs), [t for t in optional if t not in tabs]
+    try:
+        return _fetch(client, spreadsheet_id, tabs + optional)
+    except APIError as e:
+        # 400 = rango que no se puede parsear (pestaña inexistente); cuota, 5xx o auth se propagan
+        if e.code != 400 or not optional:
+            raise
+    existing = set(sheet_titles(client, spreadsheet_id))
+    missing = [t for t in tabs if t not in existing]
+    if missing:
+        raise ValueError(f"Worksheet(s) not found in spreadsheet: {', '.join(missing)}")
+    return _fetch(client, spreadsheet_id, tabs + [t for t in optional if t in existing])
+
+
+def _pad(rows: Sequence[List[Any]], width: int) -> List[List[Any]]:
+    return [list(r) + [""] * (width - len(r)) for r in rows]
+
+
+def _is_blank(row: Sequence[Any]) -> bool:
+    return not any(str(c).strip() for c in row)
+
+
+def records_frame(values: List[List[Any]]) -> pd.DataFrame:
+    """Filas de una pestaña → DataFrame como pd.DataFrame(ws.get_all_records(head=1))."""
+    from gspread.utils import numericise_all
+
+    if not values or values == [[]]:
+        return pd.DataFrame()
+    width = max(len(r) for r in values)
+    header, *rows = _pad(values, width)
+    dupes = sorted({h for h in header if header.count(h) > 1})
+    if dupes:
+        raise ValueError(f"the header row in the worksheet contains duplicates: {dupes}")
+    return pd.DataFrame([dict(zip(header, numericise_all(r))) for r in rows])
+
+
+def find_header_row(rows: Sequence[Sequence[Any]], marker: str = "timestamp") -> Optional[int]:
+    """Índice de la primera fila que tiene `marker` como celda (solo aparece en los encabezados)."""
+    for i, row in enumerate(rows):
+        if marker in (str(c).strip().lower() for c in row):
+            return i
+    return None
+
+
+def dedupe_headers(raw: Sequence[Any]) -> List[str]:
+    """Normaliza encabezados (minúsculas, _ por espacios) y numera repetidos: x, x_1; vacíos → _col_1."""
+    seen: Dict[str, int] = {}
+    headers = []
+    for h in raw:
+        h_norm = str(h).replace("\ufeff", "").strip().lower().replace(" ", "_")
+        if h_norm in seen:
+            seen[h_norm] += 1
+            headers.append(f"{h_norm}_{seen[h_norm]}" if h_norm else f"_col_{seen[h_norm]}")
+        else:
+            seen[h_norm] = 0
+            headers.append(h_norm)
+    return headers
+
+
+def header_frame(
+    values: List[List[Any]],
+    tab: str,
+    predefined: Optional[List[str]] = None,
+    marker: str = "timestamp",
+) -> pd.DataFrame:
+    """
+    Filas de una pestaña con encabezado detectado por `marker` → DataFrame.
+    Sin fila de encabezados usa `predefined` (o devuelve vacío); filas vacías
+    fuera, "" y " " → NA. Avisa por consola de lo que descarta.
+    """
+    if not values:
+        print(f"  [WARN] '{tab}' vacío")
+        return pd.DataFrame()
+
+    header_idx = find_header_row(values, marker)
+    if header_idx is None:
+        if not predefined:
+            print(f"  [WARN] '{tab}': sin encabezados y sin columnas predefinidas, saltando")
+            return pd.DataFrame()
+        print(f"  [WARN] '{tab}': sin fila de encabezados, usando columnas predefinidas")
+        headers, data_rows = list(predefined), values
+    else:
+        if header_idx > 0:
+            print(f"  [WARN] '{tab}': {header_idx} fila(s) antes del encabezado, ignoradas")
+        headers, data_rows = dedupe_headers(values[header_idx]), values[header_idx + 1:]
+
+    padded = [r for r in _pad(data_rows, len(headers)) if not _is_blank(r)]
+    return pd.DataFrame(padded, columns=headers).replace({"": pd.NA, " ": pd.NA})
@@ -0,0 +1,152 @@
+"""
+snapshot.py
+Caché local del DataBundle ya normalizado, para no volver a descargar y
+parsear Sheets/Supabase/Excel en corridas repetidas.
+
+- Un directorio por fuente: {cache_dir}/snapshots/{key}/
+- Cada tabla en Parquet (si pyarrow está instalado) o pickle como fallback
+  (sin pyarrow, o columnas que Arrow no soporta: dict/list mezclados).
+- manifest.json guarda created_at y los dtypes originales para restaurarlos
+  al leer (ej. object con ints + NA → Int64 en Parquet → object de nuevo).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from .loaders import DataBundle
+
+SNAPSHOT_VERSION = 2  # 2: tablas con tipos de schema.py
+TABLES = ("daily", "checkins", "pomodoro", "coach")
+
+# Tipos inferidos de columnas object que Arrow guarda sin pérdida tras castear
+_ARROW_CASTS = {
+    "integer": "Int64",
+    "floating": "Float64",
+    "mixed-integer-float": "Float64",
+    "boolean": "boolean",
+}
+_ARROW_AS_IS = {"string", "empty", "date", "datetime"}
+
+
+def snapshot_key(source: str, *parts: Optional[str]) -> str:
+    raw = "|".join([source] + [str(p) for p in parts if p])
+    return f"{source}-{hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _has_arrow() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _arrow_friendly(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Copia lista para Parquet, o None si alguna columna no se puede guardar sin pérdida."""
+    casts: Dict[str, str] = {}
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        kind = pd.api.types.infer_dtype(df[col], skipna=True)
+        if kind in _ARROW_CASTS:
+            casts[col] = _ARROW_CASTS[kind]
+        elif kind not in _ARROW_AS_IS:
+            return None
+    if len(df.columns) == 0 or not all(isinstance(c, str) for c in df.columns):
+        return None
+    return df.astype(casts) if casts else df
+
+
+def _write_table(df: pd.DataFrame, base: Path) -> Dict[str, Any]:
+    dtypes = {str(c): str(t) for c, t in df.dtypes.items()}
+    if _has_arrow():
+        friendly = _arrow_friendly(df)
+        if friendly is not None:
+            try:
+                friendly.to_parquet(base.with_suffix(".parquet"), index=False)
+                return {"file": base.name + ".parquet", "format": "parquet", "dtypes": dtypes}
+            except Exception:
+                pass
+    df.to_pickle(base.with_suffix(".pkl"))
+    return {"file": base.name + ".pkl", "format": "pickle", "dtypes": dtypes}
+
+
+def _read_table(folder: Path, entry: Dict[str, Any]) -> pd.DataFrame:
+    path = folder / entry["file"]
+    if entry["format"] == "pickle":
+        return pd.read_pickle(path)
+
+    df = pd.read_parquet(path)
+    for col, dtype in entry.get("dtypes", {}).items():
+        if col not in df.columns:
+            continue
+        if str(df[col].dtype) != dtype:
+            df[col] = df[col].astype(dtype)
+        if dtype == "object":
+            df[col] = df[col].where(df[col].notna(), pd.NA)
+    return df
+
+
+def save_snapshot(cache_dir: str | Path, key: str, bundle: DataBundle) -> None:
+    folder = Path(cache_dir) / "snapshots" / key
+    tmp = folder.with_name(folder.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    tables = {name: _write_table(getattr(bundle, name), tmp / name) for name in TABLES}
+    manifest = {"version": SNAPSHOT_VERSION, "key": key, "created_at": time.time(), "tables": tables}
+    (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    shutil.rmtree(folder, ignore_errors=True)
+    tmp.rename(folder)
+
+
+def snapshot_age(cache_dir: str | Path, key: str) -> Optional[float]:
+    manifest = _manifest(Path(cache_dir) / "snapshots" / key)
+    return None if manifest is None else time.time() - float(manifest["created_at"])
+
+
+def _manifest(folder: Path) -> Optional[Dict[str, Any]]:
+    path = folder / "manifest.json"
+    if not path.exists():
+        return None
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        return None
+    return manifest
+
+
+def load_snapshot(
+    cache_dir: str | Path,
+    key: str,
+    max_age: float,
+    not_before: Optional[float] = None,
+) -> Optional[DataBundle]:
+    """
+    DataBundle cacheado si existe y tiene menos de `max_age` segundos.
+    `not_before`: epoch mínimo aceptado (ej. mtime del Excel de origen).
+    """
+    folder = Path(cache_dir) / "snapshots" / key
+    manifest = _manifest(folder)
+    if manifest is None:
+        return None
+
+    created_at = float(manifest["created_at"])
+    if time.time() - created_at > max_age:
+        return None
+    if not_before is not None and created_at < not_before:
+        return None
+
+    try:
+        frames = {name: _read_table(folder, manifest["tables"][name]) for name in TABLES}
+    except Exception:
+        return None
+    return DataBundle(**frames)
@@ -16,8 +16,10 @@ Variables de entorno requeridas:
 from __future__ import annotations
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import requests
 from requests.adapters import HTTPAdapter
@@ -91,7 +93,15 @@ class SupabaseClient:
         filters: Optional[Dict[str, str]] = None,
         order: Optional[str] = None,
         limit: Optional[int] = None,
+        parallel: int = 1,
     ) -> List[Dict[str, Any]]:
+        """
+        parallel > 1: pide la primera página con `Prefer: count=exact` y, conocido
+        el total, baja el resto de páginas en paralelo (acotado por el pool).
+        """
+        if limit is None and parallel > 1:
+            return self._select_parallel(table, select=select, filters=filters, order=order, workers=parallel)
+
         if limit is not None:
             # Petición única con límite explícito
             params: Dict[str, str] = {"select": select}
@@ -129,6 +139,105 @@ class SupabaseClient:
             offset += self._PAGE_SIZE
         return all_rows
 
+    def _page(
+        self,
+        table: str,
+        params: Dict[str, str],
+        offset: int,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        page_params = {**params, "limit": str(self._PAGE_SIZE), "offset": str(offset)}
+        r = self.session.get(self._url(table), params=page_params, headers=headers, timeout=self.cfg.timeout)
+        r.raise_for_status()
+        return r
+
+    def _select_parallel(
+        self,
+        table: str,
+        *,
+        select: str,
+        filters: Optional[Dict[str, str]],
+        order: Optional[str],
+        workers: int,
+    ) -> List[Dict[str, Any]]:
+        params: Dict[str, str] = {"select": select}
+        if filters:
+            params.update(filters)
+        if order:
+            params["order"] = order
+
+        first = self._page(table, params, 0, headers={"Prefer": "count=exact"})
+        rows = first.json()
+        if not isinstance(rows, list):
+            rows = [rows]
+
+        # Content-Range: "0-999/4321" (o "*/0")
+        total_str = first.headers.get("Content-Range", "").rpartition("/")[2]
+        if not total_str.isdigit():
+            return rows if len(rows) < self._PAGE_SIZE else rows + self._select_serial_from(table, params, len(rows))
+        total = int(total_str)
+
+        offsets = list(range(len(rows), total, self._PAGE_SIZE))
+        if not offsets:
+            return rows
+        workers = max(1, min(workers, self.cfg.pool_maxsize, len(offsets)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for page in pool.map(lambda off: self._page(table, params, off).json(), offsets):
+                rows.extend(page if isinstance(page, list) else [page])
+        return rows
+
+    def _select_serial_from(self, table: str, params: Dict[str, str], offset: int) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        while True:
+            page = self._page(table, params, offset).json()
+            if not isinstance(page, list):
+                page = [page]
+            rows.extend(page)
+            if len(page) < self._PAGE_SIZE:
+                return rows
+            offset += self._PAGE_SIZE
+
+    def select_iter(
+        self,
+        table: str,
+        *,
+        key: str = "id",
+        select: str = "*",
+        filters: Optional[Dict[str, str]] = None,
+        page_size: Optional[int] = None,
+        after: Optional[Any] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Paginación keyset: ordena por `key` (columna única, p. ej. id o recorded_at)
+        y pide cada página con `key=gt.<último valor>` en vez de offset, así el
+        costo por página no crece con la posición. Genera una lista por página a
+        medida que llega, sin acumular la tabla entera en memoria.
+
+        page_size no debe superar max_rows del servidor (1000 por defecto): una
+        página incompleta se toma como la última.
+        """
+        size = page_size or self._PAGE_SIZE
+        base: List[Tuple[str, str]] = [("select", select)]
+        if filters:
+            base.extend(filters.items())
+        base += [("order", f"{key}.asc"), ("limit", str(size))]
+
+        last = after
+        while True:
+            params = base if last is None else base + [(key, f"gt.{last}")]
+            r = self.session.get(self._url(table), params=params, timeout=self.cfg.timeout)
+            r.raise_for_status()
+            page = r.json()
+            if not isinstance(page, list):
+                page = [page]
+            if page:
+                yield page
+            if len(page) < size:
+                return
+            last = page[-1].get(key)
+            if last is None:
+                raise ValueError(f"select_iter: '{key}' falta o es nulo en {table}; no sirve como clave keyset.")
+
     def insert(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         headers = {"Prefer": "return=representation"}
         r = self.session.post(
@@ -144,9 +253,12 @@ class SupabaseClient:
         rows: List[Dict[str, Any]],
         on_conflict: str,
         ignore_duplicates: bool = False,
+        return_rows: bool = True,
     ) -> List[Dict[str, Any]]:
+        """return_rows=False → `return=minimal`: el servidor no devuelve las filas (cargas masivas)."""
         resolution = "ignore-duplicates" if ignore_duplicates else "merge-duplicates"
-        headers = {"Prefer": f"resolution={resolution},return=representation"}
+        returning = "representation" if return_rows else "minimal"
+        headers = {"Prefer": f"resolution={resolution},return={returning}"}
         params = {"on_conflict": on_conflict}
         r = self.session.post(
             self._url(table),
@@ -156,6 +268,8 @@ class SupabaseClient:
             timeout=self.cfg.timeout,
         )
         r.raise_for_status()
+        if not return_rows:
+            return []
         data = r.json()
         return data if isinstance(data, list) else [data]
 
@@ -186,4 +300,10 @@ def load_from_env() -> SupabaseClient:
         raise RuntimeError("Falta SUPABASE_URL en el entorno (.env).")
     if not key:
         raise RuntimeError("Falta SUPABASE_SERVICE_KEY en el entorno (.env).")
+    return _client_for(url, key)
+
+
+@lru_cache(maxsize=8)
+def _client_for(url: str, key: str) -> SupabaseClient:
+    # Un cliente (y su pool de conexiones) por proyecto: el daemon (serve.py) lo reutiliza entre refrescos
     return SupabaseClient(SupabaseConfig(url=url, key=key))
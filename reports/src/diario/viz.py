@@ -1,33 +1,47 @@
 from __future__ import annotations
 
+import struct
 import warnings
+import zlib
+from html import escape
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
+# Ventana por defecto del heatmap (días hacia atrás desde la última fecha; 0 = todo)
+HEATMAP_DAYS = 90
+
+# viridis (colormap por defecto de matplotlib) muestreado en 33 puntos;
+# interpolado linealmente queda a ≤3/255 del original
+_VIRIDIS = np.array(
+    [
+        [int(h[i : i + 2], 16) for i in (0, 2, 4)]
+        for h in (
+            "440154 470d60 48186a 482374 472d7b 453781 424086 3e4989"
+            " 3b528b 375b8d 33638d 2f6b8e 2c728e 297a8e 26828e 23898e"
+            " 21918c 1f988b 1fa088 22a785 28ae80 32b67a 3fbc73 4ec36b"
+            " 5ec962 70cf57 84d44b 98d83e addc30 c2df23 d8e219 ece51b"
+            " fde725"
+        ).split()
+    ],
+    dtype=float,
+)
 
-def make_heatmap_png(heat: pd.DataFrame, out_path: str | Path) -> None:
-    """
-    Simple heatmap:
-    - rows: dates
-    - cols: metrics (normalized per-column)
-    """
-    if heat.empty:
-        fig = plt.figure(figsize=(8, 2))
-        plt.text(0.5, 0.5, "No data yet", ha="center", va="center")
-        plt.axis("off")
-        fig.savefig(out_path, dpi=150, bbox_inches="tight")
-        plt.close(fig)
-        return
 
-    df = heat.copy()
+def heatmap_window(heat: pd.DataFrame, days: int = HEATMAP_DAYS) -> pd.DataFrame:
+    """Últimos `days` días calendario (según la fecha más reciente del índice)."""
+    if heat.empty or not days:
+        return heat
+    dates = pd.to_datetime(pd.Series(heat.index, index=heat.index).astype(str), errors="coerce")
+    start = dates.max() - pd.Timedelta(days=days - 1)
+    return heat[(dates >= start).to_numpy()]
 
-    # Convert to numeric matrix
-    mat = df.to_numpy(dtype=float)
 
-    # Normalize columns (z-score)
+def zscore_matrix(heat: pd.DataFrame) -> np.ndarray:
+    """z-score por columna, recortado a ±2.5 (NaN donde no hay dato)."""
+    mat = heat.to_numpy(dtype=float)
+
     # Suppress warnings for empty slices (expected when no data)
     with warnings.catch_warnings():
         warnings.filterwarnings("ignore", category=RuntimeWarning, message=".*empty slice.*")
@@ -39,7 +53,111 @@ def make_heatmap_png(heat: pd.DataFrame, out_path: str | Path) -> None:
     norm = (mat - col_mean) / col_std
 
     # Clip for nicer colors
-    norm = np.clip(norm, -2.5, 2.5)
+    return np.clip(norm, -2.5, 2.5)
+
+
+def heatmap_rgba(norm: np.ndarray) -> np.ndarray:
+    """
+    Colores viridis como los de imshow: escala lineal entre el mínimo y el
+    máximo de la matriz; NaN transparente.
+    """
+    out = np.zeros(norm.shape + (4,), dtype=np.uint8)
+    valid = ~np.isnan(norm)
+    if not valid.any():
+        return out
+    lo, hi = norm[valid].min(), norm[valid].max()
+    t = (norm[valid] - lo) / (hi - lo) if hi > lo else np.zeros(int(valid.sum()))
+    x = np.linspace(0.0, 1.0, len(_VIRIDIS))
+    out[valid, :3] = np.stack([np.interp(t, x, _VIRIDIS[:, c]) for c in range(3)], axis=1).round()
+    out[valid, 3] = 255
+    return out
+
+
+def _png_bytes(rgba: np.ndarray) -> bytes:
+    h, w, _ = rgba.shape
+    # cada fila va precedida del byte de filtro 0 (None)
+    raw = np.concatenate([np.zeros((h, 1), dtype=np.uint8), rgba.reshape(h, w * 4)], axis=1).tobytes()
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0)  # 8 bits, RGBA
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b"")
+
+
+def make_heatmap_png_fast(heat: pd.DataFrame, out_path: str | Path, cell: tuple[int, int] = (24, 8)) -> None:
+    """
+    Heatmap sin matplotlib: la matriz z-score se codifica directo a PNG
+    (NumPy + zlib), un bloque de `cell` píxeles (ancho, alto) por valor.
+    Sin ejes ni etiquetas; para eso está el backend svg.
+    """
+    rgba = heatmap_rgba(zscore_matrix(heat)) if not heat.empty else np.zeros((1, 1, 4), dtype=np.uint8)
+    img = np.repeat(np.repeat(rgba, cell[1], axis=0), cell[0], axis=1)
+    Path(out_path).write_bytes(_png_bytes(img))
+
+
+def make_heatmap_svg(heat: pd.DataFrame, out_path: str | Path, cell: tuple[int, int] = (28, 12)) -> None:
+    """Heatmap como SVG (un <rect> por valor) con fechas, métricas y leyenda; sin matplotlib."""
+    cw, ch = cell
+    left, top = 84, 96
+    if heat.empty:
+        svg = (
+            '<svg xmlns="http://www.w3.org/2000/svg" width="320" height="60">'
+            '<text x="160" y="34" text-anchor="middle" font-family="sans-serif" font-size="14">No data yet</text></svg>'
+        )
+        Path(out_path).write_text(svg, encoding="utf-8")
+        return
+
+    rgba = heatmap_rgba(zscore_matrix(heat))
+    rows, cols = rgba.shape[:2]
+    width, height = left + cols * cw + 70, top + rows * ch + 10
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="sans-serif" font-size="9">'
+    ]
+
+    stops = "".join(
+        f'<stop offset="{i / (len(_VIRIDIS) - 1):.3f}" stop-color="#{r:02x}{g:02x}{b:02x}"/>'
+        for i, (r, g, b) in enumerate(_VIRIDIS.astype(int))
+    )
+    lx = left + cols * cw + 16
+    parts.append(f'<defs><linearGradient id="v" x1="0" y1="1" x2="0" y2="0">{stops}</linearGradient></defs>')
+    parts.append(f'<rect x="{lx}" y="{top}" width="12" height="{rows * ch}" fill="url(#v)"/>')
+    parts.append(f'<text x="{lx + 16}" y="{top + 8}">max</text>')
+    parts.append(f'<text x="{lx + 16}" y="{top + rows * ch}">min</text>')
+
+    for j, name in enumerate(heat.columns):
+        x = left + j * cw + cw / 2
+        parts.append(f'<text transform="translate({x:.1f},{top - 4}) rotate(-60)">{escape(str(name))}</text>')
+    for i, day in enumerate(heat.index):
+        y = top + i * ch
+        parts.append(f'<text x="{left - 4}" y="{y + ch - 3}" text-anchor="end">{escape(str(day))}</text>')
+        for j in range(cols):
+            r, g, b, a = rgba[i, j]
+            if a:
+                parts.append(f'<rect x="{left + j * cw}" y="{y}" width="{cw}" height="{ch}" fill="#{r:02x}{g:02x}{b:02x}"/>')
+    parts.append("</svg>")
+    Path(out_path).write_text("".join(parts), encoding="utf-8")
+
+
+def make_heatmap_png(heat: pd.DataFrame, out_path: str | Path) -> None:
+    """
+    Simple heatmap:
+    - rows: dates
+    - cols: metrics (normalized per-column)
+    """
+    import matplotlib.pyplot as plt  # lazy import: ~0.5s, solo para este backend
+
+    if heat.empty:
+        fig = plt.figure(figsize=(8, 2))
+        plt.text(0.5, 0.5, "No data yet", ha="center", va="center")
+        plt.axis("off")
+        fig.savefig(out_path, dpi=150, bbox_inches="tight")
+        plt.close(fig)
+        return
+
+    df = heat
+    norm = zscore_matrix(df)
 
     fig = plt.figure(figsize=(max(6, df.shape[1] * 1.1), max(2.5, df.shape[0] * 0.35)))
     ax = plt.gca()
@@ -55,3 +173,11 @@ def make_heatmap_png(heat: pd.DataFrame, out_path: str | Path) -> None:
     plt.tight_layout()
     fig.savefig(out_path, dpi=160, bbox_inches="tight")
     plt.close(fig)
+
+
+# backend → (función, nombre del archivo en assets/)
+HEATMAP_BACKENDS = {
+    "matplotlib": (make_heatmap_png, "heatmap.png"),
+    "png": (make_heatmap_png_fast, "heatmap.png"),
+    "svg": (make_heatmap_svg, "heatmap.svg"),
+}
@@ -0,0 +1,95 @@
+"""
+migrate_fixtures.py
+Generador de hojas sintéticas (con valores sucios como los de Sheets/Excel) para
+los tests y el benchmark de la coerción de migrate_to_supabase.
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import date, datetime, timedelta, timezone
+
+import pandas as pd
+
+from migrate_to_supabase import COLUMN_SPECS
+
+_NA_LIKE = [None, float("nan"), pd.NA, "", " ", "nan", "None", "NaT", "<NA>"]
+_WORDS = ["calma", "Enfocado ", "TRADING", "social", "high", "start", "end", "work", "long_break",
+          "suave", "valid", "fragile", "REPLIED", "saved_to_drive", "hola", "sí", "no", "TRUE", "false"]
+_JSON_COLS = {"training_json", "meta", "raw_json", "ritual_daily_affirmations"}
+_DATE_COLS = {"date", "start_iso", "last_am", "last_pm", "ritual_daily_date"} | {f"last_rem_{i}" for i in range(1, 5)}
+_TS_COLS = {"timestamp", "updated_at"}
+
+
+def _sources(table: str) -> list[str]:
+    cols: list[str] = []
+    for _, source, _ in COLUMN_SPECS[table]:
+        for col in source if isinstance(source, tuple) else (source,):
+            if col not in cols:
+                cols.append(col)
+    return cols
+
+
+def _timestamp(rng: random.Random, i: int, iso_only: bool):
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=37 * i, milliseconds=rng.randrange(1000))
+    if iso_only:
+        return base.strftime("%Y-%m-%dT%H:%M:%S.") + f"{base.microsecond // 1000:03d}Z"
+    return rng.choice([
+        base.isoformat(),
+        base.strftime("%Y-%m-%d %H:%M:%S"),
+        base.astimezone(timezone(timedelta(hours=-3))).isoformat(),
+        base.replace(tzinfo=None),
+        pd.Timestamp(base),
+        "07/01/2026 10:25",
+        "no es fecha",
+        rng.choice(_NA_LIKE),
+    ])
+
+
+def _date(rng: random.Random, i: int):
+    d = date(2025, 1, 1) + timedelta(days=i // 7)
+    return rng.choices(
+        [d.isoformat(), d, datetime(d.year, d.month, d.day), d.strftime("%d/%m/%Y"), "mañana", rng.choice(_NA_LIKE)],
+        weights=[8, 1, 1, 1, 1, 1],
+    )[0]
+
+
+def _json(rng: random.Random):
+    return rng.choice(['{"at": "10:25", "n": 2}', '["a", "b"]', "{roto", {"ya": "dict"}, ["lista"], rng.choice(_NA_LIKE)])
+
+
+def _scalar(rng: random.Random):
+    return rng.choice([
+        rng.randrange(-2, 600), rng.random() * 10, "3.0", "7", "1e3", True, False, 1, 0, 1.0,
+        rng.choice(_WORDS), f"  msg-{rng.randrange(50)} ", rng.choice(_NA_LIKE),
+    ])
+
+
+def synthetic_sheet(table: str, rows: int, seed: int = 0, iso_only: bool = False) -> pd.DataFrame:
+    """
+    DataFrame con las columnas origen de la tabla y valores mezclados (tipos, NA, basura).
+    iso_only=True → timestamps homogéneos ISO 8601 "…Z" (camino en bloque de la coerción).
+    """
+    rng = random.Random(seed)
+    data: dict[str, list] = {}
+    for col in _sources(table):
+        if col in _TS_COLS:
+            data[col] = [_timestamp(rng, i, iso_only) for i in range(rows)]
+        elif col in _DATE_COLS:
+            data[col] = [_date(rng, i) for i in range(rows)]
+        elif col in _JSON_COLS:
+            data[col] = [_json(rng) for _ in range(rows)]
+        else:
+            data[col] = [_scalar(rng) for _ in range(rows)]
+    return pd.DataFrame({col: pd.Series(values, dtype=object) for col, values in data.items()})
+
+
+def synthetic_typed_sheet(table: str, rows: int, seed: int = 0) -> pd.DataFrame:
+    """Variante "Excel": columnas con dtype propio (datetime64, float64, string) en vez de object."""
+    df = synthetic_sheet(table, rows, seed, iso_only=True)
+    for col in df.columns:
+        if col in _TS_COLS:
+            df[col] = pd.to_datetime(df[col], format="ISO8601").dt.tz_localize(None)
+        elif col not in _DATE_COLS and col not in _JSON_COLS:
+            df[col] = pd.to_numeric(df[col], errors="coerce") if col.endswith(("_id", "count", "minutes")) else df[col].astype("string")
+    return df
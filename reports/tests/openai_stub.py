@@ -0,0 +1,158 @@
+"""
+openai_stub.py
+Servidor Chat Completions mínimo en memoria para tests (sin red externa).
+
+Soporta POST /v1/chat/completions con lo que usa diario.ai:
+- responder(prompt) → texto del mensaje del asistente
+- throttle: las primeras N requests responden 429 con Retry-After: 0
+- delay: latencia simulada por request (para medir concurrencia)
+- "stream": true → respuesta SSE (chat.completion.chunk) en trozos de
+  chunk_chars caracteres, con chunk_delay entre trozos; si el cliente corta
+  la conexión antes del final, el request queda con "aborted": True en log
+
+Uso:
+    with OpenAIStub(lambda prompt: '{"theme": "x"}') as stub:
+        monkeypatch.setenv("OPENAI_BASE_URL", stub.url + "/v1")
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+
+class OpenAIStub:
+    def __init__(
+        self,
+        responder: Callable[[str], str],
+        delay: float = 0.0,
+        throttle: int = 0,
+        chunk_chars: int = 8,
+        chunk_delay: float = 0.0,
+    ):
+        self.responder = responder
+        self.delay = delay
+        self.throttle = throttle  # cuántas requests iniciales reciben 429
+        self.chunk_chars = chunk_chars
+        self.chunk_delay = chunk_delay
+        self.log: List[Dict[str, Any]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "OpenAIStub":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                stub._dispatch(self)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _dispatch(self, handler: BaseHTTPRequestHandler) -> None:
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = json.loads(handler.rfile.read(length) or b"{}")
+        prompt = next((m["content"] for m in reversed(body.get("messages", [])) if m.get("role") == "user"), "")
+
+        with self._lock:
+            throttled = self.throttle > 0
+            if throttled:
+                self.throttle -= 1
+            entry = {"model": body.get("model"), "status": 429 if throttled else 200, "stream": bool(body.get("stream"))}
+            self.log.append(entry)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            if throttled:
+                error = {"error": {"message": "rate limited", "type": "rate_limit_error"}}
+                self._reply(handler, 429, error, {"Retry-After": "0"})
+                return
+            content = self.responder(prompt)
+            if body.get("stream"):
+                entry["aborted"] = not self._stream(handler, body.get("model"), content)
+                return
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+        self._reply(
+            handler,
+            200,
+            {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model"),
+                "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+                ],
+            },
+        )
+
+    def _stream(self, handler: BaseHTTPRequestHandler, model: Any, content: str) -> bool:
+        """Envía content como eventos SSE; False si el cliente cortó antes del final."""
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        def event(delta: dict, finish: Optional[str] = None) -> bytes:
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+            return f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+
+        pieces = [content[i : i + self.chunk_chars] for i in range(0, len(content), self.chunk_chars)]
+        events = [event({"role": "assistant", "content": ""})]
+        events += [event({"content": piece}) for piece in pieces]
+        events += [event({}, "stop"), b"data: [DONE]\n\n"]
+        try:
+            for data in events:
+                handler.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                handler.wfile.flush()
+                if self.chunk_delay:
+                    time.sleep(self.chunk_delay)
+            handler.wfile.write(b"0\r\n\r\n")
+            handler.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            handler.close_connection = True
+            return False
+        return True
+
+    @staticmethod
+    def _reply(handler: BaseHTTPRequestHandler, status: int, payload: Any, headers: Optional[dict] = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            handler.send_header(k, v)
+        handler.end_headers()
+        handler.wfile.write(data)
@@ -0,0 +1,127 @@
+"""
+pg_standin.py
+Sustituto de una conexión psycopg respaldado por sqlite3, suficiente para el modo
+--bulk del migrador: cursor()/execute/rowcount, cursor.copy("COPY … FROM STDIN
+WITH (FORMAT csv)") con semántica CSV de Postgres (vacío sin comillas = NULL),
+CREATE TEMP TABLE … (LIKE …) ON COMMIT DROP, commit/rollback.
+
+Uso:
+    conn = PgStandin({"pomodoro": (["recorded_at", "date", ...], ["recorded_at"])})
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+_LIKE = re.compile(r"CREATE TEMP TABLE (\w+) \(LIKE (\w+) INCLUDING DEFAULTS\) ON COMMIT DROP")
+_COPY = re.compile(r"COPY (\w+) \(([^)]*)\) FROM STDIN WITH \(FORMAT csv\)")
+_FIELD = re.compile(r'"((?:[^"]|"")*)"|([^,\n]*)')
+
+
+def parse_pg_csv(text: str) -> List[List[Optional[str]]]:
+    """CSV de COPY: campos entre comillas (con "" escapado, admite saltos de línea) o sin comillas; vacío → None."""
+    rows: List[List[Optional[str]]] = []
+    row: List[Optional[str]] = []
+    pos = 0
+    while pos < len(text):
+        m = _FIELD.match(text, pos)
+        quoted, plain = m.group(1), m.group(2)
+        row.append(quoted.replace('""', '"') if quoted is not None else (plain or None))
+        pos = m.end()
+        sep = text[pos : pos + 1]
+        pos += 1
+        if sep != ",":
+            rows.append(row)
+            row = []
+    return rows
+
+
+class _Copy:
+    def __init__(self, conn: sqlite3.Connection, table: str, columns: List[str]):
+        self.conn, self.table, self.columns = conn, table, columns
+        self.parts: List[str] = []
+
+    def __enter__(self) -> "_Copy":
+        return self
+
+    def write(self, data: str) -> None:
+        self.parts.append(data)
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is None:
+            marks = ", ".join("?" for _ in self.columns)
+            self.conn.executemany(
+                f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES ({marks})",
+                parse_pg_csv("".join(self.parts)),
+            )
+
+
+class _Cursor:
+    def __init__(self, standin: "PgStandin"):
+        self.standin = standin
+        self.rowcount = -1
+
+    def __enter__(self) -> "_Cursor":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+    def execute(self, sql: str) -> None:
+        self.standin.statements.append(sql)
+        m = _LIKE.fullmatch(sql)
+        if m:
+            self.standin.db.execute(f"CREATE TEMP TABLE {m.group(1)} AS SELECT * FROM {m.group(2)} WHERE 0")
+            self.standin.on_commit_drop.append(m.group(1))
+            return
+        self.rowcount = self.standin.db.execute(sql).rowcount
+
+    def copy(self, sql: str) -> _Copy:
+        self.standin.statements.append(sql)
+        m = _COPY.fullmatch(sql)
+        if not m:
+            raise ValueError(f"COPY no soportado: {sql}")
+        return _Copy(self.standin.db, m.group(1), [c.strip() for c in m.group(2).split(",")])
+
+
+class PgStandin:
+    def __init__(self, tables: Dict[str, Tuple[List[str], List[str]]]):
+        """tables: {nombre: (columnas, clave única)}; se agrega un id autoincremental."""
+        self.db = sqlite3.connect(":memory:", isolation_level=None)
+        self.db.execute("BEGIN")
+        self.statements: List[str] = []
+        self.on_commit_drop: List[str] = []
+        self.commits = 0
+        for name, (columns, unique) in tables.items():
+            cols = ", ".join(columns)
+            self.db.execute(f"CREATE TABLE {name} (id INTEGER PRIMARY KEY, {cols}, UNIQUE ({', '.join(unique)}))")
+        self.db.execute("COMMIT")
+        self.db.execute("BEGIN")
+
+    def cursor(self) -> _Cursor:
+        return _Cursor(self)
+
+    def _end(self, verb: str) -> None:
+        self.db.execute(verb)
+        if verb == "COMMIT":
+            for name in self.on_commit_drop:
+                self.db.execute(f"DROP TABLE IF EXISTS temp.{name}")
+        self.on_commit_drop.clear()
+        self.db.execute("BEGIN")
+
+    def commit(self) -> None:
+        self.commits += 1
+        self._end("COMMIT")
+
+    def rollback(self) -> None:
+        self._end("ROLLBACK")
+
+    def close(self) -> None:
+        self.db.close()
+
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        cur = self.db.execute(f"SELECT * FROM {table} ORDER BY id")
+        names = [d[0] for d in cur.description]
+        return [dict(zip(names, r)) for r in cur.fetchall()]
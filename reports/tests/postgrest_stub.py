@@ -0,0 +1,278 @@
+"""
+postgrest_stub.py
+Servidor PostgREST mínimo en memoria para tests y benchmarks (sin red externa).
+
+Soporta lo que usa SupabaseClient:
+- GET  /rest/v1/<tabla>?select=&order=&limit=&offset=&<col>=<op>.<valor>&or=(...)
+- POST /rest/v1/<tabla>?on_conflict=a,b  (Prefer: resolution=merge-duplicates|ignore-duplicates)
+- Prefer: count=exact → cabecera Content-Range "inicio-fin/total"
+
+indexed=True simula un índice btree para `order=<col>.asc` con `<col>=gt.|gte.`:
+la búsqueda del punto de partida es O(log n) (keyset) y el offset se recorre
+fila a fila como haría Postgres. Pensado para benchmarks con tablas grandes.
+
+Uso:
+    with PostgrestStub({"daily": rows}) as stub:
+        sb = SupabaseClient(SupabaseConfig(url=stub.url, key="test"))
+"""
+
+from __future__ import annotations
+
+import bisect
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+_OPS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+
+def _cast(value: str, like: Any) -> Any:
+    if isinstance(like, bool):
+        return value.lower() == "true"
+    if isinstance(like, (int, float)):
+        return float(value)
+    return value
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+def _condition(col: str, expr: str) -> Callable[[dict], bool]:
+    op, _, raw = expr.partition(".")
+    raw = _unquote(raw)
+    if op == "is":
+        return lambda row: row.get(col) is None if raw == "null" else row.get(col) is not None
+    if op == "in":
+        values = {_unquote(v) for v in raw.strip("()").split(",")}
+        return lambda row: row.get(col) is not None and str(row.get(col)) in values
+    fn = _OPS[op]
+    return lambda row: row.get(col) is not None and fn(row[col], _cast(raw, row[col]))
+
+
+def _split_or(body: str) -> List[str]:
+    # "(a.gt.1,b.gt."x,y")" → ["a.gt.1", 'b.gt."x,y"'] respetando comillas
+    parts, buf, quoted = [], "", False
+    for ch in body.strip()[1:-1]:
+        if ch == '"':
+            quoted = not quoted
+        if ch == "," and not quoted:
+            parts.append(buf)
+            buf = ""
+        else:
+            buf += ch
+    if buf:
+        parts.append(buf)
+    return parts
+
+
+def _or_condition(body: str) -> Callable[[dict], bool]:
+    conds = []
+    for part in _split_or(body):
+        col, _, expr = part.partition(".")
+        conds.append(_condition(col, expr))
+    return lambda row: any(c(row) for c in conds)
+
+
+class PostgrestStub:
+    def __init__(
+        self,
+        tables: Optional[Dict[str, List[dict]]] = None,
+        delay: float = 0.0,
+        fault: Optional[Callable[[str, str, Any], Optional[int]]] = None,
+        indexed: bool = False,
+    ):
+        self.tables: Dict[str, List[dict]] = {k: list(v) for k, v in (tables or {}).items()}
+        self.delay = delay
+        self.fault = fault  # (method, table, payload) → status HTTP a forzar o None
+        self.indexed = indexed
+        self._index: Dict[tuple, tuple] = {}  # (tabla, col) → (claves ordenadas, filas)
+        self.log: List[Dict[str, Any]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    # ── ciclo de vida ─────────────────────────────────────────────────────────
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "PostgrestStub":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                stub._dispatch(self, "GET")
+
+            def do_POST(self) -> None:
+                stub._dispatch(self, "POST")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ── lógica PostgREST ──────────────────────────────────────────────────────
+
+    def _dispatch(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            parts = urlsplit(handler.path)
+            table = parts.path.rsplit("/", 1)[-1]
+            params = parse_qsl(parts.query, keep_blank_values=True)
+            length = int(handler.headers.get("Content-Length") or 0)
+            body = json.loads(handler.rfile.read(length) or b"null") if length else None
+
+            forced = self.fault(method, table, body if method == "POST" else params) if self.fault else None
+            if forced:
+                self._reply(handler, forced, {"message": f"forced {forced}"})
+                return
+            if method == "GET":
+                self._select(handler, table, params)
+            else:
+                self._upsert(handler, table, dict(params), body or [])
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _index_scan(self, table: str, params: List[tuple]) -> Optional[tuple]:
+        """(página, total) vía índice, o None si la consulta no encaja en el camino rápido."""
+        query = dict(params)
+        col, _, direction = (query.get("order") or "").partition(".")
+        if not col or direction not in ("", "asc") or "," in col:
+            return None
+        extra = [k for k, _ in params if k not in ("select", "order", "limit", "offset")]
+        if any(k != col for k in extra) or len(extra) > 1:
+            return None
+
+        with self._lock:
+            if (table, col) not in self._index:
+                rows = sorted((r for r in self.tables.get(table, []) if r.get(col) is not None), key=lambda r: r[col])
+                self._index[(table, col)] = ([r[col] for r in rows], rows)
+            keys, rows = self._index[(table, col)]
+
+        start = 0
+        if extra:
+            op, _, raw = query[col].partition(".")
+            if op not in ("gt", "gte"):
+                return None
+            value = _cast(raw, keys[0]) if keys else raw
+            start = (bisect.bisect_right if op == "gt" else bisect.bisect_left)(keys, value)
+
+        offset = int(query.get("offset", 0))
+        limit = int(query["limit"]) if "limit" in query else None
+        # el offset se salta fila a fila, como un Index Scan de Postgres
+        positions = itertools.islice(range(start, len(rows)), offset, None if limit is None else offset + limit)
+        return [rows[i] for i in positions], len(rows) - start
+
+    def _select(self, handler: BaseHTTPRequestHandler, table: str, params: List[tuple]) -> None:
+        scanned = self._index_scan(table, params) if self.indexed else None
+        if scanned is not None:
+            page, total = scanned
+            offset = int(dict(params).get("offset", 0))
+            self._respond_page(handler, table, params, page, offset, total)
+            return
+
+        rows = self.tables.get(table, [])
+        conds: List[Callable[[dict], bool]] = []
+        order, limit, offset = None, None, 0
+        for key, value in params:
+            if key == "select":
+                continue
+            if key == "order":
+                order = value
+            elif key == "limit":
+                limit = int(value)
+            elif key == "offset":
+                offset = int(value)
+            elif key == "or":
+                conds.append(_or_condition(value))
+            else:
+                conds.append(_condition(key, value))
+
+        matched = [r for r in rows if all(c(r) for c in conds)]
+        if order:
+            for spec in reversed(order.split(",")):
+                col, _, direction = spec.partition(".")
+                desc = direction.startswith("desc")
+                matched.sort(key=lambda r: (r.get(col) is None, r.get(col) if r.get(col) is not None else ""), reverse=desc)
+
+        page = matched[offset : offset + limit if limit is not None else None]
+        self._respond_page(handler, table, params, page, offset, len(matched))
+
+    def _respond_page(
+        self,
+        handler: BaseHTTPRequestHandler,
+        table: str,
+        params: List[tuple],
+        page: List[dict],
+        offset: int,
+        total: int,
+    ) -> None:
+        with self._lock:
+            self.log.append({"method": "GET", "table": table, "params": dict(params), "rows": len(page)})
+
+        headers = {}
+        if "count=exact" in (handler.headers.get("Prefer") or ""):
+            end = offset + len(page) - 1
+            headers["Content-Range"] = f"{offset}-{end}/{total}" if page else f"*/{total}"
+        self._reply(handler, 200, page, headers)
+
+    def _upsert(self, handler: BaseHTTPRequestHandler, table: str, params: Dict[str, str], rows: List[dict]) -> None:
+        keys = [k for k in params.get("on_conflict", "").split(",") if k]
+        ignore = "ignore-duplicates" in (handler.headers.get("Prefer") or "")
+        with self._lock:
+            self._index = {k: v for k, v in self._index.items() if k[0] != table}
+            current = self.tables.setdefault(table, [])
+            index = {tuple(r.get(k) for k in keys): i for i, r in enumerate(current)} if keys else {}
+            for row in rows:
+                k = tuple(row.get(c) for c in keys)
+                if keys and k in index:
+                    if not ignore:
+                        current[index[k]] = {**current[index[k]], **row}
+                else:
+                    index[k] = len(current)
+                    current.append(dict(row))
+            self.log.append({"method": "POST", "table": table, "params": params, "rows": len(rows)})
+        self._reply(handler, 201, rows)
+
+    @staticmethod
+    def _reply(handler: BaseHTTPRequestHandler, status: int, payload: Any, headers: Optional[dict] = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            handler.send_header(k, v)
+        handler.end_headers()
+        handler.wfile.write(data)
+
@@ -0,0 +1,72 @@
+import json
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from diario.ai import generate_ai_backfill
+from diario.loaders import DataBundle
+from diario.render import render_all
+from diario.scoring import build_kpis
+from openai_stub import OpenAIStub
+
+
+def _inputs():
+    dates = pd.date_range("2026-01-05", periods=35)  # 5 semanas ISO completas (W02..W06)
+    daily = pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "energy": 4, "sleep_hours": 7})
+    data = DataBundle(daily=daily, checkins=pd.DataFrame(), pomodoro=pd.DataFrame())
+    return build_kpis(data), data
+
+
+def _responder(prompt: str) -> str:
+    week = re.search(r'"current_week":\s*"([^"]+)"', prompt).group(1)
+    return json.dumps({"theme": f"tema {week}", "wins": [f"victoria {week}"]})
+
+
+def test_backfill_writes_one_file_per_week(tmp_path: Path, monkeypatch):
+    kpis, data = _inputs()
+    with OpenAIStub(_responder, delay=0.1, throttle=2) as stub:
+        monkeypatch.setenv("OPENAI_BASE_URL", stub.url + "/v1")
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        results = generate_ai_backfill(kpis, data, tz="UTC", weeks_back=range(4), out_dir=tmp_path, workers=3)
+
+    weeks = ["2026-W03", "2026-W04", "2026-W05", "2026-W06"]
+    assert sorted(results) == weeks
+    assert stub.max_in_flight > 1
+    assert [e["status"] for e in stub.log].count(429) == 2  # reintentados tras Retry-After
+
+    assets = tmp_path / "assets"
+    for w in weeks:
+        assert json.loads((assets / f"ai_weekly_{w}.json").read_text(encoding="utf-8"))["theme"] == f"tema {w}"
+    assert json.loads((assets / "ai_weekly.json").read_text(encoding="utf-8"))["theme"] == "tema 2026-W06"
+
+    render_all(tmp_path, kpis, data, tz="UTC")
+    assert "victoria 2026-W04" in (tmp_path / "weekly_2026-W04.html").read_text(encoding="utf-8")
+    assert "Análisis IA" not in (tmp_path / "weekly_2026-W02.html").read_text(encoding="utf-8")
+
+
+def test_failed_week_does_not_discard_the_others(tmp_path: Path, monkeypatch, capsys):
+    import diario.ai as ai
+
+    kpis, data = _inputs()
+    call = ai._call_with_retries
+
+    def flaky(prompt, **kw):
+        if '"current_week": "2026-W04"' in prompt:
+            raise ValueError("context_length_exceeded")
+        return call(prompt, **kw)
+
+    monkeypatch.setattr(ai, "_call_with_retries", flaky)
+    with OpenAIStub(_responder) as stub:
+        monkeypatch.setenv("OPENAI_BASE_URL", stub.url + "/v1")
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        results = generate_ai_backfill(kpis, data, tz="UTC", weeks_back=range(4), out_dir=tmp_path, workers=2)
+
+    assert list(results) == ["2026-W06", "2026-W05", "2026-W03"]
+    assets = tmp_path / "assets"
+    assert sorted(p.name for p in assets.iterdir()) == [
+        "ai_weekly.json", "ai_weekly_2026-W03.json", "ai_weekly_2026-W05.json", "ai_weekly_2026-W06.json"
+    ]
+    out = capsys.readouterr().out
+    assert "[WARN] AI 2026-W04: ValueError: context_length_exceeded" in out
+    assert "1 semana(s) fallaron (2026-W04)" in out
@@ -0,0 +1,72 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import diario.ai as ai
+from diario.ai_cache import cache_get, cache_put, evict
+from diario.loaders import DataBundle
+from diario.scoring import build_kpis
+
+
+def _inputs():
+    daily = pd.DataFrame({"date": pd.date_range("2026-01-01", periods=14).strftime("%Y-%m-%d"), "energy": 4, "sleep_hours": 7})
+    checkins = pd.DataFrame({"date": ["2026-01-13"], "question": "q", "intensity_0_10": [5], "answer_raw": ["ok"]})
+    data = DataBundle(daily=daily, checkins=checkins, pomodoro=pd.DataFrame())
+    return build_kpis(data), data
+
+
+def test_ai_cache_hit_skips_openai(tmp_path: Path, monkeypatch):
+    calls = []
+
+    def fake_call(prompt, model, api_key, lang="es"):
+        calls.append(lang)
+        return '```json\n{"theme": "constancia", "wins": []}\n```'
+
+    monkeypatch.setattr(ai, "_call_openai", fake_call)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    kpis, data = _inputs()
+    cache, out = tmp_path / "cache", tmp_path / "out"
+
+    first = ai.generate_weekly_ai_insights(kpis, data, tz="UTC", out_dir=out, cache_dir=cache)
+    (out / "assets" / "ai_weekly.json").unlink()
+
+    monkeypatch.delenv("OPENAI_API_KEY")  # un hit no necesita API key
+    second = ai.generate_weekly_ai_insights(kpis, data, tz="UTC", out_dir=out, cache_dir=cache)
+    assert calls == ["es"] and second == first == {"theme": "constancia", "wins": []}
+    assert json.loads((out / "assets" / "ai_weekly.json").read_text(encoding="utf-8")) == first
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    ai.generate_weekly_ai_insights(kpis, data, tz="UTC", out_dir=out, cache_dir=cache, lang="en")
+    monkeypatch.setenv("AI_CACHE_TTL", "0")
+    ai.generate_weekly_ai_insights(kpis, data, tz="UTC", out_dir=out, cache_dir=cache)
+    assert calls == ["es", "en", "es"]
+
+
+def test_ai_cache_evicts_least_recently_used(tmp_path: Path):
+    body = {"theme": "x" * 400}
+    for i, key in enumerate(["a", "b", "c"]):
+        cache_put(tmp_path, key, body, model="m", lang="es", max_bytes=10**6)
+        os.utime(tmp_path / "ai" / f"{key}.json", (time.time() - 100 + i, time.time() - 100 + i))
+
+    assert cache_get(tmp_path, "a") == body  # "a" pasa a ser la más reciente
+    assert evict(tmp_path, max_bytes=600) == 2
+    assert sorted(p.stem for p in (tmp_path / "ai").glob("*.json")) == ["a"]
+
+
+def test_ai_cache_dir_is_independent_of_snapshot(tmp_path: Path, monkeypatch):
+    import argparse
+
+    from diario.pipeline import run_ai
+
+    monkeypatch.setattr(ai, "_call_openai", lambda prompt, model, api_key, lang="es": '{"theme": "x"}')
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    kpis, data = _inputs()
+    args = argparse.Namespace(
+        ai_backfill=0, ai_weeks_back=0, ai_lang="es", tz="UTC", ai_token_budget=0, ai_stream="off",
+        ai_workers=1, cache_dir=None, ai_cache_dir=str(tmp_path / "ai_cache"),
+    )
+    run_ai(args, kpis, data, tmp_path / "out")
+    assert len(list((tmp_path / "ai_cache" / "ai").glob("*.json"))) == 1
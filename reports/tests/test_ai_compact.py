@@ -0,0 +1,56 @@
+import pandas as pd
+
+from diario.ai_compact import compact_payload, dedupe_checkins, estimate_tokens
+from diario.ai_payload import build_weekly_ai_payload
+from diario.ai_prompt import build_weekly_prompt
+from diario.loaders import DataBundle
+from diario.scoring import build_kpis
+
+
+def _busy_week():
+    dates = pd.date_range("2026-01-05", periods=14)  # W02 + W03
+    daily = pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "energy": [3, 4] * 7, "sleep_hours": 7})
+    rows = []
+    for i in range(120):
+        day = dates[7 + i % 7].strftime("%Y-%m-%d")
+        answer = "Pensé otra vez en revisar el teléfono y perdí el foco de la tarde. " * 6
+        if i % 3 == 0:
+            answer = f"Respuesta distinta número {i}: " + "detalle concreto de la situación " * 10
+        rows.append({"date": day, "question": f"q{i % 4}", "intensity_0_10": i % 11, "answer_raw": answer + ("!" if i % 2 else "")})
+    data = DataBundle(daily=daily, checkins=pd.DataFrame(rows), pomodoro=pd.DataFrame())
+    return build_weekly_ai_payload(kpis=build_kpis(data), data_bundle=data, tz="UTC")
+
+
+def test_compact_payload_fits_budget_and_keeps_prompt_fields():
+    payload = _busy_week()
+    compacted, stats = compact_payload(payload, budget=1500)
+
+    assert stats["tokens_before"] == estimate_tokens(payload) > 1500
+    assert stats["tokens_after"] == estimate_tokens(compacted) <= 1500
+    assert stats["stages"][0] == "dedupe_checkins"
+    assert compacted["meta"]["current_week"] == payload["meta"]["current_week"]
+    assert {"daily_current_week", "daily_previous_week", "checkins"} <= set(compacted)
+    assert compacted["daily_current_week"] == payload["daily_current_week"]
+    assert compacted["weekly_deltas"]["energy"] == {"previous": 3.43, "current": 3.57, "delta": 0.14, "delta_pct": 4.2}
+    assert compacted["checkins"] and all(len(c["answer_raw"]) <= 121 for c in compacted["checkins"])
+    assert "DATOS (JSON)" in build_weekly_prompt(compacted)
+    assert "weekly_deltas" in build_weekly_prompt(compacted)  # el prompt explica dónde quedó la semana previa
+    assert "weekly_deltas" not in build_weekly_prompt(payload)
+    assert len(payload["checkins"]) == 120  # el original no se modifica
+
+
+def test_compact_payload_under_budget_is_untouched():
+    payload = _busy_week()
+    same, stats = compact_payload(payload, budget=10**6)
+    assert same is payload and stats["stages"] == []
+
+
+def test_dedupe_checkins_merges_near_identical_answers():
+    recs = [
+        {"question": "¿Qué te distrajo?", "answer_raw": "El celular, otra vez."},
+        {"question": "¿Qué te distrajo?", "answer_raw": "el celular otra vez"},
+        {"question": "¿Qué te distrajo?", "answer_raw": "Una reunión larga"},
+        {"question": "Otra", "answer_raw": "El celular, otra vez."},
+    ]
+    out = dedupe_checkins(recs)
+    assert [r.get("repeats", 1) for r in out] == [2, 1, 1]
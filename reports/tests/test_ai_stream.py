@@ -0,0 +1,59 @@
+import json
+import time
+
+import pytest
+
+import diario.ai as ai
+from diario.ai_stream import JsonStreamGuard, StreamAborted
+from openai_stub import OpenAIStub
+
+GOOD = {"theme": "constancia", "wins": ["3 días con foco"], "evidence": {"checkins_quotes": []}, "identity_sentence": None}
+
+
+def _feed(text: str, size: int = 5) -> JsonStreamGuard:
+    guard = JsonStreamGuard()
+    for i in range(0, len(text), size):
+        guard.feed(text[i : i + size])
+    return guard
+
+
+def test_guard_accepts_fenced_schema_json():
+    text = "```json\n" + json.dumps(GOOD, ensure_ascii=False, indent=2) + "\n```"
+    guard = _feed(text)
+    assert guard.finish() == text and guard.keys == list(GOOD)
+
+
+@pytest.mark.parametrize(
+    "text, reason",
+    [
+        ('Claro, aquí va el análisis: {"theme": "x"}', "texto antes del JSON"),
+        ('{"theme": "x", "summary": "otra forma"}', "clave inesperada 'summary'"),
+        ('{"wins": "debería ser lista"}', "'wins' debería ser list"),
+        ('{"theme": {"nested": "}"}}', "'theme' debería ser str"),
+    ],
+)
+def test_guard_aborts_as_soon_as_shape_breaks(text, reason):
+    with pytest.raises(StreamAborted, match=reason):
+        _feed(text)
+
+
+def test_guard_rejects_truncated_stream():
+    guard = _feed('{"theme": "x", "wins": ["a", ')
+    with pytest.raises(StreamAborted, match="incompleto"):
+        guard.finish()
+
+
+def test_stream_aborts_drifting_response_and_retries(monkeypatch):
+    drift = '{"theme": "x", "essay": "' + "texto fuera de esquema " * 200 + '"}'
+    replies = iter([drift, json.dumps(GOOD)])
+
+    with OpenAIStub(lambda prompt: next(replies), chunk_chars=8, chunk_delay=0.01) as stub:
+        monkeypatch.setenv("OPENAI_BASE_URL", stub.url + "/v1")
+        t0 = time.perf_counter()
+        raw = ai._call_with_retries("prompt", model="gpt-test", api_key="sk-test", lang="es", stream=True)
+        elapsed = time.perf_counter() - t0
+
+    assert json.loads(raw) == GOOD
+    assert [e["stream"] for e in stub.log] == [True, True]
+    # el primer stream completo tomaría ~5.8s (580 trozos × 10ms); se cortó al ver "essay"
+    assert elapsed < 3
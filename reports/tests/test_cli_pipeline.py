@@ -0,0 +1,36 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+from openai_stub import OpenAIStub
+
+REPORTS = Path(__file__).resolve().parents[1]
+FIXTURE = REPORTS / "tests" / "fixtures" / "diario_operativo.xlsx"
+
+
+def test_ai_overlaps_heatmap_and_pages(tmp_path: Path):
+    latency = 1.5
+    with OpenAIStub(lambda prompt: json.dumps({"theme": "semana de prueba"}), delay=latency) as stub:
+        env = {
+            **os.environ,
+            "OPENAI_BASE_URL": stub.url + "/v1",
+            "OPENAI_API_KEY": "sk-test",
+            "PYTHONPATH": "",
+        }
+        proc = subprocess.run(
+            [sys.executable, "-m", "src.cli", "--source", "excel", "--excel-path", str(FIXTURE),
+             "--out", str(tmp_path), "--ai", "on"],
+            cwd=REPORTS, env=env, capture_output=True, text=True, timeout=120,
+        )
+    assert proc.returncode == 0, proc.stderr
+
+    line = next(l for l in proc.stdout.splitlines() if l.startswith("Etapas:"))
+    t = {name: float(secs) for name, secs in re.findall(r"(\w+) ([\d.]+)s", line)}
+    assert t["ai"] >= latency
+    # heatmap y páginas se hicieron mientras la IA esperaba la respuesta
+    assert t["report"] < t["ai"] + t["heatmap"] + t["pages"]
+    assert t["ai_wait"] < t["ai"]
+    assert "semana de prueba" in (tmp_path / "index.html").read_text(encoding="utf-8")
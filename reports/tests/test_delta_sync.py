@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import pandas as pd
+
+from diario.delta_sync import read_supabase_delta
+from diario.loaders import load_data
+from diario.supabase_client import SupabaseClient, SupabaseConfig
+from postgrest_stub import PostgrestStub
+
+
+def _ts(day: int, hour: int = 22) -> str:
+    return f"2026-01-{day:02d}T{hour:02d}:00:00+00:00"
+
+
+def _tables(days: int) -> dict:
+    return {
+        "daily": [
+            {"id": f"d{d}", "date": f"2026-01-{d:02d}", "from_user": "u", "energy": d % 5,
+             "recorded_at": _ts(d), "created_at": _ts(d)}
+            for d in range(1, days + 1)
+        ],
+        "checkins": [
+            {"id": f"c{d}", "date": f"2026-01-{d:02d}", "message_id": str(d), "question": "q",
+             "recorded_at": _ts(d, 9), "created_at": _ts(d, 9)}
+            for d in range(1, days + 1)
+        ],
+        "pomodoro": [
+            {"id": f"p{d}", "date": f"2026-01-{d:02d}", "event": "end", "phase": "work",
+             "recorded_at": _ts(d, 10), "created_at": _ts(d, 10)}
+            for d in range(1, days + 1)
+        ],
+        "coach": [],
+    }
+
+
+def _full(sb: SupabaseClient, table: str, order: str) -> pd.DataFrame:
+    return pd.DataFrame(sb.select(table, order=order)).reset_index(drop=True)
+
+
+def test_delta_sync_fetches_only_new_rows(tmp_path: Path):
+    with PostgrestStub(_tables(10)) as stub:
+        sb = SupabaseClient(SupabaseConfig(url=stub.url, key="test", retries_total=0))
+
+        first = read_supabase_delta(sb, tmp_path)
+        assert len(first["daily"]) == 10
+
+        # nueva fila + una fila existente re-escrita por el bot (recorded_at nuevo)
+        stub.tables["daily"].append(
+            {"id": "d11", "date": "2026-01-11", "from_user": "u", "energy": 1,
+             "recorded_at": _ts(11), "created_at": _ts(11)}
+        )
+        stub.tables["daily"][2] = {**stub.tables["daily"][2], "energy": 4, "recorded_at": _ts(11, 23)}
+        stub.tables["pomodoro"].append(
+            {"id": "p11", "date": "2026-01-11", "event": "start", "phase": "work",
+             "recorded_at": _ts(11, 8), "created_at": _ts(11, 8)}
+        )
+        stub.log.clear()
+
+        second = read_supabase_delta(sb, tmp_path)
+        downloaded = {e["table"]: e["rows"] for e in stub.log}
+        # + la última fila de cada tabla por el solapamiento DELTA_LOOKBACK
+        assert downloaded == {"daily": 3, "checkins": 1, "pomodoro": 2, "coach": 0}
+        assert all("or" in e["params"] for e in stub.log if e["table"] != "coach")
+
+        pd.testing.assert_frame_equal(second["daily"], _full(sb, "daily", "date.asc"))
+        pd.testing.assert_frame_equal(second["pomodoro"], _full(sb, "pomodoro", "recorded_at.asc"))
+        assert second["daily"].loc[second["daily"]["id"] == "d3", "energy"].item() == 4
+
+
+def test_delta_sync_catches_rows_committed_late(tmp_path: Path):
+    with PostgrestStub(_tables(10)) as stub:
+        sb = SupabaseClient(SupabaseConfig(url=stub.url, key="test", retries_total=0))
+        read_supabase_delta(sb, tmp_path)
+
+        # created_at del inicio de la transacción: igual y anterior a la marca ya guardada
+        stub.tables["daily"] += [
+            {"id": "late1", "date": "2026-01-10", "from_user": "v", "energy": 2,
+             "recorded_at": _ts(10), "created_at": _ts(10)},
+            {"id": "late2", "date": "2026-01-10", "from_user": "w", "energy": 3,
+             "recorded_at": "2026-01-10T21:58:00+00:00", "created_at": "2026-01-10T21:58:00+00:00"},
+        ]
+        second = read_supabase_delta(sb, tmp_path)
+
+    assert {"late1", "late2"} <= set(second["daily"]["id"])
+    assert second["daily"]["id"].is_unique and len(second["daily"]) == 12
+
+
+def test_load_data_delta_refreshes_within_max_age(tmp_path: Path, monkeypatch):
+    with PostgrestStub(_tables(5)) as stub:
+        monkeypatch.setenv("SUPABASE_URL", stub.url)
+        monkeypatch.setenv("SUPABASE_SERVICE_KEY", "test")
+
+        first = load_data("supabase", cache_dir=tmp_path, sync="delta", max_age=3600)
+        stub.tables["daily"].append(
+            {"id": "d6", "date": "2026-01-06", "from_user": "u", "energy": 1,
+             "recorded_at": _ts(6), "created_at": _ts(6)}
+        )
+        second = load_data("supabase", cache_dir=tmp_path, sync="delta", max_age=3600)
+
+    assert len(first.daily) == 5
+    assert len(second.daily) == 6 and "d6" in set(second.daily["id"].astype(str))
@@ -0,0 +1,104 @@
+import datetime as dt
+import sys
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import migrate_to_supabase as mig
+from diario.excel_reader import iter_excel_chunks, read_excel_sheets
+from diario.loaders import read_excel_bundle
+
+FIXTURE = Path(__file__).parent / "fixtures" / "diario_operativo.xlsx"
+
+
+def _tricky_workbook(path: Path) -> Path:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "T"
+    ws.append(["date", "n", "f", "txt", "flag", "ts", None, "dup", "dup"])
+    for i in range(23):
+        ts = dt.datetime(2024, 1, 1) + dt.timedelta(days=i) if i % 5 else None
+        flag = i % 2 == 0 if i < 10 else None  # bool en los primeros bloques, vacío después
+        ws.append([f"2024-01-{i + 1:02d}", i if i % 4 else None, i / 3, "x" if i % 3 else "", flag, ts, None, i, "a"])
+        if i == 11:
+            ws.append([])  # fila vacía intermedia: read_excel la conserva como NaN
+    ws.append([None] * 9 + ["extra"])  # más ancha que el encabezado
+    ws.append([])
+    ws.append([])  # vacías al final: se descartan
+    wb.create_sheet("Empty")
+    wb.create_sheet("HeaderOnly").append(["a", "b"])
+    wb.save(path)
+    return path
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 3, 5000])
+def test_matches_read_excel_on_fixture(chunk_rows):
+    frames = read_excel_sheets(FIXTURE, ["Daily", "Checkins", "Pomodoro", "Coach"], chunk_rows=chunk_rows)
+    assert sorted(frames) == ["Checkins", "Daily", "Pomodoro"]  # Coach no existe en el fixture
+    for sheet, df in frames.items():
+        pd.testing.assert_frame_equal(df, pd.read_excel(FIXTURE, sheet_name=sheet))
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 5, 100])
+def test_matches_read_excel_across_chunk_boundaries(tmp_path, chunk_rows):
+    path = _tricky_workbook(tmp_path / "t.xlsx")
+    frames = read_excel_sheets(path, ["T", "Empty", "HeaderOnly"], chunk_rows=chunk_rows)
+    for sheet in ("T", "Empty", "HeaderOnly"):
+        pd.testing.assert_frame_equal(frames[sheet], pd.read_excel(path, sheet_name=sheet))
+
+
+def test_chunks_are_bounded(tmp_path):
+    path = _tricky_workbook(tmp_path / "t.xlsx")
+    sizes = [len(chunk) for sheet, chunk in iter_excel_chunks(path, ["T"], chunk_rows=4)]
+    assert max(sizes) <= 4
+    assert sum(sizes) == len(pd.read_excel(path, sheet_name="T"))
+
+
+def test_bundle_and_extra_sheets_in_one_open(monkeypatch):
+    opened = []
+    real = openpyxl.load_workbook
+
+    def spy(*args, **kwargs):
+        opened.append(kwargs.get("read_only"))
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(openpyxl, "load_workbook", spy)
+    bundle, extra = read_excel_bundle(FIXTURE, ["CoachState", "EnglishVoice"])
+
+    assert opened == [True]
+    assert extra == {}  # el fixture no trae las hojas extra
+    assert "date" in bundle.daily.columns and len(bundle.pomodoro) == 31
+    assert bundle.coach.empty
+
+
+def test_missing_required_sheet(tmp_path):
+    with pytest.raises(ValueError, match="Daily"):
+        read_excel_bundle(_tricky_workbook(tmp_path / "t.xlsx"))
+
+
+def test_migrator_coerces_raw_excel_frames(monkeypatch):
+    seen = {}
+    monkeypatch.setattr(mig, "migrate_table", lambda client, table, df, **kw: seen.setdefault(table, df))
+    monkeypatch.setattr(sys, "argv", ["migrate", "--source", "excel", "--excel-path", str(FIXTURE), "--dry-run",
+                                      "--tables", "daily", "pomodoro"])
+    assert mig.main() == 0
+    raw = pd.read_excel(FIXTURE, sheet_name="Daily")
+    assert len(seen["daily"]) == len(raw)
+    assert not any(isinstance(t, pd.CategoricalDtype) for t in seen["daily"].dtypes)  # sin tipos de schema.py
+    assert seen["daily"]["date"].dtype == raw["date"].dtype
+
+
+def test_migrator_reads_extra_sheets_itself(tmp_path, capsys):
+    wb = openpyxl.Workbook()
+    wb.active.title = "EnglishVoice"
+    wb.active.append(["Time stamp", "status"])
+    wb.active.append(["2026-01-05T09:00:00", "REPLIED"])
+    wb.save(tmp_path / "extra.xlsx")
+
+    extra = mig._load_extra_excel(str(tmp_path / "extra.xlsx"))
+    assert extra["coach_state"].empty
+    assert extra["english_voice"]["status"].tolist() == ["REPLIED"]
+    assert "time_stamp" in extra["english_voice"].columns
+    assert "'CoachState' desde Excel: hoja inexistente" in capsys.readouterr().out
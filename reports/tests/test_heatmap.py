@@ -0,0 +1,54 @@
+import struct
+import zlib
+from pathlib import Path
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+from diario.viz import heatmap_rgba, heatmap_window, make_heatmap_png_fast, make_heatmap_svg, zscore_matrix
+
+
+def _heat(days: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    dates = pd.date_range("2025-01-01", periods=days).date
+    heat = pd.DataFrame({"score": rng.normal(10, 3, days), "energy": rng.integers(1, 6, days).astype(float)}, index=dates)
+    heat.loc[heat.index[::9], "energy"] = np.nan
+    return heat.rename_axis("date")
+
+
+def test_rgba_matches_matplotlib_viridis():
+    norm = zscore_matrix(_heat(60))
+    ours = heatmap_rgba(norm)
+
+    # misma normalización que imshow: lineal entre min y max de la matriz
+    ref = matplotlib.colormaps["viridis"](matplotlib.colors.Normalize()(np.ma.masked_invalid(norm)), bytes=True)
+    valid = ~np.isnan(norm)
+    assert np.abs(ours[valid, :3].astype(int) - ref[valid, :3].astype(int)).max() <= 3
+    assert (ours[~valid, 3] == 0).all() and (ours[valid, 3] == 255).all()
+
+
+def test_fast_png_roundtrip(tmp_path: Path):
+    heat = heatmap_window(_heat(), days=90)
+    assert len(heat) == 90 and heat.index[-1] == _heat().index[-1]
+
+    path = tmp_path / "heatmap.png"
+    make_heatmap_png_fast(heat, path, cell=(4, 2))
+    data = path.read_bytes()
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+
+    w, h = struct.unpack(">II", data[16:24])
+    assert (w, h) == (2 * 4, 90 * 2)
+    idat_len = struct.unpack(">I", data[33:37])[0]
+    raw = np.frombuffer(zlib.decompress(data[41 : 41 + idat_len]), dtype=np.uint8).reshape(h, 1 + w * 4)
+    pixels = raw[:, 1:].reshape(h, w, 4)
+    np.testing.assert_array_equal(pixels[::2, ::4], heatmap_rgba(zscore_matrix(heat)))
+
+
+def test_svg_has_one_rect_per_value(tmp_path: Path):
+    heat = heatmap_window(_heat(), days=30)
+    path = tmp_path / "heatmap.svg"
+    make_heatmap_svg(heat, path)
+    svg = path.read_text(encoding="utf-8")
+    assert svg.count("<rect") == int(heat.notna().to_numpy().sum()) + 1  # + leyenda
+    assert str(heat.index[0]) in svg and "energy" in svg
@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import pandas as pd
+
+from diario.incremental import build_kpis_incremental, load_state
+from diario.loaders import DataBundle
+from diario.scoring import build_kpis
+
+
+def _bundle(days: int, edits: dict | None = None, drop: str | None = None) -> DataBundle:
+    dates = pd.date_range("2025-12-01", periods=days, freq="D").strftime("%Y-%m-%d").tolist()
+    daily = pd.DataFrame(
+        [
+            {
+                "date": d,
+                "sleep_hours": 6 + (i % 3) * 0.5,
+                "energy": 1 + i % 5,
+                "focus_minutes": 30 * (i % 4),
+                "alcohol_units": i % 2,
+                "stalk_intensity": ["none", "low", "mid", "high"][i % 4],
+                "stalk_occurred": "true" if i % 4 else "false",
+                "feature_done": "si" if i % 3 == 0 else "no",
+                "notes": f"nota {i}",
+            }
+            for i, d in enumerate(dates)
+        ]
+    )
+    for d, values in (edits or {}).items():
+        for k, v in values.items():
+            daily.loc[daily["date"] == d, k] = v
+    if drop:
+        daily = daily[daily["date"] != drop]
+
+    # pomodoro y checkins solo en algunos días → columnas con NaN tras el join
+    pomodoro = pd.DataFrame(
+        [{"date": d, "event": "end", "phase": "work", "cycle": 1} for d in dates[::2] for _ in range(2)]
+    )
+    checkins = pd.DataFrame(
+        [{"date": d, "question": "q", "intensity_0_10": 3 + len(d) % 5} for d in dates[:-1:3]]
+    )
+    coach = pd.DataFrame(
+        [{"date": d, "score_0_6": i % 7, "impulses_count": i % 2, "alcohol_bool": "0"} for i, d in enumerate(dates)]
+    )
+    return DataBundle(daily=daily, checkins=checkins, pomodoro=pomodoro, coach=coach)
+
+
+def _assert_same(a, b):
+    pd.testing.assert_frame_equal(a.daily_table, b.daily_table)
+    pd.testing.assert_frame_equal(a.weekly_table, b.weekly_table)
+    pd.testing.assert_frame_equal(a.monthly_table, b.monthly_table)
+    pd.testing.assert_frame_equal(a.heatmap, b.heatmap)
+    assert a.meta == b.meta
+
+
+def test_incremental_matches_full_rebuild(tmp_path: Path):
+    state_path = tmp_path / "kpi_state.pkl"
+
+    first = _bundle(60)
+    _assert_same(build_kpis_incremental(first, state_path), build_kpis(first))
+
+    # hoy: fila nueva, una fila editada y una fecha borrada
+    second = _bundle(61, edits={"2025-12-10": {"energy": 5, "notes": "editada"}}, drop="2025-12-20")
+    incremental = build_kpis_incremental(second, state_path)
+    _assert_same(incremental, build_kpis(second))
+
+    state = load_state(state_path)
+    assert state is not None
+    assert state.dirty_dates == 3
+
+
+def test_incremental_noop_when_unchanged(tmp_path: Path):
+    state_path = tmp_path / "kpi_state.pkl"
+    data = _bundle(20)
+    build_kpis_incremental(data, state_path)
+    again = build_kpis_incremental(_bundle(20), state_path)
+
+    assert load_state(state_path).dirty_dates == 0
+    _assert_same(again, build_kpis(data))
@@ -0,0 +1,86 @@
+import gc
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from diario.loaders import DataBundle, _empty_to_na, _normalize_columns
+from diario.schema import apply_schema
+from diario.scoring import build_kpis
+
+
+def _raw_frames(years: int = 4, note_chars: int = 1200):
+    """Como llegan de Sheets/Supabase: todo object, encabezados sin normalizar y texto largo."""
+    n = int(years * 365.25)
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2020-01-01", periods=n).strftime("%Y-%m-%d")
+    daily = pd.DataFrame(
+        {
+            "Date": dates,
+            "Sleep Hours": [str(x) for x in rng.normal(7, 1, n).round(1)],
+            "Energy": [str(x) for x in rng.integers(1, 6, n)],
+            "Focus Minutes": [str(x) for x in rng.integers(0, 300, n)],
+            "Feature Done": rng.choice(["si", "no", ""], n),
+            "Stalk Intensity": rng.choice(["none", "low", " "], n),
+            "Notes": [f"nota {i} " * (note_chars // 8) for i in range(n)],
+            "Raw": [f"raw {i} " * (note_chars // 6) for i in range(n)],
+        },
+        dtype=object,
+    )
+    checkins = pd.DataFrame(
+        {
+            "Date": np.repeat(dates, 3),
+            "Question": "q",
+            "Intensity_0_10": "5",
+            "Answer_Raw": [f"resp {i} " * (note_chars // 14) for i in range(3 * n)],
+        },
+        dtype=object,
+    )
+    pomodoro = pd.DataFrame(
+        {"Date": np.repeat(dates, 4), "Event": ["start", "end"] * (2 * n), "Phase": "work", "Cycle": "1"},
+        dtype=object,
+    )
+    return daily, checkins, pomodoro
+
+
+def _peak(fn):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _shallow(frames) -> int:
+    # arreglos de la tabla (punteros para object), sin contar los strings: lo que duplica un df.copy()
+    return int(sum(f.memory_usage(deep=False).sum() for f in frames))
+
+
+def test_normalize_does_not_copy_frames():
+    frames = _raw_frames()
+    _, peak = _peak(lambda: [_empty_to_na(_normalize_columns(f)) for f in frames])
+
+    assert peak < 0.25 * _shallow(frames)  # con df.copy() por paso sería > 2x
+    assert list(frames[0].columns)[:3] == ["date", "sleep_hours", "energy"]
+    assert frames[0]["stalk_intensity"].isna().any()  # " " → NA en el mismo frame
+
+
+def test_load_to_kpis_peak_memory_budget():
+    frames = list(_raw_frames())
+    size, rows = _shallow(frames), len(frames[0])
+
+    def pipeline():
+        # como en load_data: nadie más retiene los frames crudos
+        bundle = DataBundle(*(_empty_to_na(_normalize_columns(frames.pop(0))) for _ in range(3)))
+        bundle = apply_schema(bundle, report=False)
+        return bundle, build_kpis(bundle)
+
+    (bundle, kpis), peak = _peak(pipeline)
+    assert len(kpis.daily_table) == rows
+    assert peak < 3.5 * size, f"pico {peak / 1e6:.2f} MB con tablas de {size / 1e6:.2f} MB"
+
+    # build_kpis no modifica el DataBundle (copias superficiales)
+    assert bundle.daily["feature_done"].dtype == "boolean"
+    assert str(bundle.daily["date"].dtype).startswith("datetime64")
@@ -0,0 +1,95 @@
+import json
+import re
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import migrate_to_supabase as mig
+from pg_standin import PgStandin, parse_pg_csv
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "apps-script" / "migrations"
+
+
+def _sql_columns(table: str) -> list[str]:
+    for path in sorted(MIGRATIONS.glob("V00*__create_*.sql")):
+        m = re.search(rf"CREATE TABLE IF NOT EXISTS {table} \((.*?)\n\);", path.read_text(encoding="utf-8"), re.S)
+        if m:
+            cols = [re.match(r"\s*(\w+)\s", line.split("--")[0] + " ").group(1) for line in m.group(1).splitlines()
+                    if re.match(r"\s*\w+\s", line.split("--")[0] + " ")]
+            return [c for c in cols if c not in ("id", "created_at", "CONSTRAINT")]
+    raise AssertionError(f"sin CREATE TABLE para {table}")
+
+
+@pytest.mark.parametrize("table", mig.ALL_TABLES)
+def test_copy_columns_follow_sql_migrations(table: str):
+    assert mig.COPY_COLUMNS[table] == _sql_columns(table)
+
+
+@pytest.mark.parametrize(
+    "sql_type, values",
+    [
+        ("mood_enum", mig.MOOD_ENUM), ("focus_type_enum", mig.FOCUS_TYPE_ENUM),
+        ("alcohol_context_enum", mig.ALCOHOL_CONTEXT_ENUM), ("stalk_intensity_enum", mig.STALK_INTENSITY_ENUM),
+        ("pomo_event_enum", mig.POMO_EVENT_ENUM), ("pomo_phase_enum", mig.POMO_PHASE_ENUM),
+        ("coach_level_enum", mig.COACH_LEVEL_ENUM), ("coach_tier_enum", mig.COACH_TIER_ENUM),
+        ("ev_status_enum", mig.EV_STATUS_ENUM),
+    ],
+)
+def test_enums_follow_sql_migrations(sql_type: str, values: tuple):
+    sql = "\n".join(p.read_text(encoding="utf-8") for p in sorted(MIGRATIONS.glob("V00*.sql")))
+    m = re.search(rf"CREATE TYPE {sql_type}\s+AS ENUM \((.*?)\);", sql, re.S)
+    assert m and tuple(re.findall(r"'([^']*)'", m.group(1))) == values
+
+
+def _as_copied(v):
+    if v is None:
+        return None
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if isinstance(v, (dict, list)):
+        return json.dumps(v, ensure_ascii=False)
+    return repr(v) if isinstance(v, (int, float)) else v
+
+
+def test_bulk_copy_merges_through_staging_table(tmp_path: Path):
+    daily = pd.DataFrame({
+        "date": ["2026-01-07", "2026-01-08", "2026-01-08"],
+        "from_user": ["u", "u", "v"],
+        "notes": ['dijo "hola", y se fue\nsegunda línea', None, "a,b"],
+        "raw": ["", "x", None],
+        "training_json": ['[{"type": "gym"}]', None, "{roto"],
+        "alcohol_consumed": ["sí", "0", None],
+        "sleep_hours": [7.5, "6", None],
+    })
+    conn = PgStandin({t: (mig.COPY_COLUMNS[t], mig.TABLE_CONFIG[t][1]) for t in ("daily", "pomodoro")})
+    conn.db.execute("INSERT INTO daily (date, from_user, notes) VALUES ('2026-01-07', 'u', 'viejo')")
+    conn.commit()
+
+    journal = mig.CheckpointJournal(tmp_path / "j.jsonl")
+    mig.migrate_table(conn, "daily", daily, batch_size=100, dry_run=False, journal=journal, bulk=True)
+
+    expected, _ = mig.coerce_frame("daily", daily)
+    got = conn.rows("daily")
+    assert len(got) == 3 and got[0]["id"] == 1  # la fila existente se actualizó (ON CONFLICT DO UPDATE)
+    for row, rec in zip(got, expected):
+        assert {c: row[c] for c in mig.COPY_COLUMNS["daily"]} == {c: _as_copied(v) for c, v in rec.items()}
+    assert got[0]["raw"] is None and got[1]["raw"] == "x"  # _to_str("") → NULL; "" entre comillas sería ""
+
+    assert any(s.startswith("CREATE TEMP TABLE _stage_daily (LIKE daily") for s in conn.statements)
+    merge = [s for s in conn.statements if s.startswith("INSERT INTO daily")]
+    assert merge and "ON CONFLICT (date, from_user) DO UPDATE SET" in merge[0]
+    assert conn.db.execute("SELECT count(*) FROM sqlite_temp_master").fetchone()[0] == 0  # staging dropeada
+
+    # --resume: nada pendiente, no se vuelve a abrir COPY
+    conn.statements.clear()
+    mig.migrate_table(conn, "daily", daily, batch_size=100, dry_run=False,
+                      journal=mig.CheckpointJournal(tmp_path / "j.jsonl", resume=True), bulk=True)
+    assert conn.statements == []
+
+
+def test_csv_chunks_roundtrip_nulls_and_quotes():
+    records = [{"recorded_at": "t", "date": "2026-01-07", "event": None, "phase": "", "cycle": 2, "meta": {"at": 'x"y'}}]
+    chunks = list(mig.iter_csv_chunks("pomodoro", records * 5, chunk_rows=2))
+    assert len(chunks) == 3
+    assert parse_pg_csv(chunks[0])[0] == ["t", "2026-01-07", None, "", "2", '{"at": "x\\"y"}']
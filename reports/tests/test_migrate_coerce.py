@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+import migrate_to_supabase as mig
+from migrate_fixtures import synthetic_sheet, synthetic_typed_sheet
+
+# "dd/mm/yyyy" en el fixture dispara el aviso de dayfirst en el helper escalar
+pytestmark = pytest.mark.filterwarnings("ignore:Parsing dates")
+
+
+def _row_by_row(table: str, df: pd.DataFrame) -> tuple[list[dict], int]:
+    coerce_fn = mig.TABLE_CONFIG[table][0]
+    records = [coerce_fn(row.to_dict()) for _, row in df.iterrows()]
+    return [r for r in records if r is not None], sum(r is None for r in records)
+
+
+@pytest.mark.parametrize("table", mig.ALL_TABLES)
+@pytest.mark.parametrize("variant", ["mixed", "iso", "typed"])
+def test_coerce_frame_matches_row_coercers(table: str, variant: str):
+    if variant == "typed":
+        df = synthetic_typed_sheet(table, 300, seed=7)
+    else:
+        df = synthetic_sheet(table, 300, seed=len(table), iso_only=variant == "iso")
+
+    expected = _row_by_row(table, df)
+    records, skipped = mig.coerce_frame(table, df)
+
+    assert (records, skipped) == expected
+    assert records and skipped  # el fixture ejercita ambos caminos
+    assert list(records[0]) == list(expected[0][0])
+
+
+def test_coerce_frame_missing_columns_and_fresh_json_defaults():
+    df = pd.DataFrame({"date": ["2026-01-07", "2026-01-08"], "timestamp": ["2026-01-07T10:00:00Z", None]})
+    records, skipped = mig.coerce_frame("pomodoro", df)
+
+    assert skipped == 1 and records[0]["meta"] == {} and records[0]["event"] is None
+    daily, _ = mig.coerce_frame("daily", df)
+    assert daily[0]["training_json"] is not daily[1]["training_json"]
@@ -0,0 +1,47 @@
+import threading
+
+import migrate_to_supabase as mig
+from diario.supabase_client import SupabaseClient, SupabaseConfig
+from postgrest_stub import PostgrestStub
+
+
+def _rows(n: int) -> list[dict]:
+    return [{"recorded_at": f"2026-01-01T00:{i // 60:02d}:{i % 60:02d}+00:00", "date": "2026-01-01", "cycle": i} for i in range(n)]
+
+
+def test_pipelined_upsert_retries_splits_and_isolates_bad_rows(monkeypatch):
+    monkeypatch.setattr(mig, "PIPELINE_MIN_BATCH", 2)
+    lock = threading.Lock()
+    throttled: list[int] = []
+
+    def fault(method, table, payload):
+        if method != "POST":
+            return None
+        if len(payload) > 40:
+            return 413  # payload demasiado grande → partir
+        if any(r["cycle"] == 77 for r in payload):
+            return 400  # fila inválida → solo esa cuenta como error
+        with lock:
+            if len(throttled) < 3:
+                throttled.append(len(payload))
+                return 429  # rate limit transitorio → reintento
+        return None
+
+    rows = _rows(300)
+    with PostgrestStub({"pomodoro": []}, delay=0.02, fault=fault) as stub:
+        sb = SupabaseClient(SupabaseConfig(url=stub.url, key="test", retries_total=0))
+        ok, err = mig._upsert_pipelined(sb, "pomodoro", rows, ["recorded_at"], False, batch_size=100, concurrency=4)
+
+    assert (ok, err) == (299, 1)
+    assert sorted(r["cycle"] for r in stub.tables["pomodoro"]) == [i for i in range(300) if i != 77]
+    assert stub.max_in_flight > 1
+    assert len(throttled) == 3
+
+
+def test_rest_client_with_src_on_sys_path(monkeypatch):
+    # importado como `migrate_to_supabase` (sin paquete padre), igual que python src/migrate_to_supabase.py
+    monkeypatch.setenv("SUPABASE_URL", "http://127.0.0.1:1")
+    monkeypatch.setenv("SUPABASE_SERVICE_KEY", "test")
+    sb = mig._get_rest_client(concurrency=30)
+    assert isinstance(sb, SupabaseClient)
+    assert sb.cfg.retries_total == 0 and sb.cfg.pool_maxsize == 30
@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import pandas as pd
+
+import migrate_to_supabase as mig
+from diario.supabase_client import SupabaseClient, SupabaseConfig
+from postgrest_stub import PostgrestStub
+
+
+class _FlakyClient:
+    """Imita client.table(t).upsert(...).execute() de supabase-py; falla desde el batch `fail_from`."""
+
+    def __init__(self, fail_from: int | None = None):
+        self.fail_from = fail_from
+        self.sent: list[list[dict]] = []
+
+    def table(self, name: str) -> "_FlakyClient":
+        return self
+
+    def upsert(self, rows, **kwargs) -> "_FlakyClient":
+        self._rows = rows
+        return self
+
+    def execute(self) -> None:
+        if self.fail_from is not None and len(self.sent) >= self.fail_from:
+            raise ConnectionError("connection reset")
+        self.sent.append(self._rows)
+
+
+def _pomodoro(n: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "timestamp": [f"2026-01-01T00:{i // 60:02d}:{i % 60:02d}Z" for i in range(n)],
+        "date": "2026-01-01",
+        "event": "end",
+        "phase": "work",
+        "cycle": range(n),
+    })
+
+
+def test_resume_skips_committed_batches(tmp_path: Path):
+    df, path = _pomodoro(250), tmp_path / "journal.jsonl"
+
+    flaky = _FlakyClient(fail_from=2)
+    mig.migrate_table(flaky, "pomodoro", df, batch_size=50, dry_run=False, journal=mig.CheckpointJournal(path))
+    assert len(flaky.sent) == 2
+
+    healthy = _FlakyClient()
+    mig.migrate_table(healthy, "pomodoro", df, batch_size=50, dry_run=False,
+                      journal=mig.CheckpointJournal(path, resume=True))
+    assert [r["cycle"] for b in healthy.sent for r in b] == list(range(100, 250))
+
+    # todo confirmado → no se envía nada; sin --resume el journal se reinicia
+    again = _FlakyClient()
+    mig.migrate_table(again, "pomodoro", df, batch_size=50, dry_run=False,
+                      journal=mig.CheckpointJournal(path, resume=True))
+    assert again.sent == []
+    assert mig.CheckpointJournal(path).pending("pomodoro", [{}] * 3) == [(0, 3)]
+
+
+def test_resume_rechecks_hashes_and_pipeline_ranges(tmp_path: Path):
+    df, path = _pomodoro(200), tmp_path / "journal.jsonl"
+    journal = mig.CheckpointJournal(path)
+    mig.migrate_table(_FlakyClient(fail_from=3), "pomodoro", df, batch_size=40, dry_run=False, journal=journal)
+
+    # una fila del rango 40-79 cambió en la fuente → ese rango se vuelve a subir
+    df.loc[45, "event"] = "start"
+    with PostgrestStub({"pomodoro": []}) as stub:
+        sb = SupabaseClient(SupabaseConfig(url=stub.url, key="test", retries_total=0))
+        mig.migrate_table(sb, "pomodoro", df, batch_size=40, dry_run=False, concurrency=3,
+                          journal=mig.CheckpointJournal(path, resume=True))
+
+    uploaded = sorted(r["cycle"] for r in stub.tables["pomodoro"])
+    assert uploaded == list(range(40, 80)) + list(range(120, 200))
+    assert mig.CheckpointJournal(path, resume=True).pending("pomodoro", mig.coerce_frame("pomodoro", df)[0]) == []
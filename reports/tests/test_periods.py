@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from diario.periods import NAT, day_ordinal, day_partials, period_ids, rollup
+from diario.scoring import _daily_table, build_kpis
+from test_incremental_kpis import _bundle
+
+
+def test_period_ids_match_calendar():
+    dates = pd.Series(pd.date_range("2019-12-20", "2027-01-10", freq="D").date)
+    ts = pd.to_datetime(dates)
+    iso = ts.dt.isocalendar()
+
+    expected_week = iso["year"].astype(str) + "-W" + iso["week"].astype(str).str.zfill(2)
+    assert period_ids(dates, "week").tolist() == expected_week.tolist()
+    assert period_ids(dates, "month").tolist() == ts.dt.strftime("%Y-%m").tolist()
+    assert period_ids(dates, "quarter").tolist() == (ts.dt.year.astype(str) + "-Q" + ts.dt.quarter.astype(str)).tolist()
+
+
+def test_period_ids_invalid_dates_are_nan():
+    ids = period_ids(pd.Series(["2024-01-01", "no es fecha", None]), "week")
+    assert ids.iloc[0] == "2024-W01"
+    assert ids.iloc[1:].isna().all()
+    assert day_ordinal(["nope"])[0] == NAT
+
+
+def test_rollup_matches_groupby():
+    merged = _daily_table(_bundle(120))
+    partials = day_partials(merged)
+    spec = {out: (src, how) for out, src, how in partials.spec}
+
+    for period in ("week", "month"):
+        table = rollup(partials, period)
+        expected = merged.groupby(period).agg(**spec).reset_index()
+        pd.testing.assert_frame_equal(table, expected, check_dtype=False)
+        assert table["days"].dtype == np.int64
+        assert table["focus_min"].dtype == np.int64  # suma de enteros sigue entera
+
+
+def test_quarter_and_coach_cycles():
+    merged = _daily_table(_bundle(120))  # 2025-12-01 .. 2026-03-30
+    partials = day_partials(merged)
+
+    quarters = rollup(partials, "quarter")
+    assert quarters["quarter"].tolist() == ["2025-Q4", "2026-Q1"]
+    assert quarters["days"].tolist() == [31, 89]
+
+    cycles = rollup(partials, "coach21")
+    assert cycles["coach21"].iloc[:2].tolist() == ["2025-12-01", "2025-12-22"]
+    assert cycles["days"].tolist() == [21] * 5 + [15]
+    assert cycles["focus_min"].sum() == merged["focus_minutes"].sum()
+
+    shifted = rollup(partials, "coach21", anchor="2025-11-24")  # ciclo empezado antes de los datos
+    assert shifted["coach21"].iloc[0] == "2025-11-24"
+    assert shifted["days"].iloc[0] == 14
+
+
+def test_build_kpis_periods_from_single_pass():
+    kpis = build_kpis(_bundle(60))
+    assert kpis.weekly_table["week"].is_monotonic_increasing
+    assert kpis.weekly_table["days"].sum() == kpis.monthly_table["days"].sum() == 60
+    assert "status" in kpis.weekly_table.columns
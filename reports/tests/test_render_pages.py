@@ -0,0 +1,87 @@
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from diario import render
+from diario.loaders import DataBundle
+from diario.render import render_all
+from diario.scoring import build_kpis
+
+
+def _kpis(days: int = 70):
+    dates = pd.date_range("2025-11-20", periods=days, freq="D").strftime("%Y-%m-%d").tolist()
+    daily = pd.DataFrame(
+        [
+            {"date": d, "sleep_hours": 6 + i % 3, "energy": 1 + i % 5, "focus_minutes": 20 * (i % 6), "notes": f"día <{i}>"}
+            for i, d in enumerate(dates)
+        ]
+    )
+    pomodoro = pd.DataFrame([{"date": d, "event": "end", "phase": "work", "cycle": 1} for d in dates[::3]])
+    checkins = pd.DataFrame([{"date": d, "question": "q", "intensity_0_10": 4} for d in dates[::2]])
+    data = DataBundle(daily=daily, checkins=checkins, pomodoro=pomodoro)
+    return data, build_kpis(data)
+
+
+def _pages(out: Path) -> dict[str, bytes]:
+    return {p.name: p.read_bytes() for p in out.glob("*.html")}
+
+
+def test_parallel_render_is_byte_identical(tmp_path: Path):
+    data, kpis = _kpis()
+    serial, parallel = tmp_path / "serial", tmp_path / "parallel"
+    serial.mkdir()
+    parallel.mkdir()
+
+    render_all(serial, kpis, data, tz="America/Santiago")
+    render_all(parallel, kpis, data, tz="America/Santiago", jobs=3)
+
+    pages = _pages(serial)
+    assert len([n for n in pages if n.startswith("weekly_")]) == len(kpis.weekly_table)
+    assert len([n for n in pages if n.startswith("monthly_")]) == len(kpis.monthly_table)
+    assert pages == _pages(parallel)
+
+
+def test_unchanged_pages_are_skipped(tmp_path: Path):
+    data, kpis = _kpis(days=45)
+    total = len(kpis.weekly_table) + len(kpis.monthly_table)
+
+    assert render_all(tmp_path, kpis, data, tz="America/Santiago") == {"rendered": total, "skipped": 0}
+    assert render_all(tmp_path, kpis, data, tz="America/Santiago") == {"rendered": 0, "skipped": total}
+
+    # un día editado → solo su semana y su mes se reescriben
+    data.daily.loc[data.daily["date"] == "2025-12-03", "energy"] = 5
+    kpis = build_kpis(data)
+    assert render_all(tmp_path, kpis, data, tz="America/Santiago") == {"rendered": 2, "skipped": total - 2}
+    assert "<td>5</td>" in (tmp_path / "weekly_2025-W49.html").read_text(encoding="utf-8")
+
+    # página borrada a mano → se regenera aunque el hash coincida
+    (tmp_path / "monthly_2025-11.html").unlink()
+    assert render_all(tmp_path, kpis, data, tz="America/Santiago")["rendered"] == 1
+
+    assert render_all(tmp_path, kpis, data, tz="America/Santiago", force=True)["rendered"] == total
+
+
+def test_template_edit_is_picked_up_in_the_same_process(tmp_path: Path, monkeypatch):
+    # como `serve`: el mismo proceso renderiza antes y después de editar period.html.j2
+    templates = tmp_path / "templates"
+    shutil.copytree(Path(render.__file__).resolve().parent.parent / "templates", templates)
+    env = lambda: Environment(loader=FileSystemLoader(str(templates)), autoescape=select_autoescape(["html", "xml"]))
+    monkeypatch.setattr(render, "_env", env)
+    monkeypatch.setattr(render, "_process_env", lru_cache(maxsize=None)(env))
+    out = tmp_path / "out"
+    out.mkdir()
+    data, kpis = _kpis(days=20)
+    total = len(kpis.weekly_table) + len(kpis.monthly_table)
+
+    render_all(out, kpis, data, tz="America/Santiago")
+    tpl = templates / "period.html.j2"
+    tpl.write_text(tpl.read_text(encoding="utf-8") + "<!-- editado -->\n", encoding="utf-8")
+    st = tpl.stat()
+    os.utime(tpl, (st.st_atime, st.st_mtime + 5))
+
+    assert render_all(out, kpis, data, tz="America/Santiago")["rendered"] == total
+    assert "<!-- editado -->" in (out / f"weekly_{kpis.weekly_table['week'].iloc[-1]}.html").read_text(encoding="utf-8")
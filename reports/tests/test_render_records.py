@@ -0,0 +1,46 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from diario.render import _to_records
+
+
+def test_to_records_handles_dates_na_and_timestamps():
+    df = pd.DataFrame(
+        {
+            "date": [date(2026, 1, 7), date(2026, 1, 8)],
+            "ts": pd.to_datetime(["2026-01-07 10:25:00", None]),
+            "score": [1.5, np.nan],
+            "energy": [3, 4],
+            "flag": [True, False],
+            "label": ["low", None],
+            "training": [[{"type": "gym"}], {}],
+            "units": pd.array([2, pd.NA], dtype="Int64"),
+        }
+    )
+
+    assert _to_records(df) == [
+        {
+            "date": "2026-01-07",
+            "ts": "2026-01-07T10:25:00",
+            "score": 1.5,
+            "energy": 3,
+            "flag": True,
+            "label": "low",
+            "training": [{"type": "gym"}],
+            "units": 2,
+        },
+        {
+            "date": "2026-01-08",
+            "ts": None,
+            "score": None,
+            "energy": 4,
+            "flag": False,
+            "label": None,
+            "training": {},
+            "units": None,
+        },
+    ]
+    assert _to_records(df, limit=1)[0]["date"] == "2026-01-08"
+    assert _to_records(pd.DataFrame()) == []
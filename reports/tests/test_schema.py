@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import migrate_to_supabase as mig
+from diario import loaders
+from diario.loaders import DataBundle
+from diario.schema import DATE_DTYPE, apply_schema, coerce_table
+from diario.scoring import build_kpis
+from diario.snapshot import load_snapshot, save_snapshot
+from migrate_fixtures import synthetic_sheet
+from test_incremental_kpis import _bundle
+
+
+def test_coerce_table_daily_types():
+    raw = pd.DataFrame(
+        {
+            "date": ["2026-01-05", "2026-01-06", "no"],
+            "energy": ["3", "", "5"],
+            "focus_minutes": ["90", "120", None],
+            "mood": [" Calma", "feliz", None],
+            "focus_type": ["project", "none", "work"],
+            "feature_done": ["si", "no", ""],
+            "notes": ["a", "b", "c"],
+        }
+    )
+    typed, dropped = coerce_table("daily", raw)
+
+    assert str(typed["date"].dtype) == DATE_DTYPE
+    assert typed["date"].isna().tolist() == [False, False, True]
+    assert str(typed["energy"].dtype) == "Int8"
+    assert str(typed["focus_minutes"].dtype) == "Int32"
+    assert typed["mood"].dtype == "category" and typed["mood"].iloc[0] == "calma"
+    assert pd.isna(typed["mood"].iloc[1]) and dropped == {"mood": 1}  # "feliz" no está en mood_enum
+    assert list(typed["focus_type"].cat.categories) == ["trading", "project", "work", "lectura", "estudio", "none"]
+    assert typed["feature_done"].tolist()[:2] == [True, False] and pd.isna(typed["feature_done"].iloc[2])
+    assert typed["notes"].dtype == raw["notes"].dtype  # fuera del esquema: sin tocar
+
+
+def test_coerce_table_ints_never_lose_values():
+    raw = pd.DataFrame({"date": ["2026-01-05"] * 3, "energy": [1, 2.5, 3], "focus_minutes": [1, 2, 3_000_000_000]})
+    typed, _ = coerce_table("daily", raw)
+    assert typed["energy"].dtype == np.float64  # decimales: no se trunca a Int8
+    assert str(typed["focus_minutes"].dtype) == "Int64"  # fuera de Int32: se ensancha
+
+
+def test_typed_bundle_gives_same_kpis():
+    raw = _bundle(90)
+    typed = apply_schema(_bundle(90), report=False)
+    a, b = build_kpis(raw), build_kpis(typed)
+
+    pd.testing.assert_frame_equal(a.weekly_table, b.weekly_table)
+    pd.testing.assert_frame_equal(a.monthly_table, b.monthly_table)
+    pd.testing.assert_frame_equal(a.heatmap, b.heatmap)
+    pd.testing.assert_frame_equal(a.daily_table, b.daily_table, check_dtype=False)
+
+
+def test_apply_schema_reports_memory(capsys):
+    n = 5000
+    dates = pd.date_range("2012-01-01", periods=n).strftime("%Y-%m-%d")
+    pomodoro = pd.DataFrame(
+        {"date": dates, "event": ["start", "end"] * (n // 2), "phase": "work", "cycle": [str(i % 4 + 1) for i in range(n)]}
+    ).astype(object)
+    bundle = DataBundle(daily=pd.DataFrame(), checkins=pd.DataFrame(), pomodoro=pomodoro)
+    before = pomodoro.memory_usage(deep=True).sum()
+
+    apply_schema(bundle)
+    after = bundle.pomodoro.memory_usage(deep=True).sum()
+    assert after < before / 4
+    assert "Tipos 'pomodoro': 5000 filas" in capsys.readouterr().out
+
+
+def test_snapshot_keeps_types(tmp_path):
+    typed = apply_schema(_bundle(30), report=False)
+    save_snapshot(tmp_path, "k", typed)
+    cached = load_snapshot(tmp_path, "k", max_age=60)
+    for name in ("daily", "checkins", "pomodoro", "coach"):
+        pd.testing.assert_series_equal(getattr(cached, name).dtypes, getattr(typed, name).dtypes)
+
+
+def test_mixed_date_formats_parse_like_the_migrator():
+    raw = pd.Series(["2025-01-01", "01/02/2025", pd.Timestamp("2025-01-03").date(), "2025-01-04T23:00:00-03:00", "mañana", None])
+    typed = coerce_table("daily", pd.DataFrame({"date": raw}))[0]["date"]
+    assert typed.dt.strftime("%Y-%m-%d").tolist()[:4] == [mig._to_date_str(v) for v in raw[:4]]
+    assert typed.iloc[4:].isna().all()
+
+
+@pytest.mark.filterwarnings("ignore:Parsing dates")
+@pytest.mark.parametrize("typed", [True, False])
+def test_dirty_sheet_through_loader_keeps_migrator_rows(monkeypatch, typed):
+    raw = {t: synthetic_sheet(t, 800, seed=1) for t in ("daily", "checkins", "pomodoro", "coach")}
+    monkeypatch.setattr(loaders, "_read_excel", lambda path: DataBundle(**{t: df.copy() for t, df in raw.items()}))
+    data = loaders.load_data("excel", typed=typed)
+
+    for table, df in raw.items():
+        expected, skipped = mig.coerce_frame(table, df)
+        records, loaded_skipped = mig.coerce_frame(table, getattr(data, table))
+        assert loaded_skipped == skipped
+        assert [r["date"] for r in records] == [r["date"] for r in expected]
+        if not typed:
+            assert records == expected  # sin tipos: el migrador ve la fuente tal cual
+
+
+def test_boolean_does_not_merge_true_with_one():
+    raw = pd.DataFrame({"date": ["2026-01-05"] * 5, "feature_done": pd.Series([1.0, True, "si", 0, None], dtype=object)})
+    typed = coerce_table("daily", raw)[0]["feature_done"]
+    assert typed.tolist()[1:4] == [True, True, False]  # True no hereda la etiqueta "1.0" del primer valor
+    assert typed.isna().tolist() == [True, False, False, False, True]
@@ -0,0 +1,95 @@
+import argparse
+import json
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pandas as pd
+
+from diario.serve import ReportService, make_server
+
+
+def _write_excel(path: Path, energy_day3: int) -> None:
+    dates = pd.date_range("2026-01-05", periods=14).strftime("%Y-%m-%d")
+    daily = pd.DataFrame({"date": dates, "energy": 4, "sleep_hours": 7})
+    daily.loc[3, "energy"] = energy_day3
+    with pd.ExcelWriter(path) as xl:
+        daily.to_excel(xl, sheet_name="Daily", index=False)
+        pd.DataFrame({"date": dates[:2], "question": "q", "intensity_0_10": 5}).to_excel(xl, sheet_name="Checkins", index=False)
+        pd.DataFrame({"date": dates[:2], "event": "end", "phase": "work"}).to_excel(xl, sheet_name="Pomodoro", index=False)
+
+
+def _args(tmp_path: Path) -> argparse.Namespace:
+    return argparse.Namespace(
+        source="excel", excel_path=str(tmp_path / "diario.xlsx"), spreadsheet_id=None, creds=None,
+        cache_dir=None, ai_cache_dir=None, max_age=0, sync="full", kpi_state=None, out=str(tmp_path / "out"), tz="UTC",
+        jobs=1, force=False, ai="off", heatmap_backend="png", heatmap_days=90,
+    )
+
+
+def _post(url: str, token: str = "") -> tuple[int, dict]:
+    req = urllib.request.Request(url, method="POST", headers={"Authorization": f"Bearer {token}"} if token else {})
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_serve_refreshes_only_changed_stages(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("SERVE_TOKEN", "s3cret")
+    _write_excel(tmp_path / "diario.xlsx", energy_day3=4)
+    service = ReportService(_args(tmp_path))
+    first = service.refresh()
+    assert first["rendered"] == 3  # 2 semanas + 1 mes, todo nuevo
+
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(base + "/") as resp:
+            assert "Diario Operativo" in resp.read().decode("utf-8")
+
+        assert _post(base + "/refresh")[0] == 401
+
+        status, same = _post(base + "/refresh", "s3cret")
+        assert status == 200 and same["dirty_dates"] == 0 and same["rendered"] == 0
+
+        _write_excel(tmp_path / "diario.xlsx", energy_day3=1)  # el bot escribió una fila
+        status, changed = _post(base + "/refresh", "s3cret")
+        assert changed["dirty_dates"] == 1
+        assert changed["rendered"] == 2  # solo la semana y el mes de esa fecha
+
+        with urllib.request.urlopen(base + "/status") as resp:
+            assert json.loads(resp.read())["dirty_dates"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_serve_hides_dotfiles(tmp_path: Path):
+    _write_excel(tmp_path / "diario.xlsx", energy_day3=4)
+    args = _args(tmp_path)
+    args.kpi_state = str(tmp_path / "out" / ".kpi_state.pkl")  # el caso que el README ya no sugiere
+    service = ReportService(args)
+    service.refresh()
+    assert (tmp_path / "out" / ".render_manifest.json").exists()
+
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        for path in ("/.render_manifest.json", "/%2Ekpi_state.pkl", "/assets/../.kpi_state.pkl"):
+            for method in ("GET", "HEAD"):
+                try:
+                    urllib.request.urlopen(urllib.request.Request(base + path, method=method))
+                except urllib.error.HTTPError as e:
+                    assert e.code == 404, (method, path)
+                else:
+                    raise AssertionError(f"{method} {path} servido")
+        with urllib.request.urlopen(base + "/index.html") as resp:
+            assert resp.status == 200
+    finally:
+        server.shutdown()
+        server.server_close()
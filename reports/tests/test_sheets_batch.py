@@ -0,0 +1,204 @@
+import copy
+import json
+import sys
+
+import gspread
+import pandas as pd
+import pytest
+import requests
+
+import migrate_to_supabase as mig
+from diario import loaders
+from diario.sheets_reader import batch_get_values, dedupe_headers, find_header_row, records_frame
+
+SPREADSHEET_ID = "1AbCdEf"
+
+# Respuesta grabada de spreadsheets.values.batchGet (FORMATTED_VALUE: todo texto, filas sin celdas vacías al final)
+RECORDED = {
+    "Daily": [
+        ["date", "Sleep Hours", "energy", "mood", "focus_minutes", "alcohol_consumed", "notes"],
+        ["2026-01-05", "7.5", "4", "enfocado", "90", "FALSE", "ok"],
+        ["2026-01-06", "6", "3", "cansado", "1,200", "TRUE"],
+        [],
+        ["2026-01-08", "", "5", "calma", "45", "FALSE", " "],
+    ],
+    "Checkins": [
+        ["date", "question", "intensity_0_10"],
+        ["2026-01-05", "¿cómo vas?", "7"],
+    ],
+    "Pomodoro": [
+        ["date", "event", "phase", "cycle"],
+        ["2026-01-05", "end", "work", "1"],
+        ["2026-01-05", "end", "short_break", "1"],
+    ],
+    "CoachState": [
+        ["2026-01-05T08:00:00", "2026-01-05", "1"],  # sin encabezado: columnas predefinidas
+    ],
+    "EnglishVoice": [
+        ["export"],
+        ["Timestamp", "date", "status", "status", ""],
+        ["2026-01-05T09:00:00", "2026-01-05", "REPLIED", "x", "y"],
+        ["", ""],
+    ],
+}
+
+
+def _api_error(code: int, message: str) -> gspread.exceptions.APIError:
+    response = requests.Response()
+    response.status_code = code
+    response._content = json.dumps({"error": {"code": code, "message": message, "status": "ERR"}}).encode()
+    return gspread.exceptions.APIError(response)
+
+
+class FakeHTTPClient(gspread.http_client.HTTPClient):
+    """Sirve RECORDED como el cliente HTTP de gspread y registra cada llamada."""
+
+    def __init__(self, tabs=RECORDED):  # sin sesión ni credenciales
+        self.tabs = copy.deepcopy(tabs)
+        self.calls = []
+        self.fail = None  # APIError para la próxima llamada batchGet
+
+    def values_batch_get(self, spreadsheet_id, ranges, params=None):
+        self.calls.append(("batchGet", list(ranges)))
+        if self.fail is not None:
+            raise self.fail
+        value_ranges = []
+        for a1 in ranges:
+            title = a1.strip("'").replace("''", "'")
+            if title not in self.tabs:
+                raise _api_error(400, f"Unable to parse range: {a1}")
+            vr = {"range": f"{a1}!A1:Z1000", "majorDimension": "ROWS"}
+            if self.tabs[title]:
+                vr["values"] = self.tabs[title]
+            value_ranges.append(vr)
+        return {"spreadsheetId": spreadsheet_id, "valueRanges": value_ranges}
+
+    def fetch_sheet_metadata(self, spreadsheet_id, params=None):
+        self.calls.append(("metadata", None))
+        return {"sheets": [{"properties": {"title": t}} for t in self.tabs]}
+
+    def values_get(self, spreadsheet_id, range_name, params=None):
+        # lo que usa ws.get_all_records(): una pestaña por llamada
+        self.calls.append(("get", range_name))
+        title = range_name.strip("'").replace("''", "'")
+        vr = {"range": f"{range_name}!A1:Z1000", "majorDimension": "ROWS"}
+        return {**vr, "values": self.tabs[title]} if self.tabs[title] else vr
+
+
+class FakeClient:
+    def __init__(self, http_client):
+        self.http_client = http_client
+
+
+@pytest.fixture
+def fake_sheets(monkeypatch, tmp_path):
+    http = FakeHTTPClient()
+    creds = tmp_path / "sa.json"
+    creds.write_text("{}")
+    monkeypatch.setattr(loaders, "_gspread_client", lambda path: FakeClient(http))
+    return http, str(creds)
+
+
+def test_records_frame_matches_get_all_records():
+    http = FakeHTTPClient()
+    for tab in ("Daily", "Checkins", "Pomodoro"):
+        ws = gspread.Worksheet(None, {"title": tab, "sheetId": 0}, SPREADSHEET_ID, http)
+        expected = pd.DataFrame(ws.get_all_records(default_blank="", head=1))
+        pd.testing.assert_frame_equal(records_frame(RECORDED[tab]), expected)
+    assert records_frame([]).empty
+    with pytest.raises(ValueError, match="duplicates"):
+        records_frame([["a", "a"], ["1", "2"]])
+
+
+def test_bundle_in_one_batch_call(fake_sheets):
+    http, creds = fake_sheets
+    data, extra = loaders.read_sheets_bundle(SPREADSHEET_ID, creds, extra_tabs=["CoachState", "EnglishVoice"])
+
+    assert http.calls[0] == (
+        "batchGet", ["'Daily'", "'Checkins'", "'Pomodoro'", "'Coach'", "'CoachState'", "'EnglishVoice'"]
+    )
+    assert sorted(extra) == ["CoachState", "EnglishVoice"]
+
+    assert list(data.daily.columns)[:2] == ["date", "sleep_hours"]
+    assert len(data.daily) == 4  # la fila vacía intermedia se conserva, como get_all_records
+    assert data.daily["focus_minutes"].tolist()[:2] == [90, 1200]
+    assert data.daily["notes"].isna().tolist() == [False, True, True, True]
+    assert data.coach.empty
+
+
+def test_missing_optional_tab_costs_one_metadata_call(fake_sheets):
+    http, creds = fake_sheets
+    data, extra = loaders.read_sheets_bundle(SPREADSHEET_ID, creds, extra_tabs=["CoachState"])
+
+    assert [kind for kind, _ in http.calls] == ["batchGet", "metadata", "batchGet"]
+    assert http.calls[-1][1] == ["'Daily'", "'Checkins'", "'Pomodoro'", "'CoachState'"]
+    assert data.coach.empty and list(extra) == ["CoachState"]
+
+
+def test_present_optional_tabs_single_call(fake_sheets):
+    http, creds = fake_sheets
+    http.tabs["Coach"] = [["date", "score_0_6", "alcohol_bool"], ["2026-01-05", "5", "FALSE"]]
+    data, _ = loaders.read_sheets_bundle(SPREADSHEET_ID, creds, extra_tabs=["CoachState", "EnglishVoice"])
+
+    assert len(http.calls) == 1 and http.calls[0][0] == "batchGet"
+    assert data.coach["score_0_6"].tolist() == [5]
+
+
+def test_quota_errors_are_not_retried(fake_sheets):
+    http, creds = fake_sheets
+    http.fail = _api_error(429, "Quota exceeded for quota metric 'Read requests'")
+    with pytest.raises(gspread.exceptions.APIError) as exc:
+        loaders.read_sheets_bundle(SPREADSHEET_ID, creds)
+    assert exc.value.code == 429
+    assert [kind for kind, _ in http.calls] == ["batchGet"]  # sin metadata ni segundo batch
+
+
+def test_missing_required_tab_raises(fake_sheets):
+    http, creds = fake_sheets
+    del http.tabs["Pomodoro"]
+    with pytest.raises(ValueError, match="Pomodoro"):
+        loaders.read_sheets_bundle(SPREADSHEET_ID, creds)
+
+
+def test_header_helpers():
+    assert find_header_row(RECORDED["EnglishVoice"]) == 1
+    assert find_header_row(RECORDED["CoachState"]) is None
+    assert dedupe_headers(["\ufeffTime stamp", "a", "a", "", "", "A "]) == [
+        "time_stamp", "a", "a_1", "", "_col_1", "a_2"
+    ]
+
+
+def test_extra_tabs_from_batched_values(capsys):
+    values = batch_get_values(FakeClient(FakeHTTPClient()), SPREADSHEET_ID, [], optional=["CoachState", "EnglishVoice"])
+    extra = mig._load_extra_sheets(SPREADSHEET_ID, "unused.json", values)
+
+    coach_state = extra["coach_state"]
+    assert list(coach_state.columns) == mig._SHEET_COLUMNS["CoachState"]
+    assert coach_state["week_index"].tolist() == ["1"]
+    assert coach_state["day90"].isna().all()
+
+    voice = extra["english_voice"]
+    assert list(voice.columns) == ["timestamp", "date", "status", "status_1", ""]
+    assert len(voice) == 1 and voice["status"].tolist() == ["REPLIED"]
+    out = capsys.readouterr().out
+    assert "1 fila(s) antes del encabezado" in out and "usando columnas predefinidas" in out
+
+
+def test_migrate_sheets_source_one_batch_call(fake_sheets, monkeypatch):
+    http, creds = fake_sheets
+    seen = {}
+    monkeypatch.setattr(mig, "migrate_table", lambda client, table, df, **kw: seen.setdefault(table, df))
+    argv = ["migrate", "--source", "sheets", "--spreadsheet-id", SPREADSHEET_ID, "--creds", creds, "--dry-run"]
+    monkeypatch.setattr(sys, "argv", argv)
+    assert mig.main() == 0
+    assert seen["daily"]["mood"].tolist()[:2] == ["enfocado", "cansado"]
+    assert seen["daily"]["date"].tolist()[0] == "2026-01-05"  # crudo: lo coerciona COLUMN_SPECS, no schema.py
+    assert [kind for kind, _ in http.calls] == ["batchGet", "metadata", "batchGet"]  # Coach no existe
+    assert {r for kind, ranges in http.calls if kind == "batchGet" for r in ranges} >= {"'CoachState'", "'EnglishVoice'"}
+
+
+def test_extra_tabs_fetched_by_migrator(fake_sheets):
+    http, creds = fake_sheets
+    extra = mig._load_extra_sheets(SPREADSHEET_ID, creds)
+    assert http.calls == [("batchGet", ["'CoachState'", "'EnglishVoice'"])]
+    assert extra["english_voice"]["status"].tolist() == ["REPLIED"]
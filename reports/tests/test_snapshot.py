@@ -0,0 +1,53 @@
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from diario.loaders import DataBundle, load_data
+from diario.snapshot import load_snapshot, save_snapshot, snapshot_key
+
+FIXTURE = Path(__file__).parent / "fixtures" / "diario_operativo.xlsx"
+
+
+def _sheets_like_bundle() -> DataBundle:
+    # Como llega de get_all_records + _empty_to_na: object con ints, strings y NA mezclados por columna
+    daily = pd.DataFrame(
+        {
+            "date": ["2026-01-07", "2026-01-08"],
+            "energy": pd.Series([4, pd.NA], dtype=object),
+            "sleep_hours": pd.Series([7.5, pd.NA], dtype=object),
+            "notes": pd.Series(["ok", pd.NA], dtype=object),
+        }
+    )
+    pomodoro = pd.DataFrame({"date": ["2026-01-07"], "meta": [{"at": "10:25"}]})  # dict → pickle
+    return DataBundle(daily=daily, checkins=pd.DataFrame(), pomodoro=pomodoro)
+
+
+def test_snapshot_roundtrip_preserves_frames(tmp_path: Path):
+    bundle = _sheets_like_bundle()
+    save_snapshot(tmp_path, "k", bundle)
+
+    cached = load_snapshot(tmp_path, "k", max_age=60)
+    assert cached is not None
+    for name in ("daily", "checkins", "pomodoro", "coach"):
+        pd.testing.assert_frame_equal(getattr(cached, name), getattr(bundle, name))
+
+
+def test_snapshot_expires(tmp_path: Path):
+    save_snapshot(tmp_path, "k", _sheets_like_bundle())
+    assert load_snapshot(tmp_path, "k", max_age=0) is None
+    assert load_snapshot(tmp_path, "k", max_age=60, not_before=time.time() + 1) is None
+    assert load_snapshot(tmp_path, "otra", max_age=60) is None
+
+
+def test_load_data_uses_snapshot(tmp_path: Path, monkeypatch):
+    fresh = load_data("excel", excel_path=str(FIXTURE), cache_dir=tmp_path)
+    assert (tmp_path / "snapshots" / snapshot_key("excel", str(FIXTURE.resolve())) / "manifest.json").exists()
+
+    def _no_network(*args, **kwargs):
+        raise AssertionError("no debería releer la fuente")
+
+    monkeypatch.setattr("diario.loaders._read_excel", _no_network)
+    cached = load_data("excel", excel_path=str(FIXTURE), cache_dir=tmp_path)
+    pd.testing.assert_frame_equal(cached.daily, fresh.daily)
+    pd.testing.assert_frame_equal(cached.pomodoro, fresh.pomodoro)
@@ -0,0 +1,23 @@
+import subprocess
+import sys
+from pathlib import Path
+
+BENCH = Path(__file__).resolve().parents[1] / "benchmarks" / "bench_startup.py"
+
+
+def _bench(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, str(BENCH), "--runs", "2", *args], capture_output=True, text=True, timeout=120)
+
+
+def test_cli_cold_start_keeps_heavy_imports_lazy():
+    # importar el CLI no carga pandas/jinja2/openpyxl/matplotlib/openai/dotenv;
+    # el presupuesto de tiempo lo mide benchmarks/bench_startup.py, no la suite
+    proc = _bench("--budget-ms", "10000")
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+
+
+def test_subsystems_keep_optional_dependencies_lazy():
+    proc = _bench("--module", "src.diario.render", "--forbid", "matplotlib,multiprocessing,openai", "--budget-ms", "10000")
+    assert proc.returncode == 0, proc.stdout
+    proc = _bench("--module", "src.diario.loaders", "--forbid", "openpyxl,gspread,supabase,pyarrow.parquet", "--budget-ms", "10000")
+    assert proc.returncode == 0, proc.stdout
@@ -0,0 +1,50 @@
+import time
+
+from diario.loaders import load_data
+from diario.supabase_client import SupabaseClient, SupabaseConfig
+from postgrest_stub import PostgrestStub
+
+
+def _rows(table: str, n: int) -> list[dict]:
+    return [
+        {"id": f"{table}-{i}", "date": f"2026-01-{1 + i % 28:02d}", "recorded_at": f"2026-01-01T00:00:{i % 60:02d}+00:00", "n": i}
+        for i in range(n)
+    ]
+
+
+def test_select_parallel_pages_match_serial():
+    with PostgrestStub({"pomodoro": _rows("pomodoro", 3500)}) as stub:
+        sb = SupabaseClient(SupabaseConfig(url=stub.url, key="test", retries_total=0))
+        serial = sb.select("pomodoro", order="n.asc")
+        stub.log.clear()
+        parallel = sb.select("pomodoro", order="n.asc", parallel=4)
+
+    assert parallel == serial
+    assert len(stub.log) == 4  # 1 página con count=exact + 3 en paralelo
+
+
+def test_load_supabase_fetches_tables_concurrently(monkeypatch, capsys):
+    tables = {
+        "daily": _rows("daily", 2500),  # 3 páginas
+        "checkins": _rows("checkins", 40),
+        "pomodoro": _rows("pomodoro", 900),
+        "coach": _rows("coach", 10),
+    }
+    delay = 0.15
+    with PostgrestStub(tables, delay=delay) as stub:
+        monkeypatch.setenv("SUPABASE_URL", stub.url)
+        monkeypatch.setenv("SUPABASE_SERVICE_KEY", "test")
+
+        t0 = time.perf_counter()
+        data = load_data("supabase")
+        elapsed = time.perf_counter() - t0
+
+    # en serie serían 6 requests × delay; en paralelo ~2 rondas (count + resto de páginas)
+    assert elapsed < 4 * delay
+    assert stub.max_in_flight >= 4
+    assert len(data.daily) == 2500 and len(data.coach) == 10
+    assert sorted(data.pomodoro["n"].tolist()) == list(range(900))
+
+    out = capsys.readouterr().out
+    for table in tables:
+        assert f"Supabase '{table}'" in out
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from diario.loaders import frame_from_pages
+from diario.supabase_client import SupabaseClient, SupabaseConfig
+from postgrest_stub import PostgrestStub
+
+
+def _rows(n: int) -> list[dict]:
+    # energy nula en el último tramo: la última página llega sin valores
+    return [
+        {"id": f"{i:06d}", "date": f"2026-01-{1 + i % 28:02d}", "energy": (i % 5) if i < 2000 else None}
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_select_iter_keyset_matches_select(indexed: bool):
+    with PostgrestStub({"daily": _rows(2500)}, indexed=indexed) as stub:
+        sb = SupabaseClient(SupabaseConfig(url=stub.url, key="test", retries_total=0))
+        expected = sb.select("daily", order="id.asc")
+        stub.log.clear()
+
+        pages = list(sb.select_iter("daily", key="id"))
+        filtered = [r for p in sb.select_iter("daily", key="id", filters={"date": "eq.2026-01-03"}, page_size=40) for r in p]
+
+    assert [len(p) for p in pages] == [1000, 1000, 500]
+    assert [r for p in pages for r in p] == expected
+    assert "offset" not in stub.log[1]["params"] and stub.log[1]["params"]["id"] == "gt.000999"
+    assert filtered == [r for r in expected if r["date"] == "2026-01-03"]
+
+    df = frame_from_pages(pages)
+    pd.testing.assert_frame_equal(df, pd.DataFrame(expected))
+    assert frame_from_pages([]).empty